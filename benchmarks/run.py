@@ -0,0 +1,276 @@
+"""The quickplots benchmark suite. It measures how long the main operations
+take, and how much memory they use at most, at a range of data sizes and
+numbers of series, and saves the results as JSON so that runs can be compared.
+
+Run the suite with::
+
+    python -m benchmarks.run --output results.json
+
+and compare two runs with::
+
+    python -m benchmarks.run compare before.json after.json
+
+The default sizes finish in a minute or two. Pass ``--points`` and
+``--series`` to go further - ``--points 1000 10000 100000 1000000 10000000
+--series 1 10 100 500`` covers the full range, but needs a lot of time and
+memory, and most of all for the OmniCanvas benchmarks."""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import quickplots
+from quickplots.charts import AxisChart
+from quickplots.series import Series, LineSeries, ScatterSeries
+
+POINTS = (1000, 10000, 100000)
+
+SERIES = (1, 10, 100)
+
+REGRESSION_THRESHOLD = 1.25
+
+def make_data(points, offset=0):
+    """Creates some x and y values which go up and down, so that series have
+    a non-trivial extent.
+
+    :param int points: The number of values.
+    :param int offset: Shifts the y values, so series differ.
+    :rtype: ``tuple``"""
+
+    x_values = list(range(points))
+    y_values = [((x * 7919 + offset) % 1000) / 10 for x in x_values]
+    return x_values, y_values
+
+
+def make_chart(points, series, series_class=LineSeries):
+    """Creates a chart with some series, sharing the points between them.
+
+    :param int points: The total number of points in the chart.
+    :param int series: The number of series.
+    :param series_class: The class of the series.
+    :rtype: :py:class:`.AxisChart`"""
+
+    per_series = max(points // series, 3)
+    return AxisChart(*[
+     series_class(*make_data(per_series, index)) for index in range(series)
+    ])
+
+
+def bench_series_init(points, series):
+    data = make_data(points)
+    return lambda: Series(*data)
+
+
+def bench_add_data_point(points, series):
+    s = Series(*make_data(points))
+    x = [points]
+    def run():
+        for _ in range(1000):
+            s.add_data_point(x[0], 1.5)
+            x[0] += 1
+    return run
+
+
+def bench_add_data_point_unordered(points, series):
+    s = Series(*make_data(points))
+    return lambda: s.add_data_point(-1, 1.5)
+
+
+def bench_remove_data_point(points, series):
+    s = Series(*make_data(points + 100))
+    data = s.data()
+    def run():
+        for point in data[-100:]:
+            s.remove_data_point(*point)
+        s.add_data_points(data[-100:])
+    return run
+
+
+def bench_limits(points, series):
+    chart = make_chart(points, series)
+    def run():
+        for s in chart.all_series():
+            s._extents.clear()
+        chart.x_lower_limit(), chart.x_upper_limit()
+        chart.y_lower_limit(), chart.y_upper_limit()
+        chart.x_ticks(), chart.y_ticks()
+    return run
+
+
+def bench_create_line(points, series):
+    return make_chart(points, series).create
+
+
+def bench_create_scatter(points, series):
+    return make_chart(points, series, ScatterSeries).create
+
+
+def bench_canvas_to_svg(points, series):
+    return make_chart(points, series).create().to_svg
+
+
+def bench_to_svg_line(points, series):
+    return make_chart(points, series).to_svg
+
+
+def bench_to_svg_scatter(points, series):
+    return make_chart(points, series, ScatterSeries).to_svg
+
+
+def bench_to_png_line(points, series):
+    return make_chart(points, series).to_png
+
+
+BENCHMARKS = {
+ "series_init": (bench_series_init, False),
+ "add_data_point": (bench_add_data_point, False),
+ "add_data_point_unordered": (bench_add_data_point_unordered, False),
+ "remove_data_point": (bench_remove_data_point, False),
+ "limits": (bench_limits, True),
+ "create_line": (bench_create_line, True),
+ "create_scatter": (bench_create_scatter, True),
+ "canvas_to_svg": (bench_canvas_to_svg, True),
+ "to_svg_line": (bench_to_svg_line, True),
+ "to_svg_scatter": (bench_to_svg_scatter, True),
+ "to_png_line": (bench_to_png_line, True),
+}
+
+def measure(setup, points, series, repeat):
+    """Times a benchmark and measures its peak memory. The benchmark's setup
+    function is called with the sizes and returns the function to measure.
+    That is timed ``repeat`` times, keeping the fastest, and then run once
+    more under ``tracemalloc`` to find the most memory it uses at once.
+
+    :rtype: ``dict``"""
+
+    run = setup(points, series)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}
+
+
+def run_suite(points=POINTS, series=SERIES, names=None, repeat=3,
+ progress=None):
+    """Runs the benchmarks at every combination of sizes. Benchmarks which
+    don't depend on the number of series are only run with one.
+
+    :param points: The numbers of points to run at.
+    :param series: The numbers of series to run at.
+    :param names: The benchmarks to run, if not all of them.
+    :param int repeat: The number of times to time each benchmark.
+    :param progress: If given, this is called with each result as it comes.
+    :rtype: ``dict``"""
+
+    results = []
+    for name in names or BENCHMARKS:
+        setup, uses_series = BENCHMARKS[name]
+        for point_count in points:
+            for series_count in (series if uses_series else (1,)):
+                result = {
+                 "benchmark": name, "points": point_count,
+                 "series": series_count
+                }
+                result.update(measure(setup, point_count, series_count, repeat))
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return {
+     "quickplots": quickplots.__version__,
+     "python": sys.version.split()[0],
+     "platform": platform.platform(),
+     "date": datetime.now(timezone.utc).isoformat(),
+     "repeat": repeat,
+     "results": results
+    }
+
+
+def compare(before, after, threshold=REGRESSION_THRESHOLD):
+    """Compares two runs of the suite, and returns the results which got
+    slower or used more memory by more than a threshold.
+
+    :param dict before: The earlier run.
+    :param dict after: The later run.
+    :param float threshold: The ratio above which a change is a regression.
+    :returns: ``(benchmark, points, series, measure, before, after)`` for\
+    each regression.
+    :rtype: ``list``"""
+
+    earlier = {
+     (r["benchmark"], r["points"], r["series"]): r for r in before["results"]
+    }
+    regressions = []
+    for result in after["results"]:
+        key = (result["benchmark"], result["points"], result["series"])
+        if key not in earlier:
+            continue
+        for measure in ("seconds", "peak_bytes"):
+            old, new = earlier[key][measure], result[measure]
+            if old and new / old > threshold:
+                regressions.append(key + (measure, old, new))
+    return regressions
+
+
+def describe(result):
+    return "%-26s %10i points %4i series %10.4fs %12i bytes" % (
+     result["benchmark"], result["points"], result["series"],
+     result["seconds"], result["peak_bytes"]
+    )
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="quickplots benchmarks")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="run the benchmarks")
+    run.add_argument("--points", type=int, nargs="+", default=POINTS)
+    run.add_argument("--series", type=int, nargs="+", default=SERIES)
+    run.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS))
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--output", help="the JSON file to save results to")
+    diff = commands.add_parser("compare", help="compare two runs")
+    diff.add_argument("before")
+    diff.add_argument("after")
+    diff.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = sys.argv[1:] if args is None else list(args)
+    if not args or args[0] not in ("run", "compare", "-h", "--help"):
+        args.insert(0, "run")
+    args = parser.parse_args(args)
+
+    if args.command == "compare":
+        with open(args.before, encoding="utf-8") as f:
+            before = json.load(f)
+        with open(args.after, encoding="utf-8") as f:
+            after = json.load(f)
+        regressions = compare(before, after, args.threshold)
+        for benchmark, points, series, measure, old, new in regressions:
+            print("%s (%i points, %i series): %s %s -> %s (x%.2f)" % (
+             benchmark, points, series, measure, old, new, new / old
+            ))
+        print("%i regressions" % len(regressions))
+        return 1 if regressions else 0
+    results = run_suite(
+     args.points, args.series, args.benchmarks, args.repeat,
+     progress=lambda result: print(describe(result))
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
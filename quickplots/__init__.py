@@ -1,4 +1,5 @@
 from .quick import line, scatter
+from .parallel import render_many
 
 __version__ = "2.1.0"
 __author__ = "Sam Ireland"
@@ -0,0 +1,147 @@
+"""This module contains the tools used to render charts without blocking an
+asyncio event loop."""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+EXECUTORS = []
+
+async def offload(function, *args, executor=None, limiter=None):
+    """Runs a function in an executor and waits for its result without
+    blocking the event loop.
+
+    If the task awaiting this is cancelled, the function is cancelled too if
+    it has not started yet. A function which has already started is allowed
+    to finish, as a thread cannot be stopped part way through, but its result
+    is discarded.
+
+    :param function: The function to run.
+    :param \*args: The arguments to pass to the function.
+    :param executor: The ``concurrent.futures`` executor to run the function\
+    in. If not given, a shared thread pool is used. Use a\
+    ``ProcessPoolExecutor`` for big charts, so that rendering them doesn't\
+    compete with the event loop for the GIL.
+    :param asyncio.Semaphore limiter: If given, the function will not start\
+    until the semaphore can be acquired, and the semaphore is released when\
+    the function finishes. This limits how many renders can run at once. A\
+    cancelled function which has already started keeps its place until it\
+    really finishes."""
+
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        executor = default_executor()
+    if limiter is not None:
+        await limiter.acquire()
+    try:
+        future = executor.submit(function, *args)
+    except BaseException:
+        if limiter is not None:
+            limiter.release()
+        raise
+    if limiter is not None:
+        future.add_done_callback(lambda f: release_from_thread(loop, limiter))
+    return await asyncio.wrap_future(future)
+
+
+async def feed(series, source, on_frame=None, max_fps=10, max_pending=65536,
+ **kwargs):
+    """Feeds batches of data from an async iterator into a series, and renders
+    the series' chart as the data arrives.
+
+    Batches are read as fast as the source produces them, but the chart is
+    rendered at most ``max_fps`` times a second, and never more than once at a
+    time. Every batch which arrives while waiting for the next frame is added
+    to the series in one go, so a burst of data causes one render rather than
+    many. If more than ``max_pending`` points are waiting to be added, reading
+    pauses until the next frame takes them, so a fast source is slowed to the
+    speed of rendering.
+
+    When the source is exhausted, any remaining data is rendered in a final
+    frame.
+
+    :param Series series: The series to add data to. It must belong to a\
+    chart.
+    :param source: An async iterable of batches, each an iterable of (x, y)\
+    data points.
+    :param on_frame: A function (or coroutine function) to call with each\
+    render.
+    :param max_fps: The most frames to render per second.
+    :param int max_pending: The most points to hold before pausing reading.
+    :param \*\*kwargs: Passed on to :py:meth:`.Chart.render_async`.
+    :returns: The number of frames rendered.
+    :raises ValueError: if the series does not belong to a chart."""
+
+    chart = series.chart()
+    if chart is None:
+        raise ValueError("%s does not belong to a chart" % str(series))
+    if max_fps <= 0:
+        raise ValueError("max_fps must be positive, not %s" % str(max_fps))
+    loop = asyncio.get_running_loop()
+    pending = []
+    arrived, drained = asyncio.Event(), asyncio.Event()
+    drained.set()
+
+    async def read():
+        try:
+            async for batch in source:
+                pending.extend(batch)
+                arrived.set()
+                if len(pending) >= max_pending:
+                    drained.clear()
+                    await drained.wait()
+        finally:
+            arrived.set()
+
+    reader = asyncio.ensure_future(read())
+    frames, last_frame = 0, None
+    try:
+        while True:
+            await arrived.wait()
+            if last_frame is not None:
+                delay = last_frame + (1 / max_fps) - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            arrived.clear()
+            batch = pending[:]
+            del pending[:]
+            drained.set()
+            if batch:
+                series.add_data_points(batch)
+                last_frame = loop.time()
+                rendered = await chart.render_async(**kwargs)
+                frames += 1
+                if on_frame is not None:
+                    result = on_frame(rendered)
+                    if inspect.isawaitable(result):
+                        await result
+            if reader.done() and not pending:
+                reader.result()
+                return frames
+    finally:
+        reader.cancel()
+
+
+def release_from_thread(loop, limiter):
+    """Releases a limiter on its event loop's thread, as asyncio semaphores
+    cannot be released from other threads. If the loop has already closed,
+    there is nothing waiting on the limiter, and so nothing is done.
+
+    :param loop: The event loop the limiter belongs to.
+    :param asyncio.Semaphore limiter: The limiter to release."""
+
+    try:
+        loop.call_soon_threadsafe(limiter.release)
+    except RuntimeError:
+        pass
+
+
+def default_executor():
+    """Returns the thread pool used for rendering when no executor is given,
+    creating it the first time it is needed.
+
+    :rtype: ``ThreadPoolExecutor``"""
+
+    if not EXECUTORS:
+        EXECUTORS.append(ThreadPoolExecutor(thread_name_prefix="quickplots"))
+    return EXECUTORS[0]
@@ -0,0 +1,537 @@
+"""This module contains tools for caching rendered charts, so that a chart
+which has already been rendered does not need to be rendered again."""
+
+import hashlib
+import os
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from .metrics import HOOKS as METRIC_HOOKS, report
+from .reductions import exact_array
+
+RENDER_KINDS = {str: ".txt", bytes: ".bin"}
+
+MAX_DIGESTS = 1024
+
+DIGESTS = OrderedDict()
+
+DIGEST_LOCK = threading.Lock()
+
+MEASURE_FRACTION = 16
+
+MEASURE_EVERY = 64
+
+
+def chart_key(chart, *extra):
+    """Produces a key which identifies everything about a chart that affects
+    how it is rendered - its dimensions, title, labels, padding, limits, ticks
+    and grid settings, and the data and style of every series. Two charts with
+    the same key will render identically.
+
+    Series data is hashed as raw array buffers rather than value by value, and
+    each series remembers the hash of its data until the data changes (see
+    :py:func:`series_digest`), so this is much cheaper than rendering the
+    chart.
+
+    :param Chart chart: The chart to produce a key for.
+    :param \*extra: Any other values which should be part of the key, such as\
+    the options the chart is to be rendered with.
+    :rtype: ``str``"""
+
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(state_text(
+     chart, "_all_series", "_layers", "_geometry_workers"
+    ).encode())
+    for series in getattr(chart, "_all_series", ()):
+        hasher.update(state_text(
+         series, "_data", "_chart", "_version", "_state", "_lock", "_shared",
+         "_extents"
+        ).encode())
+        hasher.update(series_digest(series))
+    hasher.update(repr(extra).encode())
+    return hasher.hexdigest()
+
+
+def series_digest(series):
+    """Hashes a series' data. Columns which arrays can hold exactly are hashed
+    as raw buffers, and any others by their ``repr``, so series with different
+    data never share a hash.
+
+    The last ``MAX_DIGESTS`` hashes are remembered, keyed by each series'
+    :py:meth:`~.Series.state`. A series' snapshots have its state until it
+    changes, so a series is only hashed again once its data changes, even
+    though each render works from a new snapshot.
+
+    :param Series series: The series to hash the data of.
+    :rtype: ``bytes``"""
+
+    # The data is hashed from a snapshot, so it can't change while it is
+    # being hashed and be remembered under the wrong state
+    series = series.snapshot()
+    key = series.state()
+    with DIGEST_LOCK:
+        if key in DIGESTS:
+            DIGESTS.move_to_end(key)
+            return DIGESTS[key]
+    hasher = hashlib.blake2b(digest_size=20)
+    if series.streamed:
+        chunks = series.column_chunks()
+    else:
+        chunks = [tuple(map(exact_array, series.value_lists()))]
+    for columns in chunks:
+        for column in columns:
+            if isinstance(column, array):
+                hasher.update(column.typecode.encode())
+                hasher.update(len(column).to_bytes(8, "little"))
+                hasher.update(memoryview(column).cast("B"))
+            else:
+                hasher.update(repr(column).encode())
+    digest = hasher.digest()
+    with DIGEST_LOCK:
+        DIGESTS[key] = digest
+        while len(DIGESTS) > MAX_DIGESTS:
+            DIGESTS.popitem(last=False)
+    return digest
+
+
+def check_cacheable(renderer):
+    """Checks that a renderer's results can be stored in a cache, before
+    anything is rendered with it.
+
+    :param Renderer renderer: The renderer.
+    :raises TypeError: if the renderer doesn't return ``str`` or ``bytes``."""
+
+    if renderer.result_type() not in RENDER_KINDS:
+        raise TypeError("Can only cache str or bytes, not what '%s' returns" % (
+         str(renderer)
+        ))
+
+
+def state_text(obj, *exclude):
+    """Describes an object's class and attributes as text, leaving out the
+    attributes named.
+
+    :param obj: The object to describe.
+    :param \*exclude: The names of attributes to leave out.
+    :rtype: ``str``"""
+
+    return "%s%s" % (obj.__class__.__name__, repr(sorted(
+     (name, value) for name, value in vars(obj).items() if name not in exclude
+    )))
+
+
+
+class RenderCache:
+    """An in-memory store of rendered charts, keyed by :py:func:`chart_key`.
+    When the total size of everything stored grows beyond ``max_bytes``, the
+    least recently used renders are discarded.
+
+    Pass a cache to a chart's :py:meth:`~.Chart.to_svg` or
+    :py:meth:`~.Chart.to_png` methods to use it.
+
+    :param int max_bytes: The largest total size the cache can grow to."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        if not isinstance(max_bytes, int):
+            raise TypeError("max_bytes must be int, not '%s'" % str(max_bytes))
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive, not %i" % max_bytes)
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+
+    def __repr__(self):
+        return "<RenderCache (%i renders, %i bytes)>" % (
+         len(self._entries), self._size
+        )
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+    def size(self):
+        """Returns the total size in bytes of everything in the cache.
+
+        :rtype: ``int``"""
+
+        return self._size
+
+
+    def max_bytes(self):
+        """Returns the largest total size the cache can grow to.
+
+        :rtype: ``int``"""
+
+        return self._max_bytes
+
+
+    def stats(self):
+        """Returns the number of times a render was and wasn't found in the
+        cache.
+
+        :rtype: ``dict``"""
+
+        return {"hits": self._hits, "misses": self._misses}
+
+
+    def get(self, key):
+        """Returns the render stored under a key, or ``None`` if there isn't
+        one.
+
+        :param str key: The key to look up.
+        :rtype: ``str`` or ``bytes``"""
+
+        value = self._entries.get(key)
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+            self._entries.move_to_end(key)
+        if METRIC_HOOKS:
+            report(
+             "cache_miss" if value is None else "cache_hit", 1,
+             cache=self.__class__.__name__
+            )
+        return value
+
+
+    def put(self, key, value):
+        """Stores a render, discarding the least recently used renders if the
+        cache has grown too big. Renders larger than the whole cache are not
+        stored.
+
+        :param str key: The key to store the render under.
+        :param value: The rendered chart, as ``str`` or ``bytes``."""
+
+        if not isinstance(value, (str, bytes)):
+            raise TypeError("Can only cache str or bytes, not '%s'" % str(value))
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        if len(value) > self._max_bytes:
+            return
+        self._entries[key] = value
+        self._size += len(value)
+        while self._size > self._max_bytes:
+            self._size -= len(self._entries.popitem(last=False)[1])
+
+
+    def clear(self):
+        """Removes everything from the cache."""
+
+        self._entries.clear()
+        self._size = 0
+
+
+
+class FrameCache:
+    """A store of the SVG of chart frames - the grid, axes, labels and title
+    which surround a chart's data. Charts which share a frame cache and have
+    identical dimensions, padding, limits, ticks and text will paint their
+    frame once, and every other chart will copy it from the cache. When more
+    than ``max_frames`` layers are stored, the least recently used are
+    discarded.
+
+    Pass a frame cache to a chart's :py:meth:`~.Chart.to_svg` or
+    :py:meth:`~.Chart.write_svg` methods as ``frames`` to use it.
+
+    :param int max_frames: The largest number of frame layers to store."""
+
+    def __init__(self, max_frames=1024):
+        if not isinstance(max_frames, int):
+            raise TypeError("max_frames must be int, not '%s'" % str(max_frames))
+        if max_frames < 1:
+            raise ValueError("max_frames must be positive, not %i" % max_frames)
+        self._max_frames = max_frames
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+
+    def __repr__(self):
+        return "<FrameCache (%i layers)>" % len(self._entries)
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+    def max_frames(self):
+        """Returns the largest number of frame layers the cache can store.
+
+        :rtype: ``int``"""
+
+        return self._max_frames
+
+
+    def stats(self):
+        """Returns the number of times a frame layer was and wasn't found in
+        the cache.
+
+        :rtype: ``dict``"""
+
+        return {"hits": self._hits, "misses": self._misses}
+
+
+    def get(self, key):
+        """Returns the SVG fragment stored under a key, or ``None`` if there
+        isn't one.
+
+        :param tuple key: The layer's name and signature.
+        :rtype: ``tuple``"""
+
+        fragment = self._entries.get(key)
+        if fragment is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+            self._entries.move_to_end(key)
+        if METRIC_HOOKS:
+            report(
+             "cache_miss" if fragment is None else "cache_hit", 1,
+             cache=self.__class__.__name__
+            )
+        return fragment
+
+
+    def put(self, key, fragment):
+        """Stores an SVG fragment, discarding the least recently used fragment
+        if the cache is full.
+
+        :param tuple key: The layer's name and signature.
+        :param tuple fragment: The fragment, as produced by\
+        :py:meth:`.SvgRenderer.record`."""
+
+        self._entries[key] = fragment
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_frames:
+            self._entries.popitem(last=False)
+
+
+    def clear(self):
+        """Removes everything from the cache."""
+
+        self._entries.clear()
+
+
+
+class DiskCache:
+    """A store of rendered charts kept as files in a directory, so that it can
+    be shared by several processes and survives them restarting. It is used in
+    exactly the same way as a :py:class:`RenderCache`.
+
+    Each render is written to a temporary file and then moved into place, so
+    other processes never see a partly-written render. When the total size of
+    the directory grows beyond ``max_bytes``, the least recently used renders
+    are deleted. Any process may delete any render at any time, so a render
+    which disappears while being read is treated as not being in the cache.
+
+    Other processes' writes can't be counted as they happen, so the directory
+    is measured again whenever this process has written more than
+    ``max_bytes / MEASURE_FRACTION`` bytes, or ``MEASURE_EVERY`` renders,
+    since it was last measured. However many processes share the directory,
+    it can only outgrow ``max_bytes`` by what they have written since they
+    last measured it.
+
+    :param str directory: The directory to keep renders in. It will be\
+    created if it does not exist.
+    :param int max_bytes: The largest total size the directory can grow to."""
+
+    def __init__(self, directory, max_bytes=1024 * 1024 * 1024):
+        if not isinstance(directory, str):
+            raise TypeError("directory must be str, not '%s'" % str(directory))
+        if not isinstance(max_bytes, int):
+            raise TypeError("max_bytes must be int, not '%s'" % str(max_bytes))
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be positive, not %i" % max_bytes)
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._size = self.size()
+        self._unmeasured = 0
+        self._unmeasured_puts = 0
+        self._hits = 0
+        self._misses = 0
+
+
+    def __repr__(self):
+        return "<DiskCache '%s'>" % self._directory
+
+
+    def __len__(self):
+        return len(self.files())
+
+
+    def __contains__(self, key):
+        return any(os.path.exists(self.path(key, kind)) for kind in RENDER_KINDS)
+
+
+    def directory(self):
+        """Returns the directory the renders are kept in.
+
+        :rtype: ``str``"""
+
+        return self._directory
+
+
+    def max_bytes(self):
+        """Returns the largest total size the directory can grow to.
+
+        :rtype: ``int``"""
+
+        return self._max_bytes
+
+
+    def stats(self):
+        """Returns the number of times this process did and didn't find a
+        render in the cache.
+
+        :rtype: ``dict``"""
+
+        return {"hits": self._hits, "misses": self._misses}
+
+
+    def path(self, key, kind):
+        """Returns the path of the file a render is kept in. Renders are spread
+        across subdirectories by the start of their key.
+
+        :param str key: The render's key.
+        :param type kind: ``str`` or ``bytes``.
+        :rtype: ``str``"""
+
+        if not isinstance(key, str) or not key.isalnum():
+            raise ValueError("'%s' is not a valid cache key" % str(key))
+        return os.path.join(
+         self._directory, key[:2], key + RENDER_KINDS[kind]
+        )
+
+
+    def files(self):
+        """Returns the path, size and last use time of every render currently
+        in the cache.
+
+        :rtype: ``list``"""
+
+        files = []
+        for entry in os.scandir(self._directory):
+            if not entry.is_dir():
+                continue
+            for render in os.scandir(entry.path):
+                if render.name.startswith(".tmp"):
+                    continue
+                try:
+                    stat = render.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((render.path, stat.st_size, stat.st_mtime))
+        return files
+
+
+    def size(self):
+        """Returns the total size in bytes of every render in the cache.
+
+        :rtype: ``int``"""
+
+        return sum(size for path, size, used in self.files())
+
+
+    def get(self, key):
+        """Returns the render stored under a key, or ``None`` if there isn't
+        one. Finding a render marks it as recently used.
+
+        :param str key: The key to look up.
+        :rtype: ``str`` or ``bytes``"""
+
+        for kind in RENDER_KINDS:
+            path = self.path(key, kind)
+            try:
+                with open(path, "rb") as f:
+                    value = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            self._hits += 1
+            if METRIC_HOOKS:
+                report("cache_hit", 1, cache=self.__class__.__name__)
+            return value.decode("utf-8") if kind is str else value
+        self._misses += 1
+        if METRIC_HOOKS:
+            report("cache_miss", 1, cache=self.__class__.__name__)
+
+
+    def put(self, key, value):
+        """Stores a render, and then deletes the least recently used renders if
+        the cache has grown too big. Renders larger than the whole cache are not
+        stored.
+
+        :param str key: The key to store the render under.
+        :param value: The rendered chart, as ``str`` or ``bytes``."""
+
+        if not isinstance(value, (str, bytes)):
+            raise TypeError("Can only cache str or bytes, not '%s'" % str(value))
+        data = value.encode("utf-8") if isinstance(value, str) else value
+        if len(data) > self._max_bytes:
+            return
+        path = self.path(key, type(value))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(
+         prefix=".tmp", dir=os.path.dirname(path)
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self._size += len(data)
+        self._unmeasured += len(data)
+        self._unmeasured_puts += 1
+        if (
+         self._size > self._max_bytes
+         or self._unmeasured > self._max_bytes // MEASURE_FRACTION
+         or self._unmeasured_puts >= MEASURE_EVERY
+        ):
+            self.evict()
+
+
+    def evict(self):
+        """Deletes the least recently used renders until the cache is within
+        its size limit. The directory is measured afresh first, as other
+        processes may have added or removed renders."""
+
+        files = sorted(self.files(), key=lambda f: f[2])
+        self._size = sum(size for path, size, used in files)
+        self._unmeasured = 0
+        self._unmeasured_puts = 0
+        for path, size, used in files:
+            if self._size <= self._max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+
+    def clear(self):
+        """Deletes every render in the cache."""
+
+        for path, size, used in self.files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
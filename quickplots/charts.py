@@ -1,8 +1,21 @@
+import gzip
+import io
 import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from random import randint
 from numerus import is_numeric
-from omnicanvas import Canvas, colors
-from .series import Series, LineSeries, ScatterSeries
+from omnicanvas import colors
+from .series import Series, LineSeries, ScatterSeries, transform_points
+from .series import transform_columns
+from .renderers import Renderer, OmniCanvasRenderer
+from .svg import SvgRenderer
+from .png import PngRenderer
+from .cache import chart_key, state_text, check_cacheable
+from .asynchronous import offload
+from .reductions import worker_pool
+from .profiling import profiling_render, profiled
+from .metrics import HOOKS as METRIC_HOOKS, report, counted
 
 class Chart:
     """The base class for all charts. It controls the attributes common to all
@@ -71,20 +84,259 @@ class Chart:
             self._height = height
 
 
-    def create(self):
+    def snapshot(self):
+        """Returns a copy of the chart as it is now, which will not change
+        when the chart is changed afterwards. Charts are always rendered from
+        a snapshot, so another thread can go on changing a chart while it is
+        being rendered, and the render will show it as it was when rendering
+        began.
+
+        :rtype: :py:class:`Chart`"""
+
+        snapshot = self.__class__.__new__(self.__class__)
+        snapshot.__dict__.update(vars(self))
+        return snapshot
+
+
+    def create(self, renderer=None):
         """Renders the chart to an OmniCanvas `canvas <https://omnicanvas.readt\
         hedocs.io/en/latest/api/canvas.html#omnicanvas.canvas.Canvas>`_. This
         object can then be `saved <https://omnicanvas.readthedocs.io/en/latest/\
         api/canvas.html#omnicanvas.canvas.Canvas.save>`_ or `rendered <https://\
         omnicanvas.readthedocs.io/en/latest/api/canvas.html#omnicanvas.canvas.C\
-        anvas.render>`_ as SVG."""
+        anvas.render>`_ as SVG.
+
+        A different :py:class:`.Renderer` can be given to render the chart some
+        other way, in which case whatever that renderer produces is returned.
+
+        The chart is painted from a :py:meth:`snapshot`, so it can safely be
+        changed by other threads while it is being painted.
+
+        :param Renderer renderer: The renderer to use, if not OmniCanvas."""
+
+        if renderer is None:
+            renderer = OmniCanvasRenderer()
+        if not isinstance(renderer, Renderer):
+            raise TypeError("'%s' is not a Renderer" % str(renderer))
+        with profiling_render():
+            chart = self.snapshot()
+            renderer.begin(chart.width(), chart.height())
+            chart.paint(renderer)
+            with profiled("serialization"):
+                result = renderer.finish()
+        if METRIC_HOOKS:
+            name = renderer.__class__.__name__
+            if renderer.graphic_count() is not None:
+                report("graphics", renderer.graphic_count(), renderer=name)
+            if renderer.output_size() is not None:
+                report("output_size", renderer.output_size(), renderer=name)
+        return result
+
+
+    def write_svg(self, output, **kwargs):
+        """Renders the chart as SVG straight to a file-like object, without
+        creating an OmniCanvas canvas first. The SVG text is written in chunks
+        as the chart is painted, so it is never held in memory all at once.
+
+        Any keyword arguments, such as ``chunk_size`` or ``marker_mode``, are
+        passed on to the :py:class:`.SvgRenderer`.
+
+        :param output: The file-like object to write to."""
+
+        self.create(SvgRenderer(output, **kwargs))
+
+
+    def to_svg(self, cache=None, **kwargs):
+        """Renders the chart as SVG text, without creating an OmniCanvas canvas
+        first. Any keyword arguments are passed on to the
+        :py:class:`.SvgRenderer`.
+
+        :param RenderCache cache: If given, the SVG is looked up in this cache\
+        first, and stored in it if it was not there.
+        :rtype: ``str``"""
+
+        return self.render(SvgRenderer, cache, **kwargs)
+
+
+    def render(self, renderer_class=SvgRenderer, cache=None, **kwargs):
+        """Renders the chart with a new renderer of the given class, and returns
+        the result. Any keyword arguments are passed on to the renderer.
+
+        If a cache is given, the chart's :py:func:`.chart_key` (together with
+        the renderer and its options) is looked up in it, and if the chart has
+        been rendered that way before the stored render is returned instead.
+        Otherwise the new render is stored in the cache.
+
+        :param renderer_class: The :py:class:`.Renderer` subclass to use.
+        :param RenderCache cache: The cache to use, if any.
+        :raises TypeError: if a cache is given and the renderer doesn't\
+        return ``str`` or ``bytes``.
+        :rtype: ``str`` or ``bytes``"""
+
+        renderer = renderer_class(**kwargs)
+        if cache is None:
+            return self.create(renderer)
+        check_cacheable(renderer)
+        chart = self.snapshot()
+        key = chart.render_key(renderer_class, kwargs)
+        rendered = cache.get(key)
+        if rendered is None:
+            rendered = chart.create(renderer)
+            cache.put(key, rendered)
+        return rendered
+
+
+    def render_key(self, renderer_class, kwargs):
+        """Returns the key a render of the chart is cached under - the chart's
+        :py:func:`.chart_key`, together with the renderer and any of its
+        options which affect the output.
+
+        :param renderer_class: The :py:class:`.Renderer` subclass used.
+        :param dict kwargs: The renderer's keyword arguments.
+        :rtype: ``str``"""
+
+        return chart_key(self, renderer_class.__name__, sorted(
+         (name, value) for name, value in kwargs.items() if name != "frames"
+        ))
+
+
+    async def create_async(self, renderer=None, executor=None, limiter=None):
+        """Does the same as :py:meth:`create`, but in an executor, so that an
+        asyncio event loop can carry on with other work while the chart is
+        painted. A :py:meth:`snapshot` is taken straight away, so the chart
+        can be changed while it is painted without affecting the result.
+
+        :param Renderer renderer: The renderer to use, if not OmniCanvas.
+        :param executor: The ``concurrent.futures`` executor to use. By default\
+        a shared thread pool is used.
+        :param asyncio.Semaphore limiter: If given, this limits how many charts\
+        are rendered at once - see :py:func:`.offload`."""
+
+        return await offload(
+         self.snapshot().create, renderer, executor=executor, limiter=limiter
+        )
+
+
+    async def render_async(self, renderer_class=SvgRenderer, cache=None,
+     executor=None, limiter=None, **kwargs):
+        """Does the same as :py:meth:`render`, but in an executor, so that an
+        asyncio event loop can carry on with other work while the chart is
+        rendered. The cache is checked and updated in the event loop's thread,
+        so it doesn't need to be shared with the executor.
+
+        :param renderer_class: The :py:class:`.Renderer` subclass to use.
+        :param RenderCache cache: The cache to use, if any.
+        :param executor: The ``concurrent.futures`` executor to use. By default\
+        a shared thread pool is used.
+        :param asyncio.Semaphore limiter: If given, this limits how many charts\
+        are rendered at once - see :py:func:`.offload`.
+        :raises TypeError: if a cache is given and the renderer doesn't\
+        return ``str`` or ``bytes``.
+        :rtype: ``str`` or ``bytes``"""
+
+        renderer = renderer_class(**kwargs)
+        chart = self.snapshot()
+        if cache is not None:
+            check_cacheable(renderer)
+            key = chart.render_key(renderer_class, kwargs)
+            rendered = cache.get(key)
+            if rendered is not None:
+                return rendered
+        rendered = await offload(
+         chart.create, renderer, executor=executor, limiter=limiter
+        )
+        if cache is not None:
+            cache.put(key, rendered)
+        return rendered
+
+
+    def write_svgz(self, output, compresslevel=9, **kwargs):
+        """Renders the chart as gzip-compressed SVG (SVGZ). The SVG is
+        compressed as it is written, so the uncompressed SVG is never held in
+        memory all at once.
+
+        Any other keyword arguments are passed on to the\
+        :py:class:`.SvgRenderer`.
+
+        :param output: The path to save to, or a binary file-like object.
+        :param int compresslevel: The gzip compression level, from 0 (none) to\
+        9 (the most).
+        :raises ValueError: if the compression level is not between 0 and 9."""
 
-        canvas = Canvas(self.width(), self.height())
-        canvas.add_text(
-         self.width() / 2, 0, self.title(),
+        if not isinstance(compresslevel, int):
+            raise TypeError(
+             "compresslevel must be int, not '%s'" % str(compresslevel)
+            )
+        if not 0 <= compresslevel <= 9:
+            raise ValueError(
+             "compresslevel must be between 0 and 9, not %i" % compresslevel
+            )
+        if isinstance(output, str):
+            with open(output, "wb") as f:
+                return self.write_svgz(f, compresslevel, **kwargs)
+        with gzip.GzipFile(
+         fileobj=output, mode="wb", compresslevel=compresslevel, mtime=0
+        ) as compressed:
+            text = io.TextIOWrapper(compressed, encoding="utf-8")
+            self.write_svg(text, **kwargs)
+            text.flush()
+            text.detach()
+
+
+    def to_png(self, cache=None, **kwargs):
+        """Renders the chart as a PNG image. Any keyword arguments are passed on
+        to the :py:class:`.PngRenderer`.
+
+        :param RenderCache cache: If given, the PNG is looked up in this cache\
+        first, and stored in it if it was not there.
+        :rtype: ``bytes``"""
+
+        return self.render(PngRenderer, cache, **kwargs)
+
+
+    def save(self, path, **kwargs):
+        """Saves the chart as an SVG file, without creating an OmniCanvas canvas
+        first. If the path ends in ``.svgz`` the file will be gzip-compressed,
+        and if it ends in ``.png`` the chart will be saved as a PNG image
+        instead.
+
+        Any keyword arguments are passed on to :py:meth:`write_svg`,\
+        :py:meth:`write_svgz` or the :py:class:`.PngRenderer`.
+
+        :param str path: The location and filename to save to."""
+
+        if not isinstance(path, str):
+            raise TypeError("path must be str, not '%s'" % str(path))
+        if path.lower().endswith(".svgz"):
+            self.write_svgz(path, **kwargs)
+        elif path.lower().endswith(".png"):
+            with open(path, "wb") as f:
+                self.create(PngRenderer(f, **kwargs))
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                self.write_svg(f, **kwargs)
+
+
+    def paint(self, renderer):
+        """Paints the chart to a :py:class:`.Renderer`. This is used internally
+        to create the chart.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        with profiled("canvas", "title"):
+            self.paint_title(renderer)
+
+
+    def paint_title(self, renderer):
+        """Paints the chart's title at the top of the canvas.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        renderer.text(
+         renderer.width() / 2, 0, self.title(),
          vertical_align="bottom", name="title"
         )
-        return canvas
+
 
 
 class AxisChart(Chart):
@@ -137,12 +389,40 @@ class AxisChart(Chart):
         self._y_ticks = None
         self._x_grid = True
         self._y_grid = True
+        self._layers = None
+        self._geometry_workers = 1
 
 
     def __repr__(self):
         return "<AxisChart (%i series)>" % len(self._all_series)
 
 
+    def __reduce_ex__(self, protocol):
+        state = dict(vars(self))
+        state["_layers"] = {} if self._layers is not None else None
+        return (object.__new__, (self.__class__,), state)
+
+
+    def snapshot(self):
+        """Returns a copy of the chart as it is now, with a
+        :py:meth:`~.Series.snapshot` of each of its series, which will not
+        change when the chart or its series are changed afterwards. No data
+        is copied, so this is cheap however big the series are.
+
+        A snapshot of an incremental chart shares its layer memory, so
+        rendering the snapshot updates the layers the chart remembers.
+
+        :rtype: :py:class:`AxisChart`"""
+
+        snapshot = Chart.snapshot(self)
+        snapshot._all_series = []
+        for series in self.all_series():
+            series = series.snapshot()
+            series._chart = snapshot
+            snapshot._all_series.append(series)
+        return snapshot
+
+
     def all_series(self):
         """Returns a ``list`` of all the :py:class:`.Series` objects associated
         with the chart.
@@ -325,7 +605,7 @@ class AxisChart(Chart):
         associated with the chart."""
 
         return min(
-         [series.data()[0][0] for series in self.all_series()]
+         [series.smallest_x() for series in self.all_series()]
         )
 
 
@@ -334,7 +614,7 @@ class AxisChart(Chart):
         associated with the chart."""
 
         return max(
-         [series.data()[-1][0] for series in self.all_series()]
+         [series.largest_x() for series in self.all_series()]
         )
 
 
@@ -578,116 +858,450 @@ class AxisChart(Chart):
         self._x_grid = self._y_grid = grid
 
 
-    def create(self):
-        """Renders the chart to an OmniCanvas `canvas <https://omnicanvas.readt\
-        hedocs.io/en/latest/api/canvas.html#omnicanvas.canvas.Canvas>`_. This
-        object can then be `saved <https://omnicanvas.readthedocs.io/en/latest/\
-        api/canvas.html#omnicanvas.canvas.Canvas.save>`_ or `rendered <https://\
-        omnicanvas.readthedocs.io/en/latest/api/canvas.html#omnicanvas.canvas.C\
-        anvas.render>`_ as SVG."""
+    def incremental(self, incremental=None):
+        """Returns or sets (if a value is provided) whether the chart remembers
+        the SVG of each of its layers when it is rendered with an
+        :py:class:`.SvgRenderer`.
+
+        When it does, rendering the chart again only repaints the layers which
+        have changed since the last render - the series whose data or style
+        have changed, and the grid, axes and labels only if the limits or ticks
+        have moved. Every other layer is copied from the last render.
+
+        :param bool incremental: If given, turns layer memory on or off.
+        :rtype: ``bool``"""
+
+        if incremental is None:
+            return self._layers is not None
+        else:
+            if not isinstance(incremental, bool):
+                raise TypeError(
+                 "incremental must be boolean, not '%s'" % str(incremental)
+                )
+            if not incremental:
+                self._layers = None
+            elif self._layers is None:
+                self._layers = {}
+
+
+    def geometry_workers(self, workers=None):
+        """Returns or sets (if a value is provided) the number of workers used
+        to calculate the canvas coordinates of the chart's series when it is
+        painted. With more than one, the series are transformed at the same
+        time in a shared pool of processes - or of threads, if Python is
+        running without a GIL - and then painted in their usual order, so the
+        output is the same either way.
+
+        This speeds up charts with many large series. For charts with a few
+        small series, passing the data between processes costs more than it
+        saves.
+
+        :param int workers: If given, the number of workers will be set to\
+        this.
+        :raises ValueError: if a number less than 1 is given.
+        :rtype: ``int``"""
+
+        if workers is None:
+            return self._geometry_workers
+        else:
+            if not isinstance(workers, int):
+                raise TypeError("workers must be int, not '%s'" % str(workers))
+            if workers < 1:
+                raise ValueError("workers must be positive, not %i" % workers)
+            self._geometry_workers = workers
+
+
+    def canvas_transform(self):
+        """Returns the numbers needed to convert data values into canvas
+        coordinates - the lower limit of each axis, the pixels per unit along
+        each axis, the horizontal and vertical margins in pixels, and the
+        chart's height. Each series' :py:meth:`~.Series.canvas_points` are
+        calculated from these.
+
+        :rtype: ``tuple``"""
+
+        x_axis_min, y_axis_min = self.x_lower_limit(), self.y_lower_limit()
+        width, height = self.width(), self.height()
+        horizontal_margin = self.horizontal_padding() * width
+        vertical_margin = self.vertical_padding() * height
+        x_axis_span = self.x_upper_limit() - x_axis_min
+        y_axis_span = self.y_upper_limit() - y_axis_min
+        return (
+         x_axis_min, y_axis_min,
+         (width - (2 * horizontal_margin)) / x_axis_span,
+         (height - (2 * vertical_margin)) / y_axis_span,
+         horizontal_margin, vertical_margin, height
+        )
 
-        canvas = Chart.create(self)
 
-        for index, series in enumerate(self.all_series(), start=1):
-            series.write_to_canvas(canvas, "series%i" % index)
-        canvas.add_rectangle(
-         0, 0, self.horizontal_padding() * canvas.width(), canvas.height(),
+    def series_geometry(self, series):
+        """Calculates the :py:meth:`~.Series.canvas_points` of several of the
+        chart's series at once, spread across the chart's
+        :py:meth:`geometry_workers`. The points are returned in the same order
+        as the series. Streamed series, whose points are read from disk as
+        they are painted, are left out and have ``None`` in their place.
+
+        :param list series: The series to calculate the points of.
+        :rtype: ``list``"""
+
+        transform = self.canvas_transform()
+        workers = self.geometry_workers()
+        in_memory = [s for s in series if not s.streamed]
+        executor = None
+        if workers > 1 and len(in_memory) > 1:
+            executor = worker_pool(workers)
+        if executor is None:
+            points = []
+            for s in in_memory:
+                with profiled("transform", s.name()):
+                    points.append(transform_points(*s.value_lists(), transform))
+        else:
+            if isinstance(executor, ProcessPoolExecutor):
+                # Arrays are far cheaper to send to another process than lists
+                columns = [
+                 s.exact_columns() or s.value_lists() for s in in_memory
+                ]
+            else:
+                columns = [s.value_lists() for s in in_memory]
+            with profiled("transform"):
+                # The workers send back packed columns, which are only zipped
+                # into points as the renderer reads them
+                points = [zip(x, y) for x, y in executor.map(
+                 transform_columns, *zip(*columns), repeat(transform),
+                 chunksize=max(1, len(in_memory) // (workers * 4))
+                )]
+        points = iter(points)
+        return [None if s.streamed else next(points) for s in series]
+
+
+    def paint(self, renderer):
+        """Paints the chart to a :py:class:`.Renderer`. This is used internally
+        to create the chart.
+
+        The chart is painted in layers, from back to front - grid lines,
+        series, the blocks which mask out the area beyond the axes, the axes,
+        the labels and ticks, and finally the title. Each layer is added to the
+        renderer in turn, so no graphic needs to be moved once it is added.
+
+        If the render is being profiled (see :py:mod:`.profiling`), resolving
+        the limits and ticks, transforming each series and painting each layer
+        are recorded as separate phases.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        with profiled("limits"):
+            # The series' extents are found and remembered here, so later
+            # phases can resolve the limits cheaply
+            self.canvas_transform()
+        with profiled("ticks"):
+            self.x_ticks()
+            self.y_ticks()
+        if isinstance(renderer, SvgRenderer) and (
+         self._layers is not None or renderer.frames() is not None
+        ):
+            return self.paint_incrementally(renderer)
+        with profiled("canvas", "grid"):
+            self.paint_grid(renderer)
+        self.paint_series(renderer)
+        with profiled("canvas", "masks"):
+            self.paint_masks(renderer)
+        with profiled("canvas", "axes"):
+            self.paint_axes(renderer)
+        with profiled("canvas", "labels"):
+            self.paint_labels(renderer)
+        with profiled("canvas", "title"):
+            self.paint_title(renderer)
+
+
+    def paint_incrementally(self, renderer):
+        """Paints the chart to an :py:class:`.SvgRenderer` in the same layers
+        as :py:meth:`paint`, but copies each layer from the last render if
+        nothing it depends on has changed. Series are repainted if their data
+        or style have changed, and everything else if the chart's dimensions,
+        padding, limits, ticks or text have changed.
+
+        If the renderer has a :py:class:`.FrameCache`, the layers which don't
+        depend on the series' data are also looked for there, so that many
+        charts with the same layout only paint it once.
+
+        :param SvgRenderer renderer: The renderer to paint to."""
+
+        previous = dict(self._layers or {})
+        if self._layers is not None:
+            self._layers.clear()
+        frames = renderer.frames()
+        frame = (
+         renderer.options(), renderer.width(), renderer.height(),
+         self.horizontal_padding(), self.vertical_padding()
+        )
+        layout = frame + (
+         self.x_lower_limit(), self.x_upper_limit(),
+         self.y_lower_limit(), self.y_upper_limit(),
+         self.x_ticks(), self.y_ticks()
+        )
+        self.paint_layer(
+         renderer, previous, frames,
+         ("grid", layout, self.x_grid(), self.y_grid()), self.paint_grid
+        )
+        keys = [(
+         "series%i" % index, layout, state_text(
+          series, "_data", "_chart", "_version", "_lock", "_shared", "_extents"
+         )
+        ) for index, series in enumerate(self.all_series(), start=1)]
+        # A series' state identifies its data across renders and snapshots.
+        # Only the series which have changed since the last render need their
+        # points calculated.
+        changed = [
+         series for series, key in zip(self.all_series(), keys)
+          if key not in previous
+        ]
+        points = dict(zip(map(id, changed), self.series_geometry(changed)))
+        for series, key in zip(self.all_series(), keys):
+            self.paint_layer(
+             renderer, previous, None, key,
+             self.write_series, series, key[0], points.get(id(series))
+            )
+        self.paint_layer(
+         renderer, previous, frames, ("masks", frame), self.paint_masks
+        )
+        self.paint_layer(
+         renderer, previous, frames, ("axes", frame), self.paint_axes
+        )
+        self.paint_layer(
+         renderer, previous, frames,
+         ("labels", layout, self.x_label(), self.y_label()), self.paint_labels
+        )
+        self.paint_layer(
+         renderer, previous, frames, ("title", frame, self.title()),
+         self.paint_title
+        )
+
+
+    def paint_layer(self, renderer, previous, frames, key, paint, *args):
+        """Paints one layer of the chart, copying it from the last render or
+        from a frame cache if a layer with the same key is found in either. If
+        the chart is remembering its layers, the layer is remembered for next
+        time.
+
+        :param SvgRenderer renderer: The renderer to paint to.
+        :param dict previous: The layers remembered from the last render.
+        :param FrameCache frames: The frame cache to use, if any.
+        :param tuple key: The layer's name and everything which affects how it\
+        looks.
+        :param paint: The function which paints the layer. It will be called\
+        with the renderer and any other arguments given.
+        :param \*args: Any other arguments to pass to the painting function."""
+
+        with profiled("canvas", key[0]):
+            fragment = previous.get(key)
+            if fragment is None and frames is not None:
+                fragment = frames.get(key)
+            if fragment is None:
+                fragment = renderer.record(paint, *args)
+                if frames is not None:
+                    frames.put(key, fragment)
+            else:
+                renderer.replay(fragment)
+        if self._layers is not None:
+            self._layers[key] = fragment
+
+
+    def x_tick_points(self):
+        """Returns the (tick, x-coordinate) pairs for the chart's x-ticks.
+
+        :rtype: ``list``"""
+
+        x_tick_series = Series(*[(tick, 0) for tick in self.x_ticks()])
+        x_tick_series._chart = self
+        return [(tick[0], point[0]) for tick, point in zip(
+         x_tick_series.data(), x_tick_series.canvas_points()
+        )]
+
+
+    def y_tick_points(self):
+        """Returns the (tick, y-coordinate) pairs for the chart's y-ticks.
+
+        :rtype: ``list``"""
+
+        y_tick_series = Series(*[(0, tick) for tick in self.y_ticks()])
+        y_tick_series._chart = self
+        return [(tick[1], point[1]) for tick, point in zip(
+         y_tick_series.data(), y_tick_series.canvas_points()
+        )]
+
+
+    def paint_grid(self, renderer):
+        """Paints the chart's grid lines, which sit behind everything else.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        width, height = renderer.width(), renderer.height()
+        horizontal_padding = self.horizontal_padding()
+        vertical_padding = self.vertical_padding()
+        if self.y_grid():
+            for tick, y in reversed(self.y_tick_points()):
+                renderer.line(
+                 width * horizontal_padding, y,
+                 width * (1 - horizontal_padding), y,
+                 line_style="..",
+                 line_color="#333333",
+                 name="ygrid"
+                )
+        if self.x_grid():
+            for tick, x in reversed(self.x_tick_points()):
+                renderer.line(
+                 x, height * (1 - vertical_padding),
+                 x, height * vertical_padding,
+                 line_style="..",
+                 line_color="#333333",
+                 name="xgrid"
+                )
+
+
+    def paint_series(self, renderer):
+        """Paints each of the chart's series in turn.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        for index, (series, points) in enumerate(zip(
+         self.all_series(), self.series_geometry(self.all_series())
+        ), start=1):
+            with profiled("canvas", "series%i" % index):
+                self.write_series(renderer, series, "series%i" % index, points)
+
+
+    def write_series(self, renderer, series, name, points):
+        """Writes one of the chart's series to a renderer, reporting how many
+        points go in and out if there are any :py:mod:`.metrics` hooks.
+
+        :param Renderer renderer: The renderer to paint to.
+        :param Series series: The series to write.
+        :param str name: The name to give the series' graphics.
+        :param tuple points: The series' canvas points, or ``None`` if they\
+        are to be read as the series is written."""
+
+        counting = bool(METRIC_HOOKS)
+        if counting:
+            report("points_in", len(series), series=series.name(), layer=name)
+            if points is None:
+                points = series.canvas_points()
+            points = counted(
+             points, "points_out", series=series.name(), layer=name
+            )
+        series.write_to_canvas(renderer, name, points)
+        if counting and not isinstance(points, (tuple, list)):
+            # Renderers needn't read every point they are given, so any they
+            # left are read here, and the points counted either way
+            for point in points:
+                pass
+
+
+    def paint_masks(self, renderer):
+        """Paints the opaque rectangles which hide anything outside the axes.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        width, height = renderer.width(), renderer.height()
+        horizontal_margin = self.horizontal_padding() * width
+        vertical_margin = self.vertical_padding() * height
+        renderer.rectangle(
+         0, 0, horizontal_margin, height,
          opacity=1,
          line_width=0,
          name="block-w"
         )
-        canvas.add_rectangle(
-         0, 0, canvas.width(), self.vertical_padding() * canvas.height(),
+        renderer.rectangle(
+         0, 0, width, vertical_margin,
          opacity=1,
          line_width=0,
          name="block-n"
         )
-        canvas.add_rectangle(
-         canvas.width() - (self.horizontal_padding() * canvas.width()), 0,
-         self.horizontal_padding() * canvas.width(), canvas.height(),
+        renderer.rectangle(
+         width - horizontal_margin, 0,
+         horizontal_margin, height,
          opacity=1,
          line_width=0,
          name="block-e"
         )
-        canvas.add_rectangle(
-         0, canvas.height() - (self.vertical_padding() * canvas.height()),
-         canvas.width(), self.vertical_padding() * canvas.height(),
+        renderer.rectangle(
+         0, height - vertical_margin,
+         width, vertical_margin,
          opacity=1,
          line_width=0,
          name="block-s"
         )
-        title = canvas.graphics()[0]
-        while canvas.graphics().index(title) != len(canvas.graphics()) - 1:
-            canvas.move_graphic_forward(title)
-        canvas.graphics()[-1].y(self.vertical_padding() * canvas.height() * 0.5)
-        canvas.graphics()[-1].vertical_align("center")
-
-        axes = canvas.add_rectangle(
-         self.horizontal_padding() * canvas.width(),
-         self.vertical_padding() * canvas.height(),
-         canvas.width() - (2 * self.horizontal_padding() * canvas.width()),
-         canvas.height() - (2 * self.vertical_padding() * canvas.height()),
+
+
+    def paint_axes(self, renderer):
+        """Paints the transparent box which outlines the chart's axes.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        width, height = renderer.width(), renderer.height()
+        horizontal_margin = self.horizontal_padding() * width
+        vertical_margin = self.vertical_padding() * height
+        renderer.rectangle(
+         horizontal_margin,
+         vertical_margin,
+         width - (2 * horizontal_margin),
+         height - (2 * vertical_margin),
          name="axes",
          opacity=0
         )
 
+
+    def paint_labels(self, renderer):
+        """Paints the axis labels and the text of each tick.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        width, height = renderer.width(), renderer.height()
+        horizontal_padding = self.horizontal_padding()
+        vertical_padding = self.vertical_padding()
         if self.x_label():
-            canvas.add_text(
-             canvas.width() / 2,
-             canvas.height() - (self.vertical_padding() * canvas.height() * 0.25),
+            renderer.text(
+             width / 2,
+             height - (vertical_padding * height * 0.25),
              self.x_label(),
              name="x_label"
             )
-        y_label_x = self.horizontal_padding() * canvas.width() * 0.25
+        y_label_x = horizontal_padding * width * 0.25
         if self.y_label():
-            canvas.add_text(
+            renderer.text(
              y_label_x,
-             canvas.height() * 0.5,
+             height * 0.5,
              self.y_label(),
-             rotation=(y_label_x, canvas.height() * 0.5, 270),
+             rotation=(y_label_x, height * 0.5, 270),
              name="y_label"
             )
-        x_tick_series = Series(*[(tick, 0) for tick in self.x_ticks()])
-        x_tick_series._chart = self
-        x_tick_points = x_tick_series.canvas_points()
-        for index, tick in enumerate(x_tick_series.data()):
-            canvas.add_text(
-             x_tick_points[index][0],
-             canvas.height() - (self.vertical_padding() * canvas.height() * 0.75),
-             str(tick[0]),
+        for tick, x in self.x_tick_points():
+            renderer.text(
+             x,
+             height - (vertical_padding * height * 0.75),
+             str(tick),
              name="xtick"
             )
-            if self.x_grid():
-                line = canvas.add_line(
-                 x_tick_points[index][0], canvas.height() * (1 - self.vertical_padding()),
-                 x_tick_points[index][0], canvas.height() * self.vertical_padding(),
-                 line_style="..",
-                 line_color="#333333",
-                 name="xgrid"
-                )
-                while canvas.graphics()[0] is not line:
-                    canvas.move_graphic_backward(line)
-        y_tick_series = Series(*[(0, tick) for tick in self.y_ticks()])
-        y_tick_series._chart = self
-        y_tick_points = y_tick_series.canvas_points()
-        for index, tick in enumerate(y_tick_series.data()):
-            canvas.add_text(
-             self.horizontal_padding() * canvas.width() * 0.75,
-             y_tick_points[index][1],
-             str(tick[1]),
+        for tick, y in self.y_tick_points():
+            renderer.text(
+             horizontal_padding * width * 0.75,
+             y,
+             str(tick),
              name="ytick"
             )
-            if self.y_grid():
-                line = canvas.add_line(
-                 canvas.width() * self.horizontal_padding(), y_tick_points[index][1],
-                 canvas.width() * (1 - self.horizontal_padding()), y_tick_points[index][1],
-                 line_style="..",
-                 line_color="#333333",
-                 name="ygrid"
-                )
-                while canvas.graphics()[0] is not line:
-                    canvas.move_graphic_backward(line)
-        return canvas
+
+
+    def paint_title(self, renderer):
+        """Paints the chart's title, centred above the axes.
+
+        :param Renderer renderer: The renderer to paint to."""
+
+        renderer.text(
+         renderer.width() / 2,
+         self.vertical_padding() * renderer.height() * 0.5,
+         self.title(),
+         vertical_align="center",
+         name="title"
+        )
 
 
 
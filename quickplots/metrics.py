@@ -0,0 +1,75 @@
+"""This module contains the instrumentation hooks which quickplots reports
+counters to as it renders, so that they can be fed into other metrics.
+
+A hook is any function which takes the name of a metric, its value, and a
+``dict`` of labels saying what the value is for. The metrics reported are:
+
+* ``"points_in"`` - the number of data points in a series being painted,
+  labelled with the ``series`` name and its ``layer``.
+* ``"points_out"`` - the number of points of that series actually sent to
+  the renderer, after any clipping.
+* ``"graphics"`` - the number of graphics created by a render, labelled with
+  the ``renderer`` class.
+* ``"output_size"`` - the size of a render's output in bytes, with SVG
+  encoded as UTF-8, labelled with the ``renderer`` class.
+* ``"cache_hit"`` and ``"cache_miss"`` - a value of 1 each time a render or
+  frame is or isn't found in a cache, labelled with the ``cache`` class.
+
+When no hooks are added, none of these are even counted."""
+
+HOOKS = []
+
+def add_metrics_hook(hook):
+    """Adds a function to be called with every metric reported.
+
+    :param hook: The function to call, with the metric's name, value and\
+    labels."""
+
+    if not callable(hook):
+        raise TypeError("'%s' is not callable" % str(hook))
+    HOOKS.append(hook)
+
+
+def remove_metrics_hook(hook):
+    """Removes a function added with :py:func:`add_metrics_hook`.
+
+    :param hook: The function to remove.
+    :raises ValueError: if the function was never added."""
+
+    HOOKS.remove(hook)
+
+
+def report(name, value, **labels):
+    """Passes a metric to every hook. Callers should check that ``HOOKS`` is
+    not empty first, so that the value isn't worked out for nothing.
+
+    :param str name: The name of the metric.
+    :param value: The metric's value.
+    :param \*\*labels: What the value is for."""
+
+    for hook in list(HOOKS):
+        hook(name, value, labels)
+
+
+def counted(points, name, **labels):
+    """Passes on the points in an iterable, and reports how many there were
+    once they have all been passed on. Tuples and lists are counted straight
+    away, and returned as they are.
+
+    :param points: The points to count.
+    :param str name: The name of the metric to report.
+    :param \*\*labels: What the count is for.
+    :rtype: ``iterable``"""
+
+    if isinstance(points, (tuple, list)):
+        report(name, len(points), **labels)
+        return points
+    return count_points(points, name, labels)
+
+
+def count_points(points, name, labels):
+    count = 0
+    for point in points:
+        count += 1
+        yield point
+    report(name, count, **labels)
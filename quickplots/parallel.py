@@ -0,0 +1,332 @@
+"""This module contains tools for rendering many charts at once, spread across
+several processes."""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from .charts import Chart, AxisChart
+from .quick import line, scatter
+from .templates import ChartTemplate
+from .spec import loads
+
+FORMATS = ("svg", "svgz", "png")
+
+SPEC_TYPES = {"line": line, "scatter": scatter}
+
+class SharedMemoryTransport:
+    """Puts the data of charts into shared memory, so that it can be passed to
+    other processes without being pickled. Sharing a chart returns a small
+    :py:class:`SharedChart` handle, which can be pickled cheaply and turned
+    back into the chart in any process on the same machine.
+
+    Each chart's data is kept in its own shared memory block, which lasts
+    until the transport is closed. The transport can be used as a context
+    manager, closing it when the block ends::
+
+        with SharedMemoryTransport() as transport:
+            handles = [transport.share(chart) for chart in charts]
+            svgs = render_many(handles, workers=8)"""
+
+    def __init__(self):
+        self._segments = []
+
+
+    def __repr__(self):
+        return "<SharedMemoryTransport (%i blocks)>" % len(self._segments)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def share(self, chart):
+        """Copies a chart's data into a new shared memory block, and returns a
+        handle to it. Any series whose data can't be held exactly in arrays
+        (see :py:meth:`.Series.exact_columns`) are kept in the handle instead.
+
+        :param AxisChart chart: The chart to share.
+        :raises TypeError: if the chart has a streamed series, such as a\
+        :py:class:`.SegmentedSeries`, as its data would have to be read\
+        into memory.
+        :rtype: :py:class:`SharedChart`"""
+
+        if not isinstance(chart, AxisChart):
+            raise TypeError("'%s' is not an AxisChart" % str(chart))
+        for series in chart.all_series():
+            if series.streamed:
+                raise TypeError(
+                 "'%s' is streamed from disk, so can't be shared" % str(series)
+                )
+        layout, columns, size = [], [], 0
+        for series in chart.all_series():
+            exact = series.exact_columns()
+            if exact is None:
+                layout.append(("data", tuple(zip(*series.data()))))
+                continue
+            placements = []
+            for column in exact:
+                placements.append((column.typecode, size, len(column)))
+                columns.append((size, column))
+                size += len(column) * column.itemsize
+            layout.append(("shared", placements))
+        segment = SharedMemory(create=True, size=max(size, 1))
+        self._segments.append(segment)
+        for offset, column in columns:
+            data = memoryview(column).cast("B")
+            segment.buf[offset:offset + len(data)] = data
+        return SharedChart(ChartTemplate(chart), segment.name, layout)
+
+
+    def close(self):
+        """Frees every shared memory block the transport has created. Handles
+        to them can no longer be used."""
+
+        for segment in self._segments:
+            segment.close()
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+        self._segments = []
+
+
+
+class SharedChart:
+    """A handle to a chart whose data is in shared memory, as created by
+    :py:meth:`SharedMemoryTransport.share`. It holds the chart's configuration
+    and the location of each series' data, but not the data itself.
+
+    :param ChartTemplate template: The chart's configuration.
+    :param str segment: The name of the shared memory block.
+    :param list layout: For each series, either ``("shared", placements)``\
+    with the typecode, offset and length of its two columns, or\
+    ``("data", columns)`` with its data if it isn't in shared memory."""
+
+    def __init__(self, template, segment, layout):
+        self._template = template
+        self._segment = segment
+        self._layout = layout
+
+
+    def __repr__(self):
+        return "<SharedChart '%s'>" % self._segment
+
+
+    def chart(self):
+        """Attaches to the shared memory block and rebuilds the chart from it.
+
+        :rtype: :py:class:`.AxisChart`"""
+
+        segment = SharedMemory(name=self._segment)
+        try:
+            buffer = segment.buf
+            data, views = [], []
+            for kind, placements in self._layout:
+                if kind == "data":
+                    data.append(placements)
+                    continue
+                columns = []
+                for typecode, offset, length in placements:
+                    view = buffer[offset:offset + length * 8].cast(typecode)
+                    views.append(view)
+                    columns.append(view)
+                data.append(columns)
+            chart = self._template.bind(*data)
+            for view in views:
+                view.release()
+            del buffer
+        finally:
+            segment.close()
+        return chart
+
+
+
+def render_many(charts, workers=None, output=None, format="svg",
+ chunksize=None, shared=False, **kwargs):
+    """Renders a batch of charts in a pool of worker processes, and returns the
+    results in the same order as the charts were given.
+
+    Each chart can be a :py:class:`.Chart` or a spec - a ``dict`` with a
+    ``type`` of ``"line"`` or ``"scatter"``, a ``data`` list of the positional
+    arguments for :py:func:`.line` or :py:func:`.scatter`, and any of their
+    keyword arguments. A chart can also be given as a binary spec created by
+    :py:func:`.spec.dumps`. Specs are much cheaper to send to the workers
+    than charts.
+
+    Charts are sent to the workers in chunks, to keep the cost of passing them
+    between processes down. If a chart can't be rendered, the exception it
+    raised is returned in its place, and the rest of the batch carries on. If
+    a chart kills the worker rendering it, the charts which hadn't finished
+    yet are retried one at a time in a new process, and the one which kills
+    it again has the :py:class:`BrokenProcessPool` error in its place.
+
+    Any other keyword arguments are passed on to the renderer.
+
+    :param charts: The charts and specs to render.
+    :param int workers: The number of processes to use. By default this is the\
+    number of CPUs. If it is ``1``, the charts are rendered in this process.
+    :param str output: If given, each chart is saved to a file in this\
+    directory, named by its position in the batch, and the file's path is\
+    returned in place of its contents.
+    :param str format: ``"svg"``, ``"svgz"`` or ``"png"``.
+    :param int chunksize: The number of charts to send to a worker at a time.\
+    By default the charts are split into about four chunks per worker.
+    :param bool shared: If ``True``, the data of each :py:class:`.AxisChart`\
+    is sent to the workers through shared memory with a\
+    :py:class:`SharedMemoryTransport`, rather than being pickled. Charts with\
+    streamed series are still pickled, as only the location of those\
+    series' data is.
+    :raises ValueError: if the format is not recognised.
+    :rtype: ``list``"""
+
+    if format not in FORMATS:
+        raise ValueError("'%s' is not a valid format" % str(format))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int):
+        raise TypeError("workers must be int, not '%s'" % str(workers))
+    if workers < 1:
+        raise ValueError("workers must be positive, not %i" % workers)
+    if output is not None:
+        if not isinstance(output, str):
+            raise TypeError("output must be str, not '%s'" % str(output))
+        os.makedirs(output, exist_ok=True)
+    jobs = list(enumerate(charts))
+    if chunksize is None:
+        chunksize = max(1, -(-len(jobs) // (workers * 4)))
+    if not isinstance(chunksize, int):
+        raise TypeError("chunksize must be int, not '%s'" % str(chunksize))
+    if chunksize < 1:
+        raise ValueError("chunksize must be positive, not %i" % chunksize)
+    if workers == 1:
+        return render_chunk(jobs, output, format, kwargs)
+    chunks = [jobs[start:start + chunksize] for start in range(
+     0, len(jobs), chunksize
+    )]
+    results = []
+    with SharedMemoryTransport() as transport:
+        if shared:
+            chunks = [[(index, transport.share(chart) if isinstance(
+             chart, AxisChart
+            ) and not any(
+             series.streamed for series in chart.all_series()
+            ) else chart) for index, chart in chunk] for chunk in chunks]
+        pool = executor = ProcessPoolExecutor(workers)
+        try:
+            futures = [pool.submit(
+             render_chunk, chunk, output, format, kwargs
+            ) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    results += future.result()
+                    continue
+                except BrokenProcessPool:
+                    # Every chunk which hadn't finished is lost with the pool
+                    if executor is pool:
+                        executor = ProcessPoolExecutor(1)
+                except Exception:
+                    pass
+                chunk_results, executor = retry_chunk(
+                 executor, chunk, output, format, kwargs
+                )
+                results += chunk_results
+        finally:
+            pool.shutdown()
+            executor.shutdown()
+    return results
+
+
+def retry_chunk(executor, chunk, output, format, kwargs):
+    """Renders the charts of a chunk which failed as a whole (because one of
+    them couldn't be sent to a worker, or killed it, for example) one at a
+    time, so that only the charts which actually fail are lost. If a chart
+    kills its worker, the pool is replaced with a new one for the rest.
+
+    :returns: The chunk's results, and the pool to carry on with.
+    :rtype: ``tuple``"""
+
+    results = []
+    for job in chunk:
+        try:
+            results += executor.submit(
+             render_chunk, [job], output, format, kwargs
+            ).result()
+        except BrokenProcessPool as e:
+            results.append(e)
+            executor.shutdown()
+            executor = ProcessPoolExecutor(1)
+        except Exception as e:
+            results.append(e)
+    return results, executor
+
+
+def render_chunk(jobs, output, format, kwargs):
+    """Renders a chunk of charts. This is what runs in each worker process.
+
+    :param list jobs: The (position, chart or spec) pairs to render.
+    :param str output: The directory to save the charts to, if any.
+    :param str format: The format to render the charts in.
+    :param dict kwargs: The renderer's keyword arguments.
+    :rtype: ``list``"""
+
+    results = []
+    for index, chart in jobs:
+        try:
+            chart = build_chart(chart)
+            if output is None:
+                results.append(render_chart(chart, format, kwargs))
+            else:
+                path = os.path.join(output, "chart%i.%s" % (index, format))
+                chart.save(path, **kwargs)
+                results.append(path)
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def build_chart(spec):
+    """Turns a chart spec into a chart. Charts are returned as they are,
+    :py:class:`SharedChart` handles are attached to, and binary specs (see
+    :py:mod:`.spec`) are loaded.
+
+    :param spec: The :py:class:`.Chart`, :py:class:`SharedChart`, spec\
+    ``dict`` or binary spec.
+    :raises TypeError: if given anything else.
+    :rtype: :py:class:`.Chart`"""
+
+    if isinstance(spec, Chart):
+        return spec
+    if isinstance(spec, SharedChart):
+        return spec.chart()
+    if isinstance(spec, bytes):
+        return loads(spec)
+    if not isinstance(spec, dict):
+        raise TypeError("'%s' is not a Chart or spec" % str(spec))
+    kwargs = dict(spec)
+    chart_type = kwargs.pop("type", "line")
+    if chart_type not in SPEC_TYPES:
+        raise ValueError("'%s' is not a valid chart type" % str(chart_type))
+    return SPEC_TYPES[chart_type](*kwargs.pop("data", ()), **kwargs)
+
+
+def render_chart(chart, format, kwargs):
+    """Renders a chart in the given format and returns the result.
+
+    :param Chart chart: The chart to render.
+    :param str format: ``"svg"``, ``"svgz"`` or ``"png"``.
+    :param dict kwargs: The renderer's keyword arguments.
+    :rtype: ``str`` or ``bytes``"""
+
+    if format == "svg":
+        return chart.to_svg(**kwargs)
+    if format == "png":
+        return chart.to_png(**kwargs)
+    compressed = io.BytesIO()
+    chart.write_svgz(compressed, **kwargs)
+    return compressed.getvalue()
@@ -0,0 +1,509 @@
+"""This module contains the PngRenderer, which draws charts into an in-memory
+grid of pixels and encodes them as PNG, using nothing but the standard
+library."""
+
+import math
+import struct
+import zlib
+from .renderers import Renderer
+
+FONT = {char: bytes.fromhex(rows) for char, rows in {
+ "0": "0E11131519110E", "1": "040C040404040E", "2": "0E11010204081F",
+ "3": "1F02040201110E", "4": "02060A121F0202", "5": "1F101E0101110E",
+ "6": "0608101E11110E", "7": "1F010204080808", "8": "0E11110E11110E",
+ "9": "0E11110F01020C", "A": "0E1111111F1111", "B": "1E11111E11111E",
+ "C": "0E11101010110E", "D": "1C12111111121C", "E": "1F10101E10101F",
+ "F": "1F10101E101010", "G": "0E11101711110F",
+ "H": "1111111F111111", "I": "0E04040404040E", "J": "0702020202120C",
+ "K": "11121418141211", "L": "1010101010101F", "M": "111B1515111111",
+ "N": "11111915131111", "O": "0E11111111110E", "P": "1E11111E101010",
+ "Q": "0E11111115120D", "R": "1E11111E141211", "S": "0F10100E01011E",
+ "T": "1F040404040404", "U": "1111111111110E", "V": "11111111110A04",
+ "W": "1111111515150A", "X": "11110A040A1111", "Y": "1111110A040404",
+ "Z": "1F01020408101F", " ": "00000000000000", ".": "00000000000C0C",
+ ",": "000000000C0408", "-": "0000001F000000", "+": "0004041F040400",
+ "(": "02040808080402", ")": "08040202020408", ":": "000C0C000C0C00",
+ "/": "00010204081000", "%": "18190204081303", "=": "00001F001F0000",
+ "_": "0000000000001F", "?": "0E110102040004", "!": "04040404040004"
+}.items()}
+
+UNKNOWN_GLYPH = bytes.fromhex("1F11111111111F")
+
+GLYPH_WIDTH, GLYPH_HEIGHT = 5, 7
+
+DASH_PATTERNS = {"-": None, "--": (10, 5), "..": (1, 2)}
+
+class PngRenderer(Renderer):
+    """Base class: :py:class:`.Renderer`
+
+    Renders charts as PNG images. Shapes are drawn straight into an RGBA pixel
+    buffer, so the memory needed depends on the size of the image rather than
+    the amount of data. Lines are drawn a pixel column at a time - the points
+    which fall in the same column are collapsed into one vertical run first -
+    so the pixels filled for a line depend on the image's size, and only
+    converting its points to pixel coordinates grows with the data. Lines of
+    more than about fifty thousand points render faster as PNG than as SVG.
+    Markers are still stamped one at a time.
+
+    Text is drawn with a small built-in bitmap font, lower-case letters are
+    drawn as capitals, and rotations are only applied to text.
+
+    :param output: A binary file-like object to write the PNG to. If not\
+    given, the PNG is returned as ``bytes`` when the render finishes.
+    :param str background: The hex colour of the image's background, or\
+    ``None`` for a transparent background.
+    :param int compresslevel: The zlib compression level, from 0 to 9."""
+
+    def __init__(self, output=None, background="#FFFFFF", compresslevel=6):
+        Renderer.__init__(self)
+        if output is not None and not hasattr(output, "write"):
+            raise TypeError("output must be writable, not '%s'" % str(output))
+        self._output = output
+        self._background = (
+         (0, 0, 0, 0) if background is None else parse_color(background)
+        )
+        if not isinstance(compresslevel, int):
+            raise TypeError(
+             "compresslevel must be int, not '%s'" % str(compresslevel)
+            )
+        if not 0 <= compresslevel <= 9:
+            raise ValueError(
+             "compresslevel must be between 0 and 9, not %i" % compresslevel
+            )
+        self._compresslevel = compresslevel
+        self._pixels = None
+        self._graphic_count = 0
+        self._size = None
+
+
+    def pixels(self):
+        """Returns the RGBA pixel buffer being drawn to - four bytes per pixel,
+        row by row from the top left.
+
+        :rtype: ``bytearray``"""
+
+        return self._pixels
+
+
+    def pixel(self, x, y):
+        """Returns the RGBA colour of a single pixel.
+
+        :param int x: The pixel's column.
+        :param int y: The pixel's row.
+        :rtype: ``tuple``"""
+
+        index = ((y * self._width) + x) * 4
+        return tuple(self._pixels[index:index + 4])
+
+
+    def graphic_count(self):
+        """The number of shapes drawn so far, counting each marker separately.
+
+        :rtype: ``int``"""
+
+        return self._graphic_count
+
+
+    def result_type(self):
+        return bytes if self._output is None else None
+
+
+    def output_size(self):
+        """The number of bytes in the last PNG produced.
+
+        :rtype: ``int``"""
+
+        return self._size
+
+
+    def begin(self, width, height):
+        Renderer.begin(self, width, height)
+        self._pixels = bytearray(
+         bytes(self._background) * (self._width * self._height)
+        )
+        self._graphic_count = 0
+        self._size = None
+
+
+    def finish(self):
+        png = encode_png(
+         self._pixels, self._width, self._height, self._compresslevel
+        )
+        self._pixels = None
+        self._size = len(png)
+        if self._output is None:
+            return png
+        self._output.write(png)
+
+
+    def fill_span(self, y, x1, x2, color):
+        """Fills the pixels of one row from ``x1`` up to (but not including)
+        ``x2``. Everything else is ultimately drawn with this.
+
+        :param int y: The row.
+        :param int x1: The first column.
+        :param int x2: The column after the last.
+        :param tuple color: The RGBA colour to fill with."""
+
+        if not 0 <= y < self._height:
+            return
+        x1, x2 = max(x1, 0), min(x2, self._width)
+        if x1 >= x2:
+            return
+        start, end = ((y * self._width) + x1) * 4, ((y * self._width) + x2) * 4
+        if color[3] == 255:
+            self._pixels[start:end] = bytes(color) * (x2 - x1)
+        elif color[3]:
+            alpha = color[3] / 255
+            pixels = self._pixels
+            for index in range(start, end, 4):
+                for channel in range(3):
+                    pixels[index + channel] = round(
+                     (color[channel] * alpha)
+                     + (pixels[index + channel] * (1 - alpha))
+                    )
+                pixels[index + 3] = max(pixels[index + 3], color[3])
+
+
+    def fill_column(self, x, y1, y2, color):
+        """Fills the pixels of one column from ``y1`` down to (but not
+        including) ``y2``. Opaque colours are written a channel at a time with
+        one slice assignment each, rather than a row at a time.
+
+        :param int x: The column.
+        :param int y1: The first row.
+        :param int y2: The row after the last.
+        :param tuple color: The RGBA colour to fill with."""
+
+        if not 0 <= x < self._width:
+            return
+        y1, y2 = max(y1, 0), min(y2, self._height)
+        if y1 >= y2:
+            return
+        if color[3] != 255:
+            for row in range(y1, y2):
+                self.fill_span(row, x, x + 1, color)
+            return
+        stride, count = self._width * 4, y2 - y1
+        start = ((y1 * self._width) + x) * 4
+        end = start + (stride * (count - 1)) + 4
+        for channel in range(4):
+            self._pixels[start + channel:end:stride] = bytes(
+             (color[channel],)
+            ) * count
+
+
+    def fill_box(self, x, y, width, height, color):
+        """Fills a rectangle of whole pixels, a column at a time if it is
+        taller than it is wide and a row at a time otherwise.
+
+        :param int x: The left-most column.
+        :param int y: The top row.
+        :param int width: The number of columns.
+        :param int height: The number of rows.
+        :param tuple color: The RGBA colour to fill with."""
+
+        if height > width and color[3] == 255:
+            for column in range(max(x, 0), min(x + width, self._width)):
+                self.fill_column(column, y, y + height, color)
+        else:
+            for row in range(max(y, 0), min(y + height, self._height)):
+                self.fill_span(row, x, x + width, color)
+
+
+    def stroke(self, x1, y1, x2, y2, width, color, dashes=None, offset=0):
+        """Draws a straight stroke of a given width. Solid strokes are filled
+        as one run of pixels per row (or per column, if the stroke is steep),
+        while dashed strokes are drawn one pixel-step at a time so that they
+        can follow the dash pattern.
+
+        Each row's run covers the pixels the stroke passes through within
+        that row, and runs end where the next row's begin, so a one pixel
+        stroke is one pixel wide at any angle. Both end points are drawn, and
+        wider strokes are squared off half their width beyond them, so that
+        the segments of a polyline join without notches.
+
+        :param width: The width of the stroke in pixels.
+        :param tuple color: The RGBA colour of the stroke.
+        :param tuple dashes: The (on, off) lengths of the dash pattern.
+        :param int offset: How far along the dash pattern the stroke starts.
+        :returns: How far along the dash pattern the stroke finishes."""
+
+        steps = max(
+         abs(pixel(x2) - pixel(x1)), abs(pixel(y2) - pixel(y1)), 1
+        )
+        brush = max(round(width), 1)
+        corner = brush // 2
+        if not dashes:
+            steep = abs(y2 - y1) > abs(x2 - x1)
+            if steep:
+                x1, y1, x2, y2 = y1, x1, y2, x2
+            if y1 > y2:
+                x1, y1, x2, y2 = x2, y2, x1, y1
+            first_row, last_row = pixel(y1), pixel(y2)
+            for row in range(first_row, last_row + 1):
+                if y1 == y2:
+                    run = (x1, x2)
+                else:
+                    run = [x1 + ((x2 - x1) * (
+                     min(max(edge, y1), y2) - y1
+                    ) / (y2 - y1)) for edge in (row - 0.5, row + 0.5)]
+                start, end = pixel(min(run)), pixel(max(run))
+                # The end points' pixels are included, and where the run meets
+                # the next row's is left to that row
+                for x, y in ((x1, y1), (x2, y2)):
+                    if pixel(y) == row:
+                        start = min(start, pixel(x))
+                        end = max(end, pixel(x) + 1)
+                if steep:
+                    self.fill_box(
+                     row - corner, start - corner,
+                     brush, end - start + brush - 1, color
+                    )
+                else:
+                    self.fill_box(
+                     start - corner, row - corner,
+                     end - start + brush - 1, brush, color
+                    )
+            return offset + steps
+        for step in range(steps + 1):
+            if dashes and (offset + step) % sum(dashes) >= dashes[0]:
+                continue
+            x = pixel(x1 + ((x2 - x1) * step / steps)) - corner
+            y = pixel(y1 + ((y2 - y1) * step / steps)) - corner
+            if brush == 1:
+                self.fill_span(y, x, x + 1, color)
+            else:
+                self.fill_box(x, y, brush, brush, color)
+        return offset + steps
+
+
+    def line(self, x1, y1, x2, y2, name=None, line_width=1, line_style="-",
+     line_color="#000000", rotation=(0, 0, 0)):
+        self._graphic_count += 1
+        if line_width:
+            self.stroke(
+             x1, y1, x2, y2, line_width, parse_color(line_color),
+             dash_pattern(line_style, line_width)
+            )
+
+
+    def polyline(self, points, name=None, line_width=1, line_style="-",
+     line_color="#000000", rotation=(0, 0, 0)):
+        self._graphic_count += 1
+        if not line_width:
+            return
+        color = parse_color(line_color)
+        dashes = dash_pattern(line_style, line_width)
+        offset, previous = 0, None
+        for column, first, last, low, high in column_runs(points):
+            if previous is not None:
+                offset = self.stroke(
+                 *previous, *first, line_width, color, dashes, offset
+                )
+            if low != high:
+                offset = self.stroke(
+                 column, low, column, high, line_width, color, dashes, offset
+                )
+            previous = last
+
+
+    def markers(self, points, size, name=None, fill_color="#FFFFFF", opacity=1,
+     line_width=1, line_style="-", line_color="#000000", rotation=(0, 0, 0)):
+        fill = parse_color(fill_color, opacity)
+        edge = parse_color(line_color)
+        radius = size / 2
+        outer_spans = disc_spans(radius + (line_width / 2))
+        inner_spans = disc_spans(max(radius - (line_width / 2), 0))
+        for x, y in points:
+            self._graphic_count += 1
+            row = pixel(y)
+            if line_width:
+                for offset, half_width in outer_spans:
+                    self.fill_span(
+                     row + offset,
+                     pixel(x - half_width), pixel(x + half_width) + 1, edge
+                    )
+            if fill[3]:
+                for offset, half_width in inner_spans:
+                    self.fill_span(
+                     row + offset,
+                     pixel(x - half_width), pixel(x + half_width) + 1, fill
+                    )
+
+
+    def rectangle(self, x, y, width, height, name=None, fill_color="#FFFFFF",
+     opacity=1, line_width=1, line_style="-", line_color="#000000",
+     rotation=(0, 0, 0)):
+        self._graphic_count += 1
+        fill = parse_color(fill_color, opacity)
+        if fill[3]:
+            self.fill_box(
+             pixel(x), pixel(y),
+             pixel(x + width) - pixel(x), pixel(y + height) - pixel(y),
+             fill
+            )
+        if line_width:
+            color = parse_color(line_color)
+            dashes = dash_pattern(line_style, line_width)
+            corners = ((x, y), (x + width, y), (x + width, y + height),
+             (x, y + height), (x, y))
+            for start, end in zip(corners, corners[1:]):
+                self.stroke(*start, *end, line_width, color, dashes)
+
+
+    def text(self, x, y, text, name=None, font_size=18, fill_color="#000000",
+     opacity=1, line_width=0, line_style="-", line_color="#000000",
+     horizontal_align="center", vertical_align="center", rotation=(0, 0, 0)):
+        self._graphic_count += 1
+        text = str(text).upper()
+        color = parse_color(fill_color, opacity)
+        scale = max(round(font_size / 9), 1)
+        width = ((len(text) * (GLYPH_WIDTH + 1)) - 1) * scale
+        height = GLYPH_HEIGHT * scale
+        left = x - {"left": width, "center": width / 2, "right": 0}[horizontal_align]
+        top = y - {"top": height, "center": height / 2, "bottom": 0}[vertical_align]
+        left, top = round(left), round(top)
+        angle = math.radians(rotation[2])
+        cos, sin = math.cos(angle), math.sin(angle)
+        for index, char in enumerate(text):
+            glyph = FONT.get(char, UNKNOWN_GLYPH)
+            glyph_left = left + (index * (GLYPH_WIDTH + 1) * scale)
+            for row, bits in enumerate(glyph):
+                for column in range(GLYPH_WIDTH):
+                    if not bits & (0x10 >> column):
+                        continue
+                    cell_x = glyph_left + (column * scale)
+                    cell_y = top + (row * scale)
+                    if not rotation[2]:
+                        self.fill_box(cell_x, cell_y, scale, scale, color)
+                        continue
+                    for dy in range(scale):
+                        for dx in range(scale):
+                            px = cell_x + dx - rotation[0]
+                            py = cell_y + dy - rotation[1]
+                            rotated_x = round(rotation[0] + (px * cos) - (py * sin))
+                            rotated_y = round(rotation[1] + (px * sin) + (py * cos))
+                            self.fill_span(
+                             rotated_y, rotated_x, rotated_x + 1, color
+                            )
+
+
+
+def parse_color(color, opacity=1):
+    """Turns a hex colour string and an opacity into an RGBA tuple.
+
+    :param str color: The colour, in the form ``#RRGGBB``.
+    :param opacity: The opacity, from 0 to 1.
+    :rtype: ``tuple``"""
+
+    if not isinstance(color, str):
+        raise TypeError("color must be str, not '%s'" % str(color))
+    if len(color) != 7 or color[0] != "#":
+        raise ValueError("'%s' is not a valid color" % color)
+    return (
+     int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16),
+     round(opacity * 255)
+    )
+
+
+def dash_pattern(line_style, line_width):
+    """Returns the (on, off) lengths in pixels of a line style, or ``None`` for
+    solid lines.
+
+    :param str line_style: The line style.
+    :param line_width: The width of the line.
+    :rtype: ``tuple``"""
+
+    pattern = DASH_PATTERNS[line_style]
+    if pattern:
+        return tuple(max(round(length * line_width), 1) for length in pattern)
+
+
+def pixel(coordinate):
+    """Returns the pixel a coordinate falls in. Pixel ``n`` covers everything
+    from ``n - 0.5`` up to (but not including) ``n + 0.5``, so halves always
+    round up, rather than to the nearest even pixel as ``round`` would.
+
+    :param coordinate: The coordinate.
+    :rtype: ``int``"""
+
+    return math.floor(coordinate + 0.5)
+
+
+def column_runs(points):
+    """Collapses consecutive points which fall in the same pixel column into
+    one run, so that a line through many more points than there are columns
+    can be drawn as one vertical stroke per column, joined by strokes from
+    the last point of one run to the first point of the next. Each run is
+    given as (column, first point, last point, lowest y, highest y).
+
+    :param points: The (x, y) points of the line.
+    :rtype: ``generator``"""
+
+    column = first = last = low = high = None
+    for point in points:
+        x, y = point[0], point[1]
+        if pixel(x) != column:
+            if column is not None:
+                yield column, first, last, low, high
+            column, first, low, high = pixel(x), (x, y), y, y
+        elif y < low:
+            low = y
+        elif y > high:
+            high = y
+        last = (x, y)
+    if column is not None:
+        yield column, first, last, low, high
+
+
+def disc_spans(radius):
+    """Works out the rows of a filled circle, as (row offset, half width) pairs.
+    Markers are stamped with these, so they only need working out once per
+    series.
+
+    :param radius: The circle's radius.
+    :rtype: ``tuple``"""
+
+    extent = math.floor(radius)
+    return tuple(
+     (offset, math.sqrt(max((radius ** 2) - (offset ** 2), 0)))
+     for offset in range(-extent, extent + 1)
+    )
+
+
+def encode_png(pixels, width, height, compresslevel=6):
+    """Encodes an RGBA pixel buffer as a PNG file.
+
+    :param bytearray pixels: The pixels, four bytes each, row by row.
+    :param int width: The image's width.
+    :param int height: The image's height.
+    :param int compresslevel: The zlib compression level.
+    :rtype: ``bytes``"""
+
+    stride = width * 4
+    compressor = zlib.compressobj(compresslevel)
+    data = []
+    for row in range(height):
+        data.append(compressor.compress(b"\x00"))
+        data.append(compressor.compress(pixels[row * stride:(row + 1) * stride]))
+    data.append(compressor.flush())
+    return b"".join((
+     b"\x89PNG\r\n\x1a\n",
+     png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+     png_chunk(b"IDAT", b"".join(data)),
+     png_chunk(b"IEND", b"")
+    ))
+
+
+def png_chunk(kind, data):
+    """Wraps some data in a PNG chunk.
+
+    :param bytes kind: The four letter chunk type.
+    :param bytes data: The chunk's contents.
+    :rtype: ``bytes``"""
+
+    return b"".join((
+     struct.pack(">I", len(data)), kind, data,
+     struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+    ))
@@ -0,0 +1,229 @@
+"""This module contains the tools for profiling renders - timing each phase of
+painting and serialising a chart, and optionally measuring the memory each
+phase allocates.
+
+Renders can be profiled in two ways. Renders made inside a :py:func:`profile`
+block are recorded in the :py:class:`RenderProfile` it yields::
+
+    with profile(memory=True) as p:
+        chart.to_svg()
+    print(p.report())
+
+Alternatively, a hook added with :py:func:`add_profile_hook` is called with a
+:py:class:`RenderProfile` of every render made anywhere, which is useful for
+feeding render timings into other metrics. When there is no hook and no
+:py:func:`profile` block, nothing is recorded and renders are not slowed
+down."""
+
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+ACTIVE = ContextVar("quickplots_profile", default=None)
+
+HOOKS = []
+
+NOT_PROFILING = nullcontext()
+
+class RenderProfile:
+    """A record of how long each phase of one or more renders took, and how
+    much memory it allocated if memory is being measured.
+
+    The phases are ``"limits"`` (resolving the axis limits), ``"ticks"``
+    (generating the ticks), ``"transform"`` (converting each series' data
+    into canvas coordinates), ``"canvas"`` (drawing each layer of the chart
+    to the renderer) and ``"serialization"`` (the renderer producing its
+    output). Each record also has a target - the layer or series the phase
+    was for, if any.
+
+    :param bool memory: If ``True``, the memory allocated in each phase is\
+    measured with ``tracemalloc``. This slows rendering down a great deal."""
+
+    def __init__(self, memory=False):
+        if not isinstance(memory, bool):
+            raise TypeError("memory must be boolean, not '%s'" % str(memory))
+        self._memory = memory
+        self._phases = []
+
+
+    def __repr__(self):
+        return "<RenderProfile (%i phases, %.3fs)>" % (
+         len(self._phases), self.seconds()
+        )
+
+
+    def memory(self):
+        """Returns whether the profile measures the memory of each phase.
+
+        :rtype: ``bool``"""
+
+        return self._memory
+
+
+    @contextmanager
+    def phase(self, name, target=None):
+        """Records the time taken (and memory allocated) by the code inside
+        the ``with`` block as a phase.
+
+        :param str name: The name of the phase.
+        :param str target: The layer or series the phase is for, if any."""
+
+        measure = self._memory and tracemalloc.is_tracing()
+        if measure:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            record = {
+             "phase": name, "target": target, "seconds": seconds,
+             "allocated": None, "peak": None
+            }
+            if measure:
+                current, peak = tracemalloc.get_traced_memory()
+                record["allocated"] = current - before
+                record["peak"] = peak - before
+            self._phases.append(record)
+
+
+    def phases(self):
+        """Returns a ``dict`` for each phase recorded, in the order they
+        ended, with the phase's ``phase`` name, ``target``, ``seconds``,
+        ``allocated`` bytes still held at its end, and ``peak`` bytes held at
+        once during it. The memory values are ``None`` if memory is not being
+        measured.
+
+        :rtype: ``list``"""
+
+        return [dict(record) for record in self._phases]
+
+
+    def totals(self):
+        """Returns the total number of seconds spent in each phase.
+
+        :rtype: ``dict``"""
+
+        totals = {}
+        for record in self._phases:
+            totals[record["phase"]] = totals.get(
+             record["phase"], 0
+            ) + record["seconds"]
+        return totals
+
+
+    def seconds(self):
+        """Returns the total number of seconds spent in all phases.
+
+        :rtype: ``float``"""
+
+        return sum(record["seconds"] for record in self._phases)
+
+
+    def report(self):
+        """Returns everything recorded as a ``dict`` of plain values, which
+        can be converted to JSON - the total ``seconds``, the ``totals`` for
+        each phase, and the full list of ``phases``.
+
+        :rtype: ``dict``"""
+
+        return {
+         "seconds": self.seconds(),
+         "totals": self.totals(),
+         "phases": self.phases()
+        }
+
+
+    def extend(self, profile):
+        """Adds the phases recorded by another profile to this one.
+
+        :param RenderProfile profile: The profile to add."""
+
+        self._phases += profile._phases
+
+
+
+@contextmanager
+def profile(memory=False, callback=None):
+    """Profiles every render made inside the ``with`` block, in the current
+    thread or asyncio task, and yields the :py:class:`RenderProfile` they are
+    recorded in. Renders run in executors, such as by
+    :py:meth:`.Chart.render_async`, are not included.
+
+    :param bool memory: If ``True``, the memory allocated in each phase is\
+    measured too, with ``tracemalloc`` being started if it isn't already.
+    :param callback: If given, this is called with the profile when the\
+    block ends."""
+
+    recorded = RenderProfile(memory)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    token = ACTIVE.set(recorded)
+    try:
+        yield recorded
+    finally:
+        ACTIVE.reset(token)
+        if started:
+            tracemalloc.stop()
+        if callback is not None:
+            callback(recorded)
+
+
+def add_profile_hook(hook):
+    """Adds a function to be called with a :py:class:`RenderProfile` of every
+    render, as soon as it finishes.
+
+    :param hook: The function to call."""
+
+    if not callable(hook):
+        raise TypeError("'%s' is not callable" % str(hook))
+    HOOKS.append(hook)
+
+
+def remove_profile_hook(hook):
+    """Removes a function added with :py:func:`add_profile_hook`.
+
+    :param hook: The function to remove.
+    :raises ValueError: if the function was never added."""
+
+    HOOKS.remove(hook)
+
+
+@contextmanager
+def profiling_render():
+    """Profiles a single render, if anything wants it to be profiled. While
+    the ``with`` block runs, :py:func:`profiled` phases are recorded in a new
+    :py:class:`RenderProfile`, which is then passed to every hook and added
+    to the enclosing :py:func:`profile`, if there is one."""
+
+    enclosing = ACTIVE.get()
+    if enclosing is None and not HOOKS:
+        yield
+        return
+    recorded = RenderProfile(enclosing is not None and enclosing.memory())
+    token = ACTIVE.set(recorded)
+    try:
+        yield
+    finally:
+        ACTIVE.reset(token)
+        if enclosing is not None:
+            enclosing.extend(recorded)
+        for hook in list(HOOKS):
+            hook(recorded)
+
+
+def profiled(name, target=None):
+    """Returns a context manager which records the code inside it as a phase
+    of the render being profiled, or does nothing if the render is not being
+    profiled.
+
+    :param str name: The name of the phase.
+    :param str target: The layer or series the phase is for, if any."""
+
+    recorded = ACTIVE.get()
+    if recorded is None:
+        return NOT_PROFILING
+    return recorded.phase(name, target)
@@ -0,0 +1,315 @@
+"""This module contains chunked reductions, which summarise long sequences of
+values - their extent, histograms, density grids and the buckets used to
+decimate a line. The values are split into chunks, each chunk is reduced on
+its own, and the partial results are then combined. Very long sequences can
+have their chunks reduced in parallel, in a shared pool of workers. The pool
+is one of threads only when Python is running without a GIL - otherwise
+threads can't reduce chunks at the same time, so it is a pool of processes
+instead.
+
+Processes are only worth sending values which are already in arrays, so with
+a GIL, only reductions of arrays are ever split across workers. Series keep
+their data as lists, so their :py:meth:`~.Series.y_extent` is only found in
+parallel when Python is running without a GIL. The other reductions are
+never used by charts themselves - they are for summarising data, such as the
+arrays from :py:meth:`.Series.columns`, before it is plotted."""
+
+import os
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, reduce
+from multiprocessing import parent_process
+
+CHUNK_SIZE = 1 << 20
+
+PARALLEL_THRESHOLD = 1 << 22
+
+POOLS = {}
+
+POOL_LOCK = threading.Lock()
+
+def reduce_chunks(function, combine, *columns, chunk_size=CHUNK_SIZE,
+ workers=1):
+    """Splits one or more equally long sequences into chunks at the same
+    places, reduces each chunk with a function, and combines the results in
+    order.
+
+    The chunks are only reduced separately if there is more than one worker
+    and the sequences are longer than ``PARALLEL_THRESHOLD``, in which case
+    they are reduced in a shared :py:func:`worker_pool`, and the function must
+    be picklable - a module level function, or a ``partial`` of one. If the
+    pool is of processes, the sequences must also already be arrays, which
+    are cheap to send to them - packing a list into an array takes longer
+    than most reductions of it. Otherwise the sequences are reduced in one
+    go, which gives the same result.
+
+    :param function: The function to reduce each chunk with. It is called\
+    with a chunk of each sequence in turn.
+    :param combine: The function which combines two partial results.
+    :param \*columns: The sequences to reduce.
+    :param int chunk_size: The number of values in each chunk.
+    :param int workers: The number of workers to use.
+    :raises ValueError: if the sequences are empty or of unequal length."""
+
+    length = len(columns[0])
+    if any(len(column) != length for column in columns):
+        raise ValueError("Cannot reduce sequences of unequal length")
+    if length == 0:
+        raise ValueError("Cannot reduce an empty sequence")
+    if workers == 1 or length <= max(PARALLEL_THRESHOLD, chunk_size):
+        # Reducing everything at once gives the same result with no copying
+        return function(*columns)
+    pool = worker_pool(workers)
+    if pool is None or (isinstance(pool, ProcessPoolExecutor) and not all(
+     isinstance(column, array) for column in columns
+    )):
+        return function(*columns)
+    chunks = [
+     [column[start:start + chunk_size] for column in columns]
+      for start in range(0, length, chunk_size)
+    ]
+    results = pool.map(function, *zip(*chunks))
+    return reduce(combine, results)
+
+
+def extent(values, **kwargs):
+    """Returns the smallest and largest of a sequence of values.
+
+    Any keyword arguments are passed on to :py:func:`reduce_chunks`.
+
+    :param values: The values.
+    :rtype: ``tuple``"""
+
+    return reduce_chunks(chunk_extent, combine_extents, values, **kwargs)
+
+
+def histogram(values, low, high, bins, **kwargs):
+    """Counts how many of a sequence of values fall into each of a number of
+    equally wide bins between two values. Values outside the range are not
+    counted, except that the top bin includes its upper edge.
+
+    Any keyword arguments are passed on to :py:func:`reduce_chunks`.
+
+    :param values: The values.
+    :param low: The bottom of the first bin.
+    :param high: The top of the last bin.
+    :param int bins: The number of bins.
+    :rtype: ``list``"""
+
+    return reduce_chunks(
+     partial(count_bins, low=low, high=high, bins=bins), add_counts,
+     values, **kwargs
+    )
+
+
+def density(x_values, y_values, x_range, y_range, shape, **kwargs):
+    """Counts how many (x, y) points fall into each cell of a grid, as a
+    two-dimensional :py:func:`histogram`.
+
+    Any keyword arguments are passed on to :py:func:`reduce_chunks`.
+
+    :param x_values: The x values.
+    :param y_values: The y values.
+    :param tuple x_range: The lowest and highest x values of the grid.
+    :param tuple y_range: The lowest and highest y values of the grid.
+    :param tuple shape: The number of columns and rows in the grid.
+    :returns: A list of rows, from the lowest y values to the highest, each\
+    a list of counts.
+    :rtype: ``list``"""
+
+    return reduce_chunks(
+     partial(count_cells, x_range=x_range, y_range=y_range, shape=shape),
+     add_grids, x_values, y_values, **kwargs
+    )
+
+
+def bucket_extents(x_values, y_values, low, high, buckets, **kwargs):
+    """Splits the x-axis into equally wide buckets, and returns the smallest
+    and largest y value of the points in each. This is what decimating a line
+    needs - drawing each bucket's extent loses nothing visible when there is a
+    bucket per pixel. The x values must be in order.
+
+    Any keyword arguments are passed on to :py:func:`reduce_chunks`.
+
+    :param x_values: The x values, in order.
+    :param y_values: The y values.
+    :param low: The bottom of the first bucket.
+    :param high: The top of the last bucket.
+    :param int buckets: The number of buckets.
+    :returns: The (smallest, largest) y values of each bucket, or ``None``\
+    for buckets with no points in.
+    :rtype: ``list``"""
+
+    return reduce_chunks(
+     partial(chunk_buckets, low=low, high=high, buckets=buckets),
+     combine_buckets, x_values, y_values, **kwargs
+    )
+
+
+def chunk_extent(values):
+    """Returns the smallest and largest of a chunk of values.
+
+    :rtype: ``tuple``"""
+
+    return (min(values), max(values))
+
+
+def combine_extents(a, b):
+    """Combines two (smallest, largest) extents into one.
+
+    :rtype: ``tuple``"""
+
+    return (min(a[0], b[0]), max(a[1], b[1]))
+
+
+def bin_index(value, low, high, bins):
+    """Returns the bin a value falls into, or ``None`` if it is outside the
+    bins' range.
+
+    :rtype: ``int``"""
+
+    if not low <= value <= high:
+        return None
+    return min(int((value - low) / (high - low) * bins), bins - 1)
+
+
+def count_bins(values, low, high, bins):
+    """Counts how many of a chunk of values fall into each bin.
+
+    :rtype: ``list``"""
+
+    counts = [0] * bins
+    for value in values:
+        index = bin_index(value, low, high, bins)
+        if index is not None:
+            counts[index] += 1
+    return counts
+
+
+def add_counts(a, b):
+    """Adds two lists of bin counts together.
+
+    :rtype: ``list``"""
+
+    return [x + y for x, y in zip(a, b)]
+
+
+def count_cells(x_values, y_values, x_range, y_range, shape):
+    """Counts how many of a chunk of points fall into each grid cell.
+
+    :rtype: ``list``"""
+
+    grid = [[0] * shape[0] for _ in range(shape[1])]
+    for x, y in zip(x_values, y_values):
+        column = bin_index(x, *x_range, shape[0])
+        row = bin_index(y, *y_range, shape[1])
+        if column is not None and row is not None:
+            grid[row][column] += 1
+    return grid
+
+
+def add_grids(a, b):
+    """Adds two grids of cell counts together.
+
+    :rtype: ``list``"""
+
+    return [add_counts(x, y) for x, y in zip(a, b)]
+
+
+def chunk_buckets(x_values, y_values, low, high, buckets):
+    """Finds the y extent of each bucket from a chunk of points.
+
+    :rtype: ``list``"""
+
+    extents = [None] * buckets
+    start = bisect_left(x_values, low)
+    for x, y in zip(x_values[start:], y_values[start:]):
+        if x > high:
+            break
+        index = bin_index(x, low, high, buckets)
+        current = extents[index]
+        if current is None:
+            extents[index] = (y, y)
+        elif y < current[0]:
+            extents[index] = (y, current[1])
+        elif y > current[1]:
+            extents[index] = (current[0], y)
+    return extents
+
+
+def combine_buckets(a, b):
+    """Combines two lists of bucket extents into one.
+
+    :rtype: ``list``"""
+
+    return [x if y is None else y if x is None else combine_extents(x, y)
+     for x, y in zip(a, b)]
+
+
+def exact_array(values):
+    """Packs a sequence of numbers into an array if it can hold them exactly -
+    64-bit integers if every value is an ``int`` that fits, and doubles if
+    every value is a ``float``. Arrays are far cheaper than lists to send to
+    other processes. Otherwise the values are returned as they are.
+
+    :param values: The numbers to pack.
+    :rtype: ``array`` or the original sequence"""
+
+    if isinstance(values, array):
+        return values
+    types = set(map(type, values))
+    try:
+        if types <= {int}:
+            return array("q", values)
+        if types == {float}:
+            return array("d", values)
+    except OverflowError:
+        pass
+    return values
+
+
+def worker_pool(workers):
+    """Returns the shared pool with the given number of workers which chunks
+    and series geometry are processed in, creating it the first time it is
+    needed. This is a pool of processes, unless Python is running without a
+    GIL, in which case threads can do the work without copying the data.
+
+    A forked process can't use the pools of the process it was forked from,
+    so it starts with none of its own (see :py:func:`forget_pools`). In a
+    worker process, such as one of :py:func:`.render_many`'s, there is no
+    pool at all and ``None`` is returned - the other workers are already
+    using the CPUs, and a pool of processes inside a pool of processes keeps
+    its parent from exiting. Callers should then do the work themselves.
+
+    :param int workers: The number of workers in the pool.
+    :rtype: ``Executor``"""
+
+    if parent_process() is not None:
+        return None
+    with POOL_LOCK:
+        if workers not in POOLS:
+            if getattr(sys, "_is_gil_enabled", lambda: True)():
+                pool = ProcessPoolExecutor(workers)
+            else:
+                pool = ThreadPoolExecutor(
+                 workers, thread_name_prefix="quickplots"
+                )
+            POOLS[workers] = pool
+        return POOLS[workers]
+
+
+def forget_pools():
+    """Forgets every shared pool, without shutting them down. This runs in
+    the child after a fork - the child inherits the parent's pools, but not
+    the threads and processes behind them, so using one would hang."""
+
+    global POOL_LOCK
+    POOLS.clear()
+    POOL_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_pools)
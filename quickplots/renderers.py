@@ -0,0 +1,277 @@
+"""This module contains the Renderer interface which charts paint themselves
+to, and the standard implementations of it."""
+
+from omnicanvas import Canvas
+
+class Renderer:
+    """The base class for all renderers. A renderer is the thing a chart paints
+    itself onto - it is given a small set of drawing operations (lines,
+    polylines, batches of markers, rectangles and text) and turns them into
+    some kind of output.
+
+    A chart calls :py:meth:`begin` with its dimensions, then the drawing
+    methods in order from back to front, and then :py:meth:`finish`, whose
+    return value is what :py:meth:`.Chart.create` returns.
+
+    The drawing methods accept the same style keyword arguments as the
+    equivalent OmniCanvas graphics. Subclasses must implement all of them."""
+
+    def __init__(self):
+        self._width = None
+        self._height = None
+
+
+    def __repr__(self):
+        return "<%s>" % self.__class__.__name__
+
+
+    def width(self):
+        """The width in pixels of the output being rendered.
+
+        :rtype: ``int``"""
+
+        return self._width
+
+
+    def height(self):
+        """The height in pixels of the output being rendered.
+
+        :rtype: ``int``"""
+
+        return self._height
+
+
+    def begin(self, width, height):
+        """Starts a new render.
+
+        :param width: The width in pixels of the output.
+        :param height: The height in pixels of the output."""
+
+        self._width = round(width) if isinstance(width, float) else width
+        self._height = round(height) if isinstance(height, float) else height
+
+
+    def finish(self):
+        """Ends the render and returns its result."""
+
+        raise NotImplementedError
+
+
+    def graphic_count(self):
+        """The number of graphics created by the render so far, or ``None`` if
+        the renderer doesn't count them.
+
+        :rtype: ``int``"""
+
+        return None
+
+
+    def output_size(self):
+        """The size of the output produced by the last render, or ``None`` if
+        the renderer doesn't measure it.
+
+        :rtype: ``int``"""
+
+        return None
+
+
+    def result_type(self):
+        """The type of the value :py:meth:`finish` returns - ``str`` or
+        ``bytes`` for renderers whose results can be stored in a cache, and
+        ``None`` for anything else.
+
+        :rtype: ``type``"""
+
+        return None
+
+
+    def line(self, x1, y1, x2, y2, **kwargs):
+        """Draws a straight line.
+
+        :param x1: The x-coordinate of the line's start point.
+        :param y1: The y-coordinate of the line's start point.
+        :param x2: The x-coordinate of the line's end point.
+        :param y2: The y-coordinate of the line's end point."""
+
+        raise NotImplementedError
+
+
+    def polyline(self, points, **kwargs):
+        """Draws a line through a sequence of points.
+
+        :param points: An iterable of (x, y) coordinates."""
+
+        raise NotImplementedError
+
+
+    def markers(self, points, size, **kwargs):
+        """Draws a circular marker centred on each of a sequence of points.
+
+        :param points: An iterable of (x, y) coordinates.
+        :param size: The diameter of each marker."""
+
+        raise NotImplementedError
+
+
+    def rectangle(self, x, y, width, height, **kwargs):
+        """Draws a rectangle.
+
+        :param x: The x-coordinate of the rectangle's upper left corner.
+        :param y: The y-coordinate of the rectangle's upper left corner.
+        :param width: The rectangle's width.
+        :param height: The rectangle's height."""
+
+        raise NotImplementedError
+
+
+    def text(self, x, y, text, **kwargs):
+        """Draws some text.
+
+        :param x: The text's x location.
+        :param y: The text's y location.
+        :param str text: The text to display."""
+
+        raise NotImplementedError
+
+
+
+class OmniCanvasRenderer(Renderer):
+    """Base class: :py:class:`Renderer`
+
+    Renders to an OmniCanvas `canvas <https://omnicanvas.readthedocs.io/en/late\
+    st/api/canvas.html#omnicanvas.canvas.Canvas>`_, with every shape becoming
+    its own graphic. This is the default renderer.
+
+    :param Canvas canvas: If given, shapes will be added to this existing\
+    canvas rather than a new one, whatever size the chart is."""
+
+    def __init__(self, canvas=None):
+        Renderer.__init__(self)
+        if canvas is not None and not isinstance(canvas, Canvas):
+            raise TypeError("canvas must be Canvas, not '%s'" % str(canvas))
+        self._existing_canvas = canvas
+        self._canvas = canvas
+
+
+    def canvas(self):
+        """Returns the canvas being rendered to.
+
+        :rtype: ``Canvas``"""
+
+        return self._canvas
+
+
+    def width(self):
+        return self._canvas.width()
+
+
+    def height(self):
+        return self._canvas.height()
+
+
+    def begin(self, width, height):
+        if self._existing_canvas is not None:
+            self._canvas = self._existing_canvas
+        else:
+            self._canvas = Canvas(width, height)
+
+
+    def finish(self):
+        return self._canvas
+
+
+    def graphic_count(self):
+        return len(self._canvas.graphics())
+
+
+    def line(self, x1, y1, x2, y2, **kwargs):
+        self._canvas.add_line(x1, y1, x2, y2, **kwargs)
+
+
+    def polyline(self, points, **kwargs):
+        coordinates = []
+        for point in points:
+            coordinates += point
+        self._canvas.add_polyline(*coordinates, **kwargs)
+
+
+    def markers(self, points, size, **kwargs):
+        radius = size / 2
+        for x, y in points:
+            self._canvas.add_oval(x - radius, y - radius, size, size, **kwargs)
+
+
+    def rectangle(self, x, y, width, height, **kwargs):
+        self._canvas.add_rectangle(x, y, width, height, **kwargs)
+
+
+    def text(self, x, y, text, **kwargs):
+        self._canvas.add_text(x, y, text, **kwargs)
+
+
+
+class CountingRenderer(Renderer):
+    """Base class: :py:class:`Renderer`
+
+    A renderer which draws nothing, and just counts the shapes it is asked to
+    draw. It is useful for measuring how much of a render's time is spent
+    outside the output backend."""
+
+    def begin(self, width, height):
+        Renderer.begin(self, width, height)
+        self._counts = {
+         "line": 0, "polyline": 0, "marker": 0, "rectangle": 0, "text": 0
+        }
+
+
+    def counts(self):
+        """Returns the number of each kind of shape drawn so far.
+
+        :rtype: ``dict``"""
+
+        return dict(self._counts)
+
+
+    def finish(self):
+        return self.counts()
+
+
+    def graphic_count(self):
+        return sum(self._counts.values())
+
+
+    def line(self, x1, y1, x2, y2, **kwargs):
+        self._counts["line"] += 1
+
+
+    def polyline(self, points, **kwargs):
+        self._counts["polyline"] += 1
+
+
+    def markers(self, points, size, **kwargs):
+        self._counts["marker"] += sum(1 for point in points)
+
+
+    def rectangle(self, x, y, width, height, **kwargs):
+        self._counts["rectangle"] += 1
+
+
+    def text(self, x, y, text, **kwargs):
+        self._counts["text"] += 1
+
+
+
+def get_renderer(canvas):
+    """Takes something that a series or chart has been asked to paint onto,
+    and returns a :py:class:`Renderer` for it. Renderers are returned as they
+    are, and OmniCanvas canvases are wrapped in an
+    :py:class:`OmniCanvasRenderer`.
+
+    :param canvas: A :py:class:`Renderer` or OmniCanvas canvas.
+    :rtype: :py:class:`Renderer`"""
+
+    if isinstance(canvas, Renderer):
+        return canvas
+    if isinstance(canvas, Canvas):
+        return OmniCanvasRenderer(canvas)
+    raise TypeError("Cannot render to '%s'" % str(canvas))
@@ -0,0 +1,376 @@
+"""This module contains segmented series, whose data is kept on disk rather
+than in memory, so that series far larger than the memory available can be
+rendered.
+
+A series' data is kept in a directory of segments. Each segment is a file
+holding its x column followed by its y column, each either 64-bit integers
+(``"<i8"``) or 64-bit floats (``"<f8"``). The directory's ``index.json``
+lists the segments in order, with the length, column types, extent, and
+first and last points of each, so that a series' extent can be found without
+reading any of its data. Segments must not overlap - every x value in a
+segment must be at least as large as every x value in the segments before
+it."""
+
+import json
+import os
+import sys
+import threading
+from array import array
+from numerus import is_numeric
+from .series import Series, LineSeries, ScatterSeries, transform_points
+from .series import pack_column, next_state
+from .spec import DTYPES, TYPECODES
+
+INDEX = "index.json"
+
+class SegmentedSeries(Series):
+    """Base class: :py:class:`.Series`
+
+    A series whose data is kept on disk in a directory of segments, and only
+    read a segment at a time. Its extent comes from the directory's index, and
+    when it is painted its points are read, transformed and drawn one segment
+    at a time, so the whole series is never held in memory. Segments which lie
+    entirely outside the chart's x limits are not read at all.
+
+    Methods which return all of the series' data at once, such as
+    :py:meth:`.Series.data`, still work, but read all of it into memory.
+
+    :param str path: The directory the segments are kept in.
+    :param str name: The name to be associated with the series.
+    :param str color: The hex colour of the series.
+    :raises ValueError: if the directory has no segments."""
+
+    streamed = True
+
+    def __init__(self, path, color="#000000", name=None):
+        if not isinstance(path, str):
+            raise TypeError("path must be str, not '%s'" % str(path))
+        segments = read_index(path)
+        if not segments:
+            raise ValueError("Cannot create Series with no data")
+        self._path = path
+        self._segments = segments
+
+        if not isinstance(color, str):
+            raise TypeError("color must be str, not '%s'" % str(color))
+        self._color = color
+        if not isinstance(name, str) and name is not None:
+            raise TypeError("name must be str, not '%s'" % str(name))
+        self._name = name
+        self._chart = None
+        self._version = 0
+        self._state = next_state()
+        self._lock = threading.Lock()
+        self._shared = False
+
+
+    def __repr__(self):
+        return "<%s %s(%i data points)>" % (
+         self.__class__.__name__,
+         "'%s' " % self._name if self._name is not None else "",
+         len(self)
+        )
+
+
+    def __len__(self):
+        return sum(segment["length"] for segment in self._segments)
+
+
+    def __reduce_ex__(self, protocol):
+        # Only the location of the data is pickled, not the data itself
+        return object.__reduce_ex__(self, protocol)
+
+
+    def path(self):
+        """Returns the directory the series' segments are kept in.
+
+        :rtype: ``str``"""
+
+        return self._path
+
+
+    def segments(self):
+        """Returns the index entry of each of the series' segments, in order.
+
+        :rtype: ``list``"""
+
+        return [dict(segment) for segment in self._segments]
+
+
+    def data(self):
+        return [
+         point for x, y in self.column_chunks() for point in zip(x, y)
+        ]
+
+
+    def value_lists(self):
+        x_values, y_values = [], []
+        for x, y in self.column_chunks():
+            x_values += x
+            y_values += y
+        return (x_values, y_values)
+
+
+    def column_chunks(self):
+        for segment in self._segments:
+            yield read_segment(self._path, segment)
+
+
+    def smallest_x(self):
+        return self._segments[0]["x_extent"][0]
+
+
+    def largest_x(self):
+        return self._segments[-1]["x_extent"][1]
+
+
+    def y_extent(self):
+        return (
+         min(segment["y_extent"][0] for segment in self._segments),
+         max(segment["y_extent"][1] for segment in self._segments)
+        )
+
+
+    def add_data_point(self, x, y):
+        """Adds a data point to the series, as a new segment of its own. Add
+        points in batches with :py:meth:`add_data_points` where possible.
+
+        :param x: The numerical x value to be added.
+        :param y: The numerical y value to be added."""
+
+        if not is_numeric(x):
+            raise TypeError("x value must be numeric, not '%s'" % str(x))
+        if not is_numeric(y):
+            raise TypeError("y value must be numeric, not '%s'" % str(y))
+        self.add_data_points([(x, y)])
+
+
+    def add_data_points(self, points):
+        """Adds many data points to the series at once, by writing them to
+        disk as a new segment. The points must come after the existing data.
+
+        :param points: An iterable of (x, y) data points.
+        :raises ValueError: if any point is not of length 2, or comes before\
+        the end of the existing data."""
+
+        points = sorted(map(tuple, points), key=lambda k: k[0])
+        if not points:
+            return
+        for point in points:
+            if len(point) != 2:
+                raise ValueError(
+                 "Data points must be of length 2, which %s is not" % str(point)
+                )
+            if not is_numeric(point[0]) or not is_numeric(point[1]):
+                raise TypeError(
+                 "Data point %s contains non-numeric data" % str(point)
+                )
+        with self._lock:
+            if points[0][0] < self.largest_x():
+                raise ValueError(
+                 "New data must not come before %s" % str(self.largest_x())
+                )
+            segments = self._segments + [write_segment(
+             self._path, len(self._segments), *zip(*points)
+            )]
+            write_index(self._path, segments)
+            # The list is replaced rather than changed, so snapshots keep the
+            # segments they had
+            self._segments = segments
+            self._version += 1
+            self._state = next_state()
+
+
+    def remove_data_point(self, x, y):
+        """Segmented series' data cannot be removed, as the segments are never
+        rewritten.
+
+        :raises ValueError: always."""
+
+        raise ValueError("You cannot remove a segmented Series' data points")
+
+
+    def canvas_points(self):
+        """Yields the coordinates that the data should use to paint itself to
+        its associated :py:class:`.AxisChart`, reading the segments one at a
+        time. Segments wholly outside the chart's x limits are skipped, except
+        that the nearest point on either side of the limits is kept, so that a
+        line still runs off the edge of the axes.
+
+        :rtype: ``generator``"""
+
+        if self.chart():
+            return self.stream_points(self.chart().canvas_transform(), (
+             self.chart().x_lower_limit(), self.chart().x_upper_limit()
+            ))
+
+
+    def stream_points(self, transform, limits):
+        """Yields the canvas coordinates of the segments which fall within
+        some x limits.
+
+        :param tuple transform: The chart's\
+        :py:meth:`~.AxisChart.canvas_transform`.
+        :param tuple limits: The lower and upper x limits.
+        :rtype: ``generator``"""
+
+        before = None
+        for segment in self._segments:
+            low, high = segment["x_extent"]
+            if high < limits[0]:
+                before = segment["last"]
+                continue
+            if before is not None:
+                yield from transform_points(*zip(before), transform)
+                before = None
+            if low > limits[1]:
+                yield from transform_points(*zip(segment["first"]), transform)
+                return
+            x, y = read_segment(self._path, segment)
+            yield from transform_points(x, y, transform)
+
+
+
+class SegmentedLineSeries(LineSeries, SegmentedSeries):
+    """Base classes: :py:class:`.LineSeries`, :py:class:`SegmentedSeries`
+
+    A :py:class:`SegmentedSeries` which can paint itself in a line-chart
+    style.
+
+    :param str path: The directory the segments are kept in.
+    :param str name: The name to be associated with the series.
+    :param str color: The hex colour of the line.
+    :param str linestyle: The line pattern.
+    :param Number linewidth: The width in pixels of the line."""
+
+
+
+class SegmentedScatterSeries(ScatterSeries, SegmentedSeries):
+    """Base classes: :py:class:`.ScatterSeries`, :py:class:`SegmentedSeries`
+
+    A :py:class:`SegmentedSeries` which can paint itself in a scatter-chart
+    style.
+
+    :param str path: The directory the segments are kept in.
+    :param str name: The name to be associated with the series.
+    :param str color: The hex colour of the line.
+    :param Number size: The size of each data point - generally the diameter.
+    :param Number linewidth: The width in pixels of the data points' edge."""
+
+
+
+def write_segments(path, x_values, y_values, segment_size=1 << 20):
+    """Writes data to a new directory of segments, which a
+    :py:class:`SegmentedSeries` can then be created from. The data must
+    already be in order of x value. The values are read from the sequences
+    one segment at a time, so they can be arrays mapped from another file.
+
+    :param str path: The directory to create.
+    :param x_values: The x values, in order.
+    :param y_values: The y values.
+    :param int segment_size: The number of points in each segment.
+    :raises ValueError: if the directory already has segments, or the data\
+    is empty, of unequal length or out of order."""
+
+    if len(x_values) != len(y_values):
+        raise ValueError(
+         "x and y data sequences are of unequal length (%i and %i)" % (
+          len(x_values), len(y_values)
+         )
+        )
+    if not len(x_values):
+        raise ValueError("Cannot write segments with no data")
+    if segment_size < 1:
+        raise ValueError(
+         "segment_size must be positive, not %s" % str(segment_size)
+        )
+    os.makedirs(path, exist_ok=True)
+    if read_index(path):
+        raise ValueError("'%s' already has segments" % path)
+    segments = []
+    for start in range(0, len(x_values), segment_size):
+        segment = write_segment(
+         path, len(segments),
+         x_values[start:start + segment_size],
+         y_values[start:start + segment_size]
+        )
+        if segments and segment["x_extent"][0] < segments[-1]["x_extent"][1]:
+            raise ValueError("Segment data must be in order of x value")
+        segments.append(segment)
+    write_index(path, segments)
+
+
+def write_segment(path, number, x_values, y_values):
+    """Writes one segment's file, and returns its index entry.
+
+    :param str path: The directory of segments.
+    :param int number: The segment's position in the directory.
+    :param x_values: The segment's x values, in order.
+    :param y_values: The segment's y values.
+    :raises ValueError: if the x values are out of order.
+    :rtype: ``dict``"""
+
+    if any(a > b for a, b in zip(x_values, x_values[1:])):
+        raise ValueError("Segment data must be in order of x value")
+    columns = [pack_column(values) for values in (x_values, y_values)]
+    name = "segment%i.bin" % number
+    with open(os.path.join(path, name), "wb") as f:
+        for column in columns:
+            if sys.byteorder == "big":
+                column.byteswap()
+            column.tofile(f)
+            if sys.byteorder == "big":
+                column.byteswap()
+    x, y = columns
+    return {
+     "file": name, "length": len(x),
+     "dtypes": [DTYPES[column.typecode] for column in columns],
+     "x_extent": [x[0], x[-1]], "y_extent": [min(y), max(y)],
+     "first": [x[0], y[0]], "last": [x[-1], y[-1]]
+    }
+
+
+def read_segment(path, segment):
+    """Reads the columns of one segment.
+
+    :param str path: The directory of segments.
+    :param dict segment: The segment's index entry.
+    :rtype: ``tuple``"""
+
+    columns = []
+    with open(os.path.join(path, segment["file"]), "rb") as f:
+        for dtype in segment["dtypes"]:
+            column = array(TYPECODES[dtype])
+            column.fromfile(f, segment["length"])
+            if sys.byteorder == "big":
+                column.byteswap()
+            columns.append(column)
+    return tuple(columns)
+
+
+def read_index(path):
+    """Reads the index of a directory of segments. A directory with no index
+    has no segments.
+
+    :param str path: The directory of segments.
+    :rtype: ``list``"""
+
+    try:
+        with open(os.path.join(path, INDEX), encoding="utf-8") as f:
+            return json.load(f)["segments"]
+    except FileNotFoundError:
+        return []
+
+
+def write_index(path, segments):
+    """Replaces the index of a directory of segments. The new index is written
+    to a temporary file first and then moved into place, so a series reading
+    the directory never sees half of it.
+
+    :param str path: The directory of segments.
+    :param list segments: The index entry of every segment, in order."""
+
+    temporary = os.path.join(path, INDEX + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({"segments": segments}, f)
+    os.replace(temporary, os.path.join(path, INDEX))
@@ -1,4 +1,16 @@
+import pickle
+import sys
+import threading
+from array import array
+from itertools import count
+from operator import itemgetter
 from numerus import is_numeric
+from .renderers import get_renderer
+from .reductions import extent, exact_array
+
+STATES = count(1)
+
+STATE_LOCK = threading.Lock()
 
 class Series:
     """A data series. Series objects represent the data to be plotted onto a
@@ -24,6 +36,8 @@ class Series:
     :raises ValueError: if the size and length of the data doesn't match either\
     format."""
 
+    streamed = False
+
     def __init__(self, *data, color="#000000", name=None):
         self._data = []
         if len(data) == 0:
@@ -68,6 +82,11 @@ class Series:
             raise TypeError("name must be str, not '%s'" % str(name))
         self._name = name
         self._chart = None
+        self._version = 0
+        self._state = next_state()
+        self._lock = threading.Lock()
+        self._shared = False
+        self._extents = {}
 
 
     def __repr__(self):
@@ -78,6 +97,43 @@ class Series:
         )
 
 
+    def __len__(self):
+        return len(self._data)
+
+
+    def __reduce_ex__(self, protocol):
+        columns = self.exact_columns()
+        if columns is None:
+            return object.__reduce_ex__(self, protocol)
+        if protocol >= 5:
+            buffers = [pickle.PickleBuffer(column) for column in columns]
+        else:
+            buffers = [column.tobytes() for column in columns]
+        state = self.__getstate__()
+        del state["_data"]
+        return (unpickle_series, (
+         self.__class__, sys.byteorder,
+         columns[0].typecode, buffers[0], columns[1].typecode, buffers[1]
+        ), state)
+
+
+    def __getstate__(self):
+        return {
+         name: value for name, value in vars(self).items()
+          if name not in ("_lock", "_shared")
+        }
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._shared = True
+        # Another process numbers its states separately, so a copy from one
+        # can't keep the state it had there
+        self._state = next_state()
+        self._extents = {}
+
+
     def data(self):
         """Returns the series' data as a list of (x,y) values.
 
@@ -86,6 +142,52 @@ class Series:
         return list(self._data)
 
 
+    def columns(self):
+        """Returns the series' data as two arrays - one of the x values and one
+        of the y values. A column of ``int`` values will be an array of 64-bit
+        integers, and any other column will be an array of doubles.
+
+        :rtype: ``tuple``"""
+
+        return tuple(pack_column(values) for values in self.value_lists())
+
+
+    def column_chunks(self):
+        """Yields the series' data as pairs of x and y arrays, as
+        :py:meth:`columns` does, but in as many chunks as it is stored in, so
+        that all of it can be read without holding it all at once. Series kept
+        in memory yield a single chunk.
+
+        :rtype: ``generator``"""
+
+        yield self.columns()
+
+
+    def exact_columns(self):
+        """Returns the series' data as two arrays, as :py:meth:`columns` does,
+        but only if the arrays hold the data exactly. If a column mixes ``int``
+        and ``float`` values, or has integers too large for 64 bits, ``None``
+        is returned instead.
+
+        :rtype: ``tuple``"""
+
+        columns = tuple(map(exact_array, self.value_lists()))
+        if all(isinstance(column, array) for column in columns):
+            return columns
+
+
+    def value_lists(self):
+        """Returns the series' data as two lists - one of the x values and one
+        of the y values.
+
+        :rtype: ``tuple``"""
+
+        return (
+         list(map(itemgetter(0), self._data)),
+         list(map(itemgetter(1), self._data))
+        )
+
+
     def color(self, color=None):
         """Returns or sets (if a value is provided) the series' colour.
 
@@ -114,6 +216,67 @@ class Series:
             self._name = name
 
 
+    def version(self):
+        """Returns the number of times the series' data has been changed since
+        it was created.
+
+        :rtype: ``int``"""
+
+        return self._version
+
+
+    def state(self):
+        """Returns a number which identifies the series' data as it is now.
+        Every change to any series' data gives that series a new state, which
+        no other series' data in this process has ever had, so two series
+        with the same state have the same data. A snapshot has the state of
+        the series it was taken from until either of them is changed.
+
+        :rtype: ``int``"""
+
+        return self._state
+
+
+    def snapshot(self):
+        """Returns a copy of the series as it is now, which will not change
+        when data is added to or removed from the series afterwards - even by
+        another thread while the copy is being rendered.
+
+        The copy shares the series' data rather than copying it. Instead, the
+        series copies its data the next time it is changed (copy-on-write), so
+        taking a snapshot is cheap however big the series is, and the series
+        can go on changing while the snapshot is in use. Each series has its
+        own lock, held only while its data is swapped or changed, so writers
+        and renderers of different series never wait for each other.
+
+        The snapshot shares the series' lock, and has the same
+        :py:meth:`state` until either of them is changed. Snapshots can be
+        changed like any other series, and are then given a new state of their
+        own, so renders remembered for one are never used for the other.
+
+        :rtype: :py:class:`Series`"""
+
+        with self._lock:
+            self._shared = True
+            state = vars(self).copy()
+        snapshot = self.__class__.__new__(self.__class__)
+        snapshot.__dict__.update(state)
+        return snapshot
+
+
+    def writable_data(self):
+        """Returns the series' data list so that it can be changed in place,
+        first copying it if a snapshot is sharing it. The series' lock must be
+        held while calling this and while changing the list.
+
+        :rtype: ``list``"""
+
+        if self._shared:
+            self._data = list(self._data)
+            self._shared = False
+        return self._data
+
+
     def chart(self):
         """If this series is associated with a :py:class:`.Chart`, this method
         will return it. Otherwise it will return ``None``."""
@@ -124,25 +287,59 @@ class Series:
     def smallest_x(self):
         """Returns the smallest x-value in the series."""
 
-        return self.data()[0][0]
+        return self._data[0][0]
 
 
     def largest_x(self):
         """Returns the largest x-value in the series."""
 
-        return self.data()[-1][0]
+        return self._data[-1][0]
 
 
     def smallest_y(self):
         """Returns the smallest y-value in the series."""
 
-        return min([datum[-1] for datum in self.data()])
+        return self.y_extent()[0]
 
 
     def largest_y(self):
         """Returns the largest y-value in the series."""
 
-        return max([datum[-1] for datum in self.data()])
+        return self.y_extent()[1]
+
+
+    def y_extent(self):
+        """Returns the smallest and largest y-values in the series. These are
+        remembered until the series' data next changes, so a chart can ask for
+        them as often as it likes while resolving its limits. A series and its
+        snapshots share what they remember, keyed by :py:meth:`state`, so
+        rendering an unchanged series again doesn't scan its data again.
+
+        When Python is running without a GIL, series longer than
+        ``reductions.PARALLEL_THRESHOLD`` are scanned in chunks, in parallel
+        across their chart's :py:meth:`~.AxisChart.geometry_workers`. With a
+        GIL they are always scanned in one go - a series keeps its data as a
+        list of points, and packing its y values into an array to send them
+        to other processes takes longer than scanning them.
+
+        :rtype: ``tuple``"""
+
+        with self._lock:
+            state, data = self._state, self._data
+            y_extent = self._extents.get(state)
+        if y_extent is None:
+            chart = self.chart()
+            y_extent = extent(
+             list(map(itemgetter(1), data)),
+             workers=1 if chart is None else chart.geometry_workers()
+            )
+            with self._lock:
+                # Only the newest state's extent is kept, so a snapshot which
+                # finishes scanning late doesn't replace its series' extent
+                if all(state > known for known in self._extents):
+                    self._extents.clear()
+                    self._extents[state] = y_extent
+        return y_extent
 
 
     def add_data_point(self, x, y):
@@ -155,10 +352,52 @@ class Series:
             raise TypeError("x value must be numeric, not '%s'" % str(x))
         if not is_numeric(y):
             raise TypeError("y value must be numeric, not '%s'" % str(y))
-        current_last_x = self._data[-1][0]
-        self._data.append((x, y))
-        if x < current_last_x:
-            self._data = sorted(self._data, key=lambda k: k[0])
+        with self._lock:
+            data = self.writable_data()
+            current_last_x = data[-1][0]
+            data.append((x, y))
+            if x < current_last_x:
+                self._data = sorted(data, key=lambda k: k[0])
+            self._version += 1
+            self._state = next_state()
+
+
+    def add_data_points(self, points):
+        """Adds many data points to the series at once. This is much quicker
+        than adding them one at a time, as the data is sorted at most once,
+        and not at all if the new points come after the existing ones in
+        order.
+
+        :param points: An iterable of (x, y) data points.
+        :raises ValueError: if any point is not of length 2."""
+
+        new_data = []
+        for point in points:
+            if not isinstance(point, list) and not isinstance(point, tuple):
+                raise TypeError(
+                 "Data must be give as lists or tuples, not '%s'" % str(point)
+                )
+            if len(point) != 2:
+                raise ValueError(
+                 "Data points must be of length 2, which %s is not" % str(point)
+                )
+            if not is_numeric(point[0]) or not is_numeric(point[1]):
+                raise TypeError(
+                 "Data point %s contains non-numeric data" % str(point)
+                )
+            new_data.append(tuple(point))
+        if not new_data:
+            return
+        with self._lock:
+            data = self.writable_data()
+            in_order = new_data[0][0] >= data[-1][0] and all(
+             a[0] <= b[0] for a, b in zip(new_data, new_data[1:])
+            )
+            data.extend(new_data)
+            if not in_order:
+                self._data = sorted(data, key=lambda k: k[0])
+            self._version += 1
+            self._state = next_state()
 
 
     def remove_data_point(self, x, y):
@@ -169,9 +408,12 @@ class Series:
         :raises ValueError: if you try to remove the last data point from\
         a series."""
 
-        if len(self._data) == 1:
-            raise ValueError("You cannot remove a Series' last data point")
-        self._data.remove((x, y))
+        with self._lock:
+            if len(self._data) == 1:
+                raise ValueError("You cannot remove a Series' last data point")
+            self.writable_data().remove((x, y))
+            self._version += 1
+            self._state = next_state()
 
 
     def canvas_points(self):
@@ -182,31 +424,9 @@ class Series:
         :rtype: ``tuple``"""
 
         if self.chart():
-            x_axis_min = self.chart().x_lower_limit()
-            y_axis_min = self.chart().y_lower_limit()
-            x_axis_max = self.chart().x_upper_limit()
-            y_axis_max = self.chart().y_upper_limit()
-            chart_width = self.chart().width()
-            chart_height = self.chart().height()
-            horizontal_padding = self.chart().horizontal_padding()
-            vertical_padding = self.chart().vertical_padding()
-            horizontal_margin_pixels = horizontal_padding * chart_width
-            vertical_margin_pixels = vertical_padding * chart_height
-            x_axis_pixels = chart_width - (2 * horizontal_margin_pixels)
-            y_axis_pixels = chart_height - (2 * vertical_margin_pixels)
-            x_axis_span = x_axis_max - x_axis_min
-            y_axis_span = y_axis_max - y_axis_min
-            x_pixels_per_point = x_axis_pixels / x_axis_span
-            y_pixels_per_point = y_axis_pixels / y_axis_span
-            data = []
-            for x, y in self.data():
-                relative_x, relative_y = x - x_axis_min, y - y_axis_min
-                data.append((
-                 (relative_x * x_pixels_per_point) + horizontal_margin_pixels,
-                 chart_height - ((relative_y * y_pixels_per_point) + vertical_margin_pixels)
-                ))
-            return tuple(data)
-
+            return transform_points(
+             *self.value_lists(), self.chart().canvas_transform()
+            )
 
 
 class LineSeries(Series):
@@ -226,7 +446,7 @@ class LineSeries(Series):
     :param Number linewidth: The width in pixels of the data points' edge."""
 
     def __init__(self, *args, linestyle="-", linewidth=2, **kwargs):
-        Series.__init__(self, *args, **kwargs)
+        super().__init__(*args, **kwargs)
 
         if not isinstance(linestyle, str):
             raise TypeError("linestyle must be str, not '%s'" % str(linestyle))
@@ -274,19 +494,19 @@ class LineSeries(Series):
             self._linewidth = linewidth
 
 
-    def write_to_canvas(self, canvas, name):
-        """Writes the series to an OmniCanvas canvas.
+    def write_to_canvas(self, canvas, name, points=None):
+        """Writes the series to an OmniCanvas canvas or :py:class:`.Renderer`.
 
-        :param Canvas canvas: The canvas to write to.
-        :param str name: The name to give the line graphic on the canvas."""
+        :param canvas: The canvas or renderer to write to.
+        :param str name: The name to give the line graphic on the canvas.
+        :param tuple points: The series' :py:meth:`canvas_points`, if they\
+        have already been calculated."""
 
-        points = self.canvas_points()
-        args = []
-        for point in points:
-            args += list(point)
-        canvas.add_polyline(
-         *args, line_color=self.color(), line_style=self.linestyle(),
-         line_width=self.linewidth(), name=name
+        if points is None:
+            points = self.canvas_points()
+        get_renderer(canvas).polyline(
+         points, line_color=self.color(),
+         line_style=self.linestyle(), line_width=self.linewidth(), name=name
         )
 
 
@@ -304,7 +524,7 @@ class ScatterSeries(Series):
     :param Number linewidth: The width in pixels of the data points' edge."""
 
     def __init__(self, *args, size=5, linewidth=1, **kwargs):
-        Series.__init__(self, *args, **kwargs)
+        super().__init__(*args, **kwargs)
 
         if not is_numeric(size):
             raise TypeError("size must be number, not '%s'" % str(size))
@@ -350,16 +570,103 @@ class ScatterSeries(Series):
             self._linewidth = linewidth
 
 
-    def write_to_canvas(self, canvas, name):
-        """Writes the series to an OmniCanvas canvas.
+    def write_to_canvas(self, canvas, name, points=None):
+        """Writes the series to an OmniCanvas canvas or :py:class:`.Renderer`.
 
-        :param Canvas canvas: The canvas to write to.
-        :param str name: The name to give the line graphic on the canvas."""
+        :param canvas: The canvas or renderer to write to.
+        :param str name: The name to give the marker graphics on the canvas.
+        :param tuple points: The series' :py:meth:`canvas_points`, if they\
+        have already been calculated."""
 
-        points = self.canvas_points()
-        for point in points:
-            canvas.add_oval(
-             point[0] - (self.size() / 2), point[1] - (self.size() / 2),
-             self.size(), self.size(),
-             fill_color=self.color(), line_width=self.linewidth(), name=name
-            )
+        if points is None:
+            points = self.canvas_points()
+        get_renderer(canvas).markers(
+         points, self.size(), fill_color=self.color(),
+         line_width=self.linewidth(), name=name
+        )
+
+
+
+def next_state():
+    """Returns the next number in the sequence of states given to series'
+    data. Each number is only ever returned once.
+
+    :rtype: ``int``"""
+
+    with STATE_LOCK:
+        return next(STATES)
+
+
+def pack_column(values):
+    """Packs a sequence of numbers into the most faithful array available -
+    64-bit integers if every value is an ``int`` that fits, and doubles
+    otherwise.
+
+    :param values: The numbers to pack.
+    :rtype: ``array``"""
+
+    if set(map(type, values)) <= {int}:
+        try:
+            return array("q", values)
+        except OverflowError:
+            pass
+    return array("d", values)
+
+
+def transform_points(x_values, y_values, transform):
+    """Converts data values into canvas coordinates. This is a plain function
+    of plain values, so that it can be run in another process.
+
+    :param x_values: The x values.
+    :param y_values: The y values.
+    :param tuple transform: The chart's :py:meth:`.AxisChart.canvas_transform`.
+    :rtype: ``tuple``"""
+
+    x_min, y_min, x_scale, y_scale, x_margin, y_margin, height = transform
+    return tuple(zip(
+     [((x - x_min) * x_scale) + x_margin for x in x_values],
+     [height - (((y - y_min) * y_scale) + y_margin) for y in y_values]
+    ))
+
+
+def transform_columns(x_values, y_values, transform):
+    """Converts data values into canvas coordinates, like
+    :py:func:`transform_points`, but returns them as two arrays of doubles -
+    the x coordinates and the y coordinates. These are far cheaper to send
+    back from another process than a tuple of points.
+
+    :param x_values: The x values.
+    :param y_values: The y values.
+    :param tuple transform: The chart's :py:meth:`.AxisChart.canvas_transform`.
+    :rtype: ``tuple``"""
+
+    x_min, y_min, x_scale, y_scale, x_margin, y_margin, height = transform
+    return (
+     array("d", [((x - x_min) * x_scale) + x_margin for x in x_values]),
+     array("d", [height - (((y - y_min) * y_scale) + y_margin) for y in y_values])
+    )
+
+
+def unpickle_series(cls, byteorder, x_typecode, x_data, y_typecode, y_data):
+    """Recreates a pickled series from the raw bytes of its two columns. The
+    rest of its attributes, including the chart it belongs to, are restored
+    by pickle afterwards.
+
+    :param type cls: The class of the series.
+    :param str byteorder: The byte order of the machine it was pickled on.
+    :param str x_typecode: The array typecode of the x column.
+    :param x_data: The bytes of the x column.
+    :param str y_typecode: The array typecode of the y column.
+    :param y_data: The bytes of the y column.
+    :rtype: :py:class:`Series`"""
+
+    columns = []
+    for typecode, data in ((x_typecode, x_data), (y_typecode, y_data)):
+        column = array(typecode)
+        column.frombytes(memoryview(data).cast("B"))
+        if byteorder != sys.byteorder:
+            column.byteswap()
+        columns.append(column)
+    series = cls.__new__(cls)
+    series._data = list(zip(*columns))
+    return series
@@ -0,0 +1,204 @@
+"""This module contains the chart spec format, a compact binary form of an
+:py:class:`.AxisChart` which can be saved, sent between services and loaded
+again far faster than the chart could be rebuilt from its data.
+
+A spec is laid out as follows, with all integers little-endian:
+
+* The four bytes ``QPLT``.
+* The format version, as a two-byte integer (currently 1).
+* Two reserved bytes, which are zero.
+* The length of the header, as a four-byte integer.
+* The header - UTF-8 JSON describing the chart's settings and the class,
+  settings and columns of each of its series.
+* Zero bytes up to the next multiple of eight bytes from the start.
+* The column blocks. Each series has an x column and a y column, each of
+  which is either 64-bit integers (``"<i8"``) or 64-bit floats (``"<f8"``).
+  Every block starts on a multiple of eight bytes, and its ``offset`` in the
+  header is counted from the end of the padding after the header.
+
+Series whose data can't be held exactly in such columns (because a column
+mixes integers and floats) have their data in the header instead."""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from .charts import AxisChart
+from .series import Series, LineSeries, ScatterSeries
+from .templates import ChartTemplate, chart_state, series_state
+
+MAGIC = b"QPLT"
+
+VERSION = 1
+
+PREAMBLE = struct.Struct("<4sHHI")
+
+DTYPES = {"q": "<i8", "d": "<f8"}
+
+TYPECODES = {"<i8": "q", "<f8": "d"}
+
+CLASSES = {cls.__name__: cls for cls in (
+ AxisChart, Series, LineSeries, ScatterSeries
+)}
+
+def dumps(chart):
+    """Converts a chart to a spec. The same chart always produces the same
+    spec, so specs can be hashed or compared.
+
+    :param AxisChart chart: The chart to convert.
+    :raises TypeError: if the chart has a streamed series, such as a\
+    :py:class:`.SegmentedSeries`, whose data is kept on disk.
+    :rtype: ``bytes``"""
+
+    if not isinstance(chart, AxisChart):
+        raise TypeError("'%s' is not an AxisChart" % str(chart))
+    for series in chart.all_series():
+        if series.streamed:
+            raise TypeError(
+             "'%s' is streamed from disk, so can't be put in a spec" % str(
+              series
+             )
+            )
+    header = {"chart": {
+     "class": chart.__class__.__name__, "settings": settings(chart_state(chart))
+    }, "series": []}
+    blocks, size = [], 0
+    for series in chart.all_series():
+        description = {
+         "class": series.__class__.__name__,
+         "settings": settings(series_state(series))
+        }
+        columns = series.exact_columns()
+        if columns is None:
+            description["data"] = series.data()
+        else:
+            description["columns"] = []
+            for column in columns:
+                if sys.byteorder == "big":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                description["columns"].append({
+                 "dtype": DTYPES[column.typecode],
+                 "offset": size,
+                 "length": len(column)
+                })
+                blocks.append(column.tobytes())
+                size += len(blocks[-1])
+        header["series"].append(description)
+    header = json.dumps(header, sort_keys=True, separators=(",", ":")).encode()
+    preamble = PREAMBLE.pack(MAGIC, VERSION, 0, len(header))
+    padding = b"\x00" * (-(len(preamble) + len(header)) % 8)
+    return b"".join([preamble, header, padding] + blocks)
+
+
+def dump(chart, output):
+    """Saves a chart as a spec.
+
+    :param AxisChart chart: The chart to save.
+    :param output: The path to save to, or a binary file-like object."""
+
+    if isinstance(output, str):
+        with open(output, "wb") as f:
+            return dump(chart, f)
+    output.write(dumps(chart))
+
+
+def loads(data):
+    """Creates a chart from a spec. The columns are read straight out of the
+    buffer given, without being copied first.
+
+    :param data: The spec, as ``bytes`` or any other buffer.
+    :raises ValueError: if the data is not a spec, or is a spec of a version\
+    this module can't read.
+    :rtype: :py:class:`.AxisChart`"""
+
+    with memoryview(data) as buffer:
+        if len(buffer) < PREAMBLE.size:
+            raise ValueError("Data is too short to be a chart spec")
+        magic, version, reserved, length = PREAMBLE.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError("Data is not a chart spec")
+        if version != VERSION:
+            raise ValueError("Cannot read version %i chart specs" % version)
+        end = PREAMBLE.size + length
+        header = json.loads(bytes(buffer[PREAMBLE.size:end]))
+        start = end + (-end % 8)
+        series_states, data, views = [], [], []
+        try:
+            for description in header["series"]:
+                series_states.append((
+                 spec_class(description["class"]),
+                 state(description["settings"])
+                ))
+                if "data" in description:
+                    data.append(tuple(zip(*description["data"])))
+                    continue
+                columns = []
+                for column in description["columns"]:
+                    typecode = TYPECODES[column["dtype"]]
+                    offset = start + column["offset"]
+                    view = buffer[offset:offset + column["length"] * 8]
+                    if sys.byteorder == "big":
+                        view = array(typecode, view)
+                        view.byteswap()
+                    else:
+                        view = view.cast(typecode)
+                        views.append(view)
+                    columns.append(view)
+                data.append(columns)
+            template = ChartTemplate.from_state(
+             spec_class(header["chart"]["class"]),
+             state(header["chart"]["settings"]), series_states
+            )
+            return template.bind(*data, ordered=True)
+        finally:
+            for view in views:
+                view.release()
+
+
+def load(path):
+    """Loads a chart from a spec file. The file is memory-mapped rather than
+    read, so only the parts of it which are needed are read from disk.
+
+    :param str path: The location of the spec file.
+    :rtype: :py:class:`.AxisChart`"""
+
+    if not isinstance(path, str):
+        raise TypeError("path must be str, not '%s'" % str(path))
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return loads(mapped)
+
+
+def settings(state):
+    """Converts an object's attributes into the settings stored in a spec's
+    header, by dropping the leading underscore from each name.
+
+    :param dict state: The attributes.
+    :rtype: ``dict``"""
+
+    return {name[1:]: value for name, value in state.items()}
+
+
+def state(settings):
+    """Converts the settings stored in a spec's header back into attributes.
+    JSON has no tuples, so any lists (such as ticks) become tuples again.
+
+    :param dict settings: The settings.
+    :rtype: ``dict``"""
+
+    return {"_" + name: tuple(value) if isinstance(value, list) else value
+     for name, value in settings.items()}
+
+
+def spec_class(name):
+    """Returns the chart or series class with the given name.
+
+    :param str name: The name of the class.
+    :raises ValueError: if there is no such class.
+    :rtype: ``type``"""
+
+    if name not in CLASSES:
+        raise ValueError("'%s' is not a chart or series class" % str(name))
+    return CLASSES[name]
@@ -0,0 +1,523 @@
+"""This module contains the SvgRenderer, which writes charts directly to SVG
+text without building an OmniCanvas graphic for every shape."""
+
+import hashlib
+import io
+from xml.sax.saxutils import escape
+from .renderers import Renderer
+from .cache import FrameCache
+
+SVG_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<!-- Created with OmniCanvas (omnicanvas.readthedocs.io) -->
+<svg xmlns="http://www.w3.org/2000/svg"%s width="%i" height="%i">
+
+"""
+
+SVG_FOOTER = "\n</svg>"
+
+XLINK_NAMESPACE = ' xmlns:xlink="http://www.w3.org/1999/xlink"'
+
+LINE_PATTERNS = {
+ "-": lambda width: "1,0",
+ "--": lambda width: "%.1f,%.1f" % (10 * width, 5 * width),
+ "..": lambda width: "%.1f,%.1f" % (1 * width, 2 * width)
+}
+
+MARKER_MODES = ("ellipse", "path", "use")
+
+TEXT_ALIGNMENTS = {
+ "left": "end", "center": "middle", "right": "start",
+ "top": "baseline", "bottom": "hanging"
+}
+
+class SvgRenderer(Renderer):
+    """Base class: :py:class:`.Renderer`
+
+    Renders charts as SVG text, written straight to a file-like object as each
+    shape is drawn. No graphic objects are created, and the text is buffered
+    and written in chunks of roughly ``chunk_size`` characters, so the memory
+    needed to render a chart does not grow with the number of shapes on it.
+
+    By default the SVG produced is the same as an OmniCanvas canvas would
+    produce.
+
+    :param output: The file-like object to write to. It must have a ``write``\
+    method which accepts ``str``. If not given, the SVG is returned as a\
+    ``str`` when the render finishes.
+    :param int chunk_size: The number of characters to buffer before writing\
+    them to the output.
+    :param str marker_mode: How scatter markers are written. ``ellipse`` (the\
+    default) writes a full ``<ellipse>`` element for every marker, as\
+    OmniCanvas does. ``path`` writes all the markers of a series as a single\
+    ``<path>`` made of circular arcs, and ``use`` defines the marker once and\
+    places a copy of it with a small ``<use>`` element at every point. Both\
+    batched modes produce far smaller SVG for series with many points. The\
+    ``<use>`` elements refer to the marker with ``xlink:href``, so that SVG\
+    1.1 viewers can draw them too. Each marker's id includes a hash of its\
+    size and style, so that several SVGs placed in one HTML page never\
+    draw each other's markers.
+    :param int precision: If given, coordinates are rounded to this many\
+    decimal places and written without trailing zeros - ``0`` writes whole\
+    pixels only. By default every coordinate is written to one decimal place.
+    :param bool relative: If ``True``, lines through many points are written\
+    as a ``<path>`` of relative ``l dx dy`` steps rather than a\
+    ``<polyline>`` of absolute points. The steps are taken between rounded\
+    points, so rounding errors never accumulate along the line.
+    :param FrameCache frames: If given, charts painted with this renderer will\
+    look for their frame in this cache rather than painting it, and store it\
+    there if it isn't found.
+    :param str id_prefix: If given, this is put at the start of every id in\
+    the SVG, so that ids can be kept unique across a page however alike\
+    its charts are."""
+
+    def __init__(self, output=None, chunk_size=65536, marker_mode="ellipse",
+     precision=None, relative=False, frames=None, id_prefix=""):
+        Renderer.__init__(self)
+        if output is not None and not hasattr(output, "write"):
+            raise TypeError("output must be writable, not '%s'" % str(output))
+        self._output = output
+        if not isinstance(chunk_size, int):
+            raise TypeError("chunk_size must be int, not '%s'" % str(chunk_size))
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive, not %i" % chunk_size)
+        self._chunk_size = chunk_size
+        if marker_mode not in MARKER_MODES:
+            raise ValueError("'%s' is not a valid marker mode" % str(marker_mode))
+        self._marker_mode = marker_mode
+        if precision is not None:
+            if not isinstance(precision, int):
+                raise TypeError(
+                 "precision must be int, not '%s'" % str(precision)
+                )
+            if precision < 0:
+                raise ValueError(
+                 "precision cannot be negative, not %i" % precision
+                )
+        self._precision = precision
+        self._number = number_formatter(precision)
+        if not isinstance(relative, bool):
+            raise TypeError("relative must be boolean, not '%s'" % str(relative))
+        self._relative = relative
+        if frames is not None and not isinstance(frames, FrameCache):
+            raise TypeError("frames must be FrameCache, not '%s'" % str(frames))
+        self._frames = frames
+        if not isinstance(id_prefix, str):
+            raise TypeError("id_prefix must be str, not '%s'" % str(id_prefix))
+        self._id_prefix = id_prefix
+        self._target = None
+        self._buffer = []
+        self._buffered = 0
+        self._graphic_count = 0
+        self._size = 0
+
+
+    def graphic_count(self):
+        """The number of graphics written so far.
+
+        :rtype: ``int``"""
+
+        return self._graphic_count
+
+
+    def result_type(self):
+        return str if self._output is None else None
+
+
+    def output_size(self):
+        """The number of bytes written to the output so far, encoded as UTF-8.
+
+        :rtype: ``int``"""
+
+        return self._size
+
+
+    def begin(self, width, height):
+        Renderer.begin(self, width, height)
+        self._target = self._output if self._output is not None else io.StringIO()
+        self._buffer = []
+        self._buffered = 0
+        self._graphic_count = 0
+        self._size = 0
+        self._marker_definitions = 0
+        self.write(SVG_HEADER % (
+         XLINK_NAMESPACE if self._marker_mode == "use" else "",
+         self._width, self._height
+        ))
+
+
+    def finish(self):
+        self.write(SVG_FOOTER)
+        self.flush()
+        target, self._target = self._target, None
+        if self._output is None:
+            return target.getvalue()
+
+
+    def write(self, text):
+        """Adds raw text to the buffer, and writes the buffer to the output if
+        it has grown larger than the chunk size.
+
+        :param str text: The text to add."""
+
+        if self._target is None:
+            raise ValueError("SvgRenderer is not currently rendering")
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._chunk_size:
+            self.flush()
+
+
+    def flush(self):
+        """Writes any buffered text to the output."""
+
+        if self._buffer:
+            text = "".join(self._buffer)
+            self._target.write(text)
+            self._size += len(text) if text.isascii() else len(
+             text.encode("utf-8")
+            )
+            self._buffer = []
+            self._buffered = 0
+
+
+    def frames(self):
+        """Returns the cache charts should look for their frames in, if any.
+
+        :rtype: :py:class:`.FrameCache`"""
+
+        return self._frames
+
+
+    def options(self):
+        """Returns the renderer's settings which affect the SVG it writes, so
+        that fragments written with different settings can be told apart.
+
+        :rtype: ``tuple``"""
+
+        return (
+         self._marker_mode, self._precision, self._relative, self._id_prefix
+        )
+
+
+    def record(self, paint, *args):
+        """Calls a painting function with this renderer (and any other
+        arguments given), and captures the SVG it writes as a fragment. The SVG
+        is still written to the output as normal, and the fragment can be
+        written again in a later render with :py:meth:`replay`.
+
+        :param paint: The function to call.
+        :returns: The fragment, as a ``(text, graphics, marker definitions)``\
+        tuple."""
+
+        self.flush()
+        target, self._target = self._target, io.StringIO()
+        graphic_count = self._graphic_count
+        marker_definitions = self._marker_definitions
+        size = self._size
+        self._graphic_count = 1
+        try:
+            paint(self, *args)
+            self.flush()
+            fragment = (
+             self._target.getvalue(), self._graphic_count - 1,
+             self._marker_definitions - marker_definitions
+            )
+        finally:
+            self._target = target
+            self._graphic_count = graphic_count
+            self._marker_definitions = marker_definitions
+            self._size = size
+        self.replay(fragment)
+        return fragment
+
+
+    def replay(self, fragment):
+        """Writes a fragment captured by :py:meth:`record` to the output, as if
+        the shapes in it had been drawn again.
+
+        :param tuple fragment: The fragment to write."""
+
+        text, graphics, marker_definitions = fragment
+        if graphics and not self._graphic_count:
+            text = text[1:]
+        self.write(text)
+        self._graphic_count += graphics
+        self._marker_definitions += marker_definitions
+
+
+    def start_graphic(self):
+        """Writes the separator which comes before each graphic."""
+
+        if self._graphic_count:
+            self.write("\n")
+        self._graphic_count += 1
+
+
+    def line(self, x1, y1, x2, y2, name=None, line_width=1, line_style="-",
+     line_color="#000000", rotation=(0, 0, 0)):
+        number = self._number
+        self.start_graphic()
+        self.write('<line x1="%s" y1="%s" x2="%s" y2="%s" style="%s"%s />' % (
+         number(x1), number(y1), number(x2), number(y2),
+         stroke_style(line_width, line_style, line_color),
+         rotation_attribute(rotation)
+        ))
+
+
+    def polyline(self, points, name=None, line_width=1, line_style="-",
+     line_color="#000000", rotation=(0, 0, 0)):
+        if self._relative:
+            return self.relative_path(
+             points, line_width, line_style, line_color, rotation
+            )
+        number = self._number
+        between = ", " if self._precision is None else " "
+        self.start_graphic()
+        self.write('<polyline points="')
+        separator = ""
+        for batch in batches(points, 1024):
+            self.write(separator + between.join(
+             ["%s,%s" % (number(x), number(y)) for x, y in batch]
+            ))
+            separator = between
+        self.write('" style="%s"%s />' % (
+         stroke_style(line_width, line_style, line_color, include_fill=True),
+         rotation_attribute(rotation)
+        ))
+
+
+    def relative_path(self, points, line_width, line_style, line_color,
+     rotation):
+        """Writes a line through some points as a ``<path>`` which moves to the
+        first point and then steps to each of the others relative to the one
+        before it. Points are rounded to the renderer's precision (or one
+        decimal place) in whole units first, and the steps are worked out
+        between those units.
+
+        :param points: The points to draw the line through.
+        :param line_width: The width of the line in pixels.
+        :param str line_style: The pattern of the line.
+        :param str line_color: The colour of the line.
+        :param tuple rotation: Any rotation to be applied."""
+
+        precision = 1 if self._precision is None else self._precision
+        scale = 10 ** precision
+        unit = number_formatter(precision)
+        self.start_graphic()
+        self.write('<path d="')
+        points = iter(points)
+        first = next(points, None)
+        if first is not None:
+            previous = (round(first[0] * scale), round(first[1] * scale))
+            self.write("M%s %s" % (
+             unit(previous[0] / scale), unit(previous[1] / scale)
+            ))
+            separator = "l"
+            for batch in batches(points, 1024):
+                steps = []
+                for x, y in batch:
+                    x, y = round(x * scale), round(y * scale)
+                    steps.append("%s %s" % (
+                     unit((x - previous[0]) / scale),
+                     unit((y - previous[1]) / scale)
+                    ))
+                    previous = (x, y)
+                self.write(separator + " ".join(steps))
+                separator = " "
+        self.write('" style="%s"%s />' % (
+         stroke_style(line_width, line_style, line_color, include_fill=True),
+         rotation_attribute(rotation)
+        ))
+
+
+    def markers(self, points, size, name=None, fill_color="#FFFFFF", opacity=1,
+     line_width=1, line_style="-", line_color="#000000", rotation=(0, 0, 0)):
+        style = shape_style(fill_color, opacity, line_width, line_style, line_color)
+        if self._marker_mode == "path":
+            self.marker_path(points, size, style, rotation)
+        elif self._marker_mode == "use":
+            self.marker_uses(points, size, style, rotation)
+        else:
+            self.marker_ellipses(points, size, style, rotation)
+
+
+    def marker_ellipses(self, points, size, style, rotation):
+        """Writes a separate ``<ellipse>`` element for every marker.
+
+        :param points: The centres of the markers.
+        :param size: The diameter of each marker.
+        :param str style: The style attribute of each marker.
+        :param tuple rotation: Any rotation to be applied."""
+
+        number = self._number
+        radius = number(size / 2)
+        template = '<ellipse cx="%%s" cy="%%s" rx="%s" ry="%s" style="%s"%s />' % (
+         radius, radius, style, rotation_attribute(rotation)
+        )
+        for batch in batches(points, 1024):
+            self.start_graphic()
+            self.write("\n".join(
+             [template % (number(x), number(y)) for x, y in batch]
+            ))
+            self._graphic_count += len(batch) - 1
+
+
+    def marker_path(self, points, size, style, rotation):
+        """Writes all the markers as a single ``<path>``, with each marker a
+        closed pair of semicircular arcs.
+
+        :param points: The centres of the markers.
+        :param size: The diameter of each marker.
+        :param str style: The style attribute of the path.
+        :param tuple rotation: Any rotation to be applied."""
+
+        number = self._number
+        radius = size / 2
+        arcs = "a{0} {0} 0 1 0 {1} 0a{0} {0} 0 1 0 -{1} 0".format(
+         number(radius), number(size)
+        )
+        self.start_graphic()
+        self.write('<path d="')
+        for batch in batches(points, 1024):
+            self.write("".join(
+             ["M%s %s%s" % (number(x - radius), number(y), arcs) for x, y in batch]
+            ))
+        self.write('" style="%s"%s />' % (style, rotation_attribute(rotation)))
+
+
+    def marker_uses(self, points, size, style, rotation):
+        """Defines the marker once, as a circle centred on the origin, and then
+        places a ``<use>`` reference to it at every point. The marker's id is
+        numbered, to be unique within the SVG, and ends with a hash of the
+        circle, so that an id shared with another SVG on the same page always
+        refers to an identical circle.
+
+        :param points: The centres of the markers.
+        :param size: The diameter of each marker.
+        :param str style: The style attribute of the marker.
+        :param tuple rotation: Any rotation to be applied."""
+
+        number = self._number
+        self._marker_definitions += 1
+        radius = number(size / 2)
+        marker_id = "%sm%i-%s" % (
+         self._id_prefix, self._marker_definitions, hashlib.blake2b(
+          ("%s %s" % (radius, style)).encode(), digest_size=4
+         ).hexdigest()
+        )
+        self.start_graphic()
+        self.write('<defs><circle id="%s" cx="0" cy="0" r="%s" style="%s" /></defs>' % (
+         marker_id, radius, style
+        ))
+        self.write('\n<g%s>' % rotation_attribute(rotation))
+        template = '<use xlink:href="#%s" x="%%s" y="%%s"/>' % marker_id
+        for batch in batches(points, 1024):
+            self.write("".join(
+             [template % (number(x), number(y)) for x, y in batch]
+            ))
+        self.write("</g>")
+
+
+    def rectangle(self, x, y, width, height, name=None, fill_color="#FFFFFF",
+     opacity=1, line_width=1, line_style="-", line_color="#000000",
+     rotation=(0, 0, 0)):
+        number = self._number
+        self.start_graphic()
+        self.write('<rect x="%s" y="%s" width="%s" height="%s" style="%s"%s />' % (
+         number(x), number(y), number(width), number(height),
+         shape_style(fill_color, opacity, line_width, line_style, line_color),
+         rotation_attribute(rotation)
+        ))
+
+
+    def text(self, x, y, text, name=None, font_size=18, fill_color="#000000",
+     opacity=1, line_width=0, line_style="-", line_color="#000000",
+     horizontal_align="center", vertical_align="center", rotation=(0, 0, 0)):
+        self.start_graphic()
+        self.write(
+         '<text x="%s" y="%s" text-anchor="%s" alignment-baseline="%s" style="font-size:%.1f;%s"%s>%s</text>' % (
+          self._number(x), self._number(y),
+          TEXT_ALIGNMENTS[horizontal_align], TEXT_ALIGNMENTS[vertical_align],
+          font_size,
+          shape_style(fill_color, opacity, line_width, line_style, line_color),
+          rotation_attribute(rotation),
+          escape(str(text))
+         )
+        )
+
+
+
+def batches(points, size):
+    """Splits an iterable of points into lists of at most ``size`` points, so
+    that they can be formatted in bulk without all being held at once.
+
+    :param points: The points to split.
+    :param int size: The maximum size of each batch."""
+
+    batch = []
+    for point in points:
+        batch.append(point)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def number_formatter(precision):
+    """Returns the function used to write coordinates at a given precision. With
+    no precision, numbers are written to one decimal place as OmniCanvas
+    writes them. Otherwise they are rounded to that many decimal places, and
+    any trailing zeros are dropped.
+
+    :param int precision: The number of decimal places, or ``None``.
+    :rtype: ``function``"""
+
+    if precision is None:
+        return "%.1f".__mod__
+    template = "%%.%if" % precision
+    def format_number(value):
+        text = template % value
+        if precision:
+            text = text.rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+    return format_number
+
+
+def stroke_style(line_width, line_style, line_color, include_fill=False):
+    """Produces the stroke part of a graphic's style attribute, exactly as
+    OmniCanvas would.
+
+    :rtype: ``str``"""
+
+    return "%sstroke:%s;%s%s" % (
+     "fill:none;" if include_fill else "",
+     line_color.upper(),
+     "stroke-width:%.1f;" % line_width if line_width != 1 else "",
+     "stroke-dasharray:%s;" % LINE_PATTERNS[line_style](line_width)
+      if line_style != "-" else ""
+    )
+
+
+def shape_style(fill_color, opacity, line_width, line_style, line_color):
+    """Produces the style attribute of a filled graphic, exactly as OmniCanvas
+    would.
+
+    :rtype: ``str``"""
+
+    return "fill:%s;%s%s" % (
+     fill_color.upper(),
+     "fill-opacity:%.3f;" % opacity if opacity != 1 else "",
+     stroke_style(line_width, line_style, line_color)
+    )
+
+
+def rotation_attribute(rotation):
+    """Produces the transform attribute for a rotation, or an empty string if
+    there is no rotation.
+
+    :rtype: ``str``"""
+
+    return (' transform="rotate(%.1f %.1f %.1f)"' % (
+     rotation[2], rotation[0], rotation[1]
+    )) if rotation != (0, 0, 0) else ""
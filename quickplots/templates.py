@@ -0,0 +1,173 @@
+"""This module contains chart templates, which let a chart's configuration be
+set up once and then filled with new data many times."""
+
+import threading
+from .charts import AxisChart
+from .cache import FrameCache
+from .series import next_state
+
+class ChartTemplate:
+    """A compiled copy of an :py:class:`.AxisChart`'s configuration - its
+    dimensions, title, labels, padding, limits, ticks and grid, and the type
+    and style of each of its series. The template can then be bound to new
+    data to produce charts configured in exactly the same way.
+
+    Binding skips the type checks which the chart and series constructors
+    and setters make, as the configuration was checked when the original
+    chart was made. The new data itself is not checked, other than that there
+    is the right amount of it, so it must be numeric.
+
+    Charts rendered with the template's :py:meth:`to_svg` method share a
+    :py:class:`.FrameCache`, so their frame is only painted again when the
+    new data moves the limits or ticks.
+
+    :param AxisChart chart: The chart to take the configuration from. Its\
+    data is not used.
+    :param int max_frames: The number of frame layers the template should\
+    remember.
+    :raises TypeError: if the chart has a streamed series, such as a\
+    :py:class:`.SegmentedSeries`, as its data can't be replaced."""
+
+    def __init__(self, chart, max_frames=64):
+        if not isinstance(chart, AxisChart):
+            raise TypeError("'%s' is not an AxisChart" % str(chart))
+        for series in chart.all_series():
+            if series.streamed:
+                raise TypeError(
+                 "'%s' is streamed from disk, so can't be templated" % str(
+                  series
+                 )
+                )
+        self._chart_class = chart.__class__
+        self._chart_state = chart_state(chart)
+        self._chart_state["_layers"] = None
+        self._series_states = [
+         (series.__class__, series_state(series)) for series in chart.all_series()
+        ]
+        self._frames = FrameCache(max_frames)
+
+
+    def __repr__(self):
+        return "<ChartTemplate (%i series)>" % len(self._series_states)
+
+
+    @classmethod
+    def from_state(cls, chart_class, chart_state, series_states, max_frames=64):
+        """Creates a template straight from the attributes of a chart and its
+        series, rather than from an existing chart. The attributes are not
+        checked.
+
+        :param type chart_class: The class of chart to create.
+        :param dict chart_state: The chart's attributes.
+        :param list series_states: The (class, attributes) of each series.
+        :param int max_frames: The number of frame layers the template should\
+        remember.
+        :rtype: :py:class:`ChartTemplate`"""
+
+        template = cls.__new__(cls)
+        template._chart_class = chart_class
+        template._chart_state = dict(chart_state, _layers=None)
+        template._series_states = list(series_states)
+        template._frames = FrameCache(max_frames)
+        return template
+
+
+    def frames(self):
+        """Returns the frame cache shared by charts rendered with the
+        template.
+
+        :rtype: :py:class:`.FrameCache`"""
+
+        return self._frames
+
+
+    def bind(self, *data, ordered=False):
+        """Creates a new chart from the template, with new data for each of
+        its series.
+
+        :param \*data: The data for each series in turn, as two sequences of\
+        x and y values respectively.
+        :param bool ordered: If ``True``, the data is trusted to already be in\
+        order of x value, and is not sorted.
+        :raises ValueError: if the wrong number of data sequences are given,\
+        or if any series' x and y sequences are of unequal length or empty.
+        :rtype: :py:class:`.AxisChart`"""
+
+        if len(data) != len(self._series_states):
+            raise ValueError("Template has %i series but %i were given" % (
+             len(self._series_states), len(data)
+            ))
+        chart = self._chart_class.__new__(self._chart_class)
+        chart.__dict__.update(self._chart_state)
+        chart._all_series = []
+        for (series_class, state), (x_values, y_values) in zip(
+         self._series_states, data
+        ):
+            if len(x_values) != len(y_values):
+                raise ValueError(
+                 "x and y data sequences are of unequal length (%i and %i)" % (
+                  len(x_values), len(y_values)
+                 )
+                )
+            if len(x_values) == 0:
+                raise ValueError("Cannot create Series with no data")
+            series = series_class.__new__(series_class)
+            series.__dict__.update(state)
+            if ordered:
+                series._data = list(zip(x_values, y_values))
+            else:
+                series._data = sorted(
+                 zip(x_values, y_values), key=lambda k: k[0]
+                )
+            series._chart = chart
+            series._version = 0
+            series._state = next_state()
+            series._lock = threading.Lock()
+            series._shared = False
+            series._extents = {}
+            chart._all_series.append(series)
+        return chart
+
+
+    def to_svg(self, *data, **kwargs):
+        """Binds the template to new data and renders the resulting chart as
+        SVG text, using the template's frame cache. Any keyword arguments are
+        passed on to the :py:class:`.SvgRenderer`.
+
+        :param \*data: The data for each series in turn, as two sequences of\
+        x and y values respectively.
+        :rtype: ``str``"""
+
+        kwargs.setdefault("frames", self._frames)
+        return self.bind(*data).to_svg(**kwargs)
+
+
+
+def chart_state(chart):
+    """Returns the attributes which make up a chart's configuration - all of
+    them except its series and any remembered layers.
+
+    :param AxisChart chart: The chart.
+    :rtype: ``dict``"""
+
+    return {
+     name: value for name, value in vars(chart).items()
+      if name not in ("_all_series", "_layers")
+    }
+
+
+def series_state(series):
+    """Returns the attributes which make up a series' style - all of them
+    except its data, the chart it belongs to and the state it keeps about its
+    data.
+
+    :param Series series: The series.
+    :rtype: ``dict``"""
+
+    return {
+     name: value for name, value in vars(series).items()
+      if name not in (
+       "_data", "_chart", "_version", "_state", "_lock", "_shared",
+       "_extents"
+      )
+    }
@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest import IsolatedAsyncioTestCase
+from quickplots.charts import AxisChart
+from quickplots.series import LineSeries
+from quickplots.svg import SvgRenderer
+from quickplots.renderers import CountingRenderer
+from quickplots.png import PngRenderer
+from quickplots.cache import RenderCache
+from quickplots.asynchronous import offload, feed
+
+class AsyncRenderTests(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.chart = AxisChart(LineSeries((1, 1), (2, 4), (3, 9)), title="T")
+
+
+    async def test_can_create_asynchronously(self):
+        svg = await self.chart.create_async(SvgRenderer())
+        self.assertEqual(svg, self.chart.to_svg())
+        canvas = await self.chart.create_async()
+        self.assertEqual(canvas.width(), 700)
+
+
+    async def test_can_render_asynchronously(self):
+        self.assertEqual(await self.chart.render_async(), self.chart.to_svg())
+        self.assertEqual(
+         await self.chart.render_async(PngRenderer), self.chart.to_png()
+        )
+        self.assertEqual(
+         await self.chart.render_async(precision=0),
+         self.chart.to_svg(precision=0)
+        )
+
+
+    async def test_async_renders_use_cache(self):
+        cache = RenderCache()
+        svg = await self.chart.render_async(cache=cache)
+        self.assertEqual(await self.chart.render_async(cache=cache), svg)
+        self.assertEqual(self.chart.to_svg(cache=cache), svg)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1})
+
+
+    async def test_async_renders_which_cant_be_cached_are_rejected(self):
+        with self.assertRaises(TypeError):
+            await self.chart.render_async(CountingRenderer, cache=RenderCache())
+
+
+    async def test_can_render_in_process_pool(self):
+        with ProcessPoolExecutor(1) as executor:
+            svg = await self.chart.render_async(executor=executor)
+        self.assertEqual(svg, self.chart.to_svg())
+
+
+
+class OffloadTests(IsolatedAsyncioTestCase):
+
+    async def test_limiter_limits_concurrent_work(self):
+        running, most = [0], [0]
+        lock = threading.Lock()
+        def work():
+            with lock:
+                running[0] += 1
+                most[0] = max(most[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+        limiter = asyncio.Semaphore(2)
+        await asyncio.gather(*[offload(work, limiter=limiter) for _ in range(8)])
+        self.assertEqual(most[0], 2)
+
+
+    async def test_cancelled_work_keeps_limiter_until_finished(self):
+        started, finish = threading.Event(), threading.Event()
+        calls = []
+        def work(name):
+            calls.append(name)
+            started.set()
+            finish.wait(5)
+        limiter = asyncio.Semaphore(1)
+        first = asyncio.create_task(offload(work, "first", limiter=limiter))
+        second = asyncio.create_task(offload(work, "second", limiter=limiter))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        second.cancel()
+        first.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+        with self.assertRaises(asyncio.CancelledError):
+            await second
+        self.assertTrue(limiter.locked())
+        finish.set()
+        await asyncio.wait_for(limiter.acquire(), 5)
+        self.assertEqual(calls, ["first"])
+
+
+
+class FeedTests(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.series = LineSeries((0, 0))
+        self.chart = AxisChart(self.series)
+
+
+    async def test_feed_adds_all_data_and_renders_final_frame(self):
+        async def source():
+            for start in range(1, 10, 3):
+                await asyncio.sleep(0)
+                yield [(x, x * x) for x in range(start, start + 3)]
+        renders = []
+        frames = await feed(self.series, source(), renders.append, max_fps=1000)
+        self.assertEqual(self.series.data(), [(x, x * x) for x in range(10)])
+        self.assertEqual(frames, len(renders))
+        self.assertGreaterEqual(frames, 1)
+        self.assertEqual(renders[-1], self.chart.to_svg())
+
+
+    async def test_feed_coalesces_bursts(self):
+        async def source():
+            for x in range(1, 101):
+                yield [(x, x)]
+        renders = []
+        frames = await feed(self.series, source(), renders.append, max_fps=5)
+        self.assertLessEqual(frames, 3)
+        self.assertEqual(len(self.series.data()), 101)
+
+
+    async def test_feed_limits_frame_rate(self):
+        async def source():
+            for x in range(1, 11):
+                await asyncio.sleep(0.01)
+                yield [(x, x)]
+        start = time.monotonic()
+        frames = await feed(self.series, source(), max_fps=20)
+        elapsed = time.monotonic() - start
+        self.assertLessEqual(frames, elapsed * 20 + 1)
+
+
+    async def test_feed_applies_backpressure(self):
+        pending = []
+        async def source():
+            for x in range(1, 21):
+                pending.append(x)
+                yield [(x, x)]
+        async def on_frame(svg):
+            pending.clear()
+        await feed(self.series, source(), on_frame, max_fps=1000, max_pending=5)
+        self.assertEqual(len(self.series.data()), 21)
+        self.assertLessEqual(len(pending), 5)
+
+
+    async def test_feed_can_await_frame_callback(self):
+        async def source():
+            yield [(1, 1)]
+        seen = []
+        async def on_frame(svg):
+            await asyncio.sleep(0)
+            seen.append(svg)
+        self.assertEqual(await feed(self.series, source(), on_frame), 1)
+        self.assertEqual(len(seen), 1)
+
+
+    async def test_feed_raises_source_errors(self):
+        async def source():
+            yield [(1, 1)]
+            raise OSError("Connection lost")
+        with self.assertRaises(OSError):
+            await feed(self.series, source(), max_fps=1000)
+        self.assertEqual(self.series.data(), [(0, 0), (1, 1)])
+
+
+    async def test_series_must_belong_to_chart(self):
+        async def source():
+            yield [(1, 1)]
+        with self.assertRaises(ValueError):
+            await feed(LineSeries((0, 0)), source())
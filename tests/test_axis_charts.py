@@ -1,9 +1,11 @@
+import threading
 from unittest import TestCase
 from unittest.mock import patch, Mock
 from omnicanvas import Canvas, colors
 from omnicanvas.graphics import Text, Rectangle, Polyline, Line
 from quickplots.charts import AxisChart, Chart, determine_ticks
 from quickplots.series import Series, LineSeries, ScatterSeries
+from quickplots.series import transform_points, transform_columns
 
 class AxisChartTest(TestCase):
 
@@ -31,6 +33,7 @@ class AxisChartCreationTests(AxisChartTest):
         self.assertEqual(chart._y_ticks, None)
         self.assertEqual(chart._x_grid, True)
         self.assertEqual(chart._y_grid, True)
+        self.assertEqual(chart._geometry_workers, 1)
 
 
     @patch("quickplots.charts.Chart.__init__")
@@ -983,3 +986,126 @@ class AxisChartCanvasTests(AxisChartTest):
         y_grids = [g for g in canvas.graphics() if g.name() == "ygrid"]
         for grid in x_grids + y_grids:
             self.assertEqual(grid.line_style(), "..")
+
+
+    def test_title_is_in_front_of_everything(self):
+        self.chart.x_label("Input")
+        canvas = self.chart.create()
+        title = canvas.get_graphic_by_name("title")
+        self.assertIs(title, canvas.graphics()[-1])
+
+
+    @patch("omnicanvas.Canvas.move_graphic_backward")
+    @patch("omnicanvas.Canvas.move_graphic_forward")
+    def test_graphics_are_not_moved_once_added(self, forward, backward):
+        canvas = self.chart.create()
+        self.assertFalse(forward.called)
+        self.assertFalse(backward.called)
+
+
+
+
+class AxisChartSnapshotTests(AxisChartTest):
+
+    def setUp(self):
+        AxisChartTest.setUp(self)
+        self.chart = AxisChart(self.series1, self.series2)
+
+
+    def test_snapshot_copies_chart_and_series(self):
+        snapshot = self.chart.snapshot()
+        self.assertIsInstance(snapshot, AxisChart)
+        self.assertEqual(snapshot.title(), self.chart.title())
+        self.assertEqual(len(snapshot.all_series()), 2)
+        for original, copied in zip(self.chart.all_series(), snapshot.all_series()):
+            self.assertIsNot(copied, original)
+            self.assertIs(copied.chart(), snapshot)
+            self.assertEqual(copied.data(), original.data())
+        self.chart.title("New")
+        self.chart.line((5, 5), (6, 6))
+        self.series1.add_data_point(4, 16)
+        self.assertEqual(snapshot.title(), "")
+        self.assertEqual(len(snapshot.all_series()), 2)
+        self.assertEqual(snapshot.largest_x(), 1000)
+        self.assertEqual(len(snapshot.series().data()), 3)
+
+
+    def test_rendering_does_not_change_chart(self):
+        svg = self.chart.to_svg()
+        self.assertIs(self.series1.chart(), self.chart)
+        self.assertEqual(self.chart.to_svg(), svg)
+
+
+    def test_series_can_be_changed_while_rendering(self):
+        series = LineSeries(*[(x, x % 7) for x in range(2000)])
+        chart = AxisChart(series)
+        done = threading.Event()
+        def write():
+            x = 2000
+            while not done.is_set() and x < 5000:
+                series.add_data_point(x, x % 7)
+                x += 1
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            for _ in range(10):
+                snapshot = chart.snapshot()
+                data = snapshot.series().data()
+                self.assertEqual(data, sorted(data))
+                self.assertEqual(snapshot.to_svg(), snapshot.to_svg())
+                self.assertEqual(snapshot.series().data(), data)
+                chart.create()
+        finally:
+            done.set()
+            writer.join()
+        self.assertEqual(series.data(), [(x, x % 7) for x in range(len(series.data()))])
+
+
+
+
+class AxisChartGeometryTests(AxisChartTest):
+
+    def setUp(self):
+        AxisChartTest.setUp(self)
+        self.chart = AxisChart(self.series1, self.series2)
+        self.chart.scatter((1, 1.5), (2, 40.25), (3, 9))
+
+
+    def test_geometry_workers(self):
+        self.assertEqual(self.chart.geometry_workers(), 1)
+        self.chart.geometry_workers(4)
+        self.assertEqual(self.chart.geometry_workers(), 4)
+        with self.assertRaises(TypeError):
+            self.chart.geometry_workers(1.5)
+        with self.assertRaises(ValueError):
+            self.chart.geometry_workers(0)
+
+
+    def test_series_geometry_matches_canvas_points(self):
+        points = [series.canvas_points() for series in self.chart.all_series()]
+        self.assertEqual(self.chart.series_geometry(self.chart.all_series()), points)
+        self.chart.geometry_workers(2)
+        self.assertEqual([tuple(p) for p in self.chart.series_geometry(
+         self.chart.all_series()
+        )], points)
+
+
+    def test_transform_columns_matches_transform_points(self):
+        transform = self.chart.canvas_transform()
+        values = self.series1.value_lists()
+        x, y = transform_columns(*values, transform)
+        self.assertEqual((x.typecode, y.typecode), ("d", "d"))
+        self.assertEqual(tuple(zip(x, y)), transform_points(*values, transform))
+
+
+    def test_parallel_geometry_renders_the_same(self):
+        svg, png = self.chart.to_svg(), self.chart.to_png()
+        self.chart.geometry_workers(2)
+        self.assertEqual(self.chart.to_svg(), svg)
+        self.assertEqual(self.chart.to_png(), png)
+        self.chart.incremental(True)
+        self.assertEqual(self.chart.to_svg(), svg)
+        self.series1.add_data_point(4, 16)
+        svg = self.chart.to_svg()
+        self.chart.incremental(False)
+        self.assertEqual(self.chart.to_svg(), svg)
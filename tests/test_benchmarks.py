@@ -0,0 +1,42 @@
+import json
+from unittest import TestCase
+from benchmarks.run import run_suite, compare, BENCHMARKS
+
+class BenchmarkSuiteTests(TestCase):
+
+    def setUp(self):
+        self.results = run_suite(points=[50], series=[1, 2], repeat=1)
+
+
+    def test_suite_runs_every_benchmark(self):
+        names = set(result["benchmark"] for result in self.results["results"])
+        self.assertEqual(names, set(BENCHMARKS))
+
+
+    def test_only_series_benchmarks_vary_series(self):
+        for name, (setup, uses_series) in BENCHMARKS.items():
+            series = [
+             result["series"] for result in self.results["results"]
+              if result["benchmark"] == name
+            ]
+            self.assertEqual(series, [1, 2] if uses_series else [1])
+
+
+    def test_results_are_json(self):
+        loaded = json.loads(json.dumps(self.results))
+        self.assertEqual(loaded, self.results)
+        for result in loaded["results"]:
+            self.assertGreaterEqual(result["seconds"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+        self.assertIn("quickplots", loaded)
+        self.assertIn("python", loaded)
+
+
+    def test_can_compare_runs(self):
+        self.assertEqual(compare(self.results, self.results), [])
+        slower = json.loads(json.dumps(self.results))
+        first = slower["results"][0]
+        first["seconds"] = first["seconds"] * 2 + 1
+        regressions = compare(self.results, slower)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0][:4], ("series_init", 50, 1, "seconds"))
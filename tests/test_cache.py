@@ -0,0 +1,331 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from quickplots.charts import AxisChart
+from quickplots.series import Series, LineSeries, ScatterSeries
+from quickplots.cache import chart_key, RenderCache, FrameCache, DiskCache
+from quickplots.renderers import OmniCanvasRenderer, CountingRenderer
+from quickplots.svg import SvgRenderer
+
+class ChartKeyTests(TestCase):
+
+    def setUp(self):
+        self.chart = AxisChart(LineSeries((1, 1), (2, 4), (3, 9)), title="T")
+
+
+    def make_chart(self):
+        return AxisChart(LineSeries((1, 1), (2, 4), (3, 9)), title="T")
+
+
+    def test_identical_charts_have_identical_keys(self):
+        self.assertEqual(chart_key(self.chart), chart_key(self.make_chart()))
+
+
+    def test_key_changes_with_data(self):
+        key = chart_key(self.chart)
+        self.chart.series().add_data_point(4, 16)
+        self.assertNotEqual(chart_key(self.chart), key)
+
+
+    def test_key_changes_with_series_style(self):
+        key = chart_key(self.chart)
+        self.chart.series().linewidth(5)
+        self.assertNotEqual(chart_key(self.chart), key)
+
+
+    def test_key_changes_with_chart_settings(self):
+        keys = set([chart_key(self.chart)])
+        self.chart.title("New title")
+        keys.add(chart_key(self.chart))
+        self.chart.x_label("x")
+        keys.add(chart_key(self.chart))
+        self.chart.vertical_padding(0.2)
+        keys.add(chart_key(self.chart))
+        self.chart.y_ticks(0, 5, 10)
+        keys.add(chart_key(self.chart))
+        self.chart.x_upper_limit(10)
+        keys.add(chart_key(self.chart))
+        self.chart.width(100)
+        keys.add(chart_key(self.chart))
+        self.assertEqual(len(keys), 7)
+
+
+    def test_key_changes_with_series_type(self):
+        chart = AxisChart(ScatterSeries((1, 1), (2, 4), (3, 9)), title="T")
+        self.assertNotEqual(chart_key(self.chart), chart_key(chart))
+
+
+    def test_series_digest_is_remembered_until_data_changes(self):
+        series = self.chart.series()
+        key = chart_key(self.chart)
+        with patch("quickplots.cache.exact_array") as pack:
+            self.assertEqual(chart_key(self.chart), key)
+            self.assertEqual(chart_key(self.chart.snapshot()), key)
+            self.assertFalse(pack.called)
+        series.add_data_point(4, 16)
+        self.assertNotEqual(chart_key(self.chart), key)
+        series.remove_data_point(4, 16)
+        self.assertEqual(chart_key(self.chart), key)
+
+
+    def test_changed_snapshot_has_its_own_key(self):
+        snapshot = self.chart.snapshot()
+        self.chart.series().add_data_point(4, 16)
+        snapshot.series().add_data_point(5, 100)
+        self.assertNotEqual(chart_key(self.chart), chart_key(snapshot))
+        cache = RenderCache()
+        self.chart.to_svg(cache=cache)
+        self.assertEqual(snapshot.to_svg(cache=cache), snapshot.to_svg())
+
+
+    def test_inexact_data_has_distinct_keys(self):
+        keys = set(chart_key(AxisChart(LineSeries(*data))) for data in (
+         ((1, 2 ** 70), (2, 1)), ((1, 2 ** 70 + 1), (2, 1)),
+         ((1, 2.0), (2, 1)), ((1, 2), (2, 1))
+        ))
+        self.assertEqual(len(keys), 4)
+
+
+    def test_key_includes_extra_values(self):
+        self.assertNotEqual(
+         chart_key(self.chart, "svg"), chart_key(self.chart, "png")
+        )
+
+
+
+class RenderCacheTests(TestCase):
+
+    def test_can_create_cache(self):
+        cache = RenderCache(max_bytes=100)
+        self.assertEqual(cache.max_bytes(), 100)
+        self.assertEqual(cache.size(), 0)
+        self.assertEqual(len(cache), 0)
+
+
+    def test_max_bytes_must_be_positive_int(self):
+        with self.assertRaises(TypeError):
+            RenderCache(max_bytes=1.5)
+        with self.assertRaises(ValueError):
+            RenderCache(max_bytes=0)
+
+
+    def test_can_store_and_get_renders(self):
+        cache = RenderCache()
+        cache.put("a", "<svg />")
+        self.assertEqual(cache.get("a"), "<svg />")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+        self.assertIn("a", cache)
+        self.assertEqual(cache.size(), 7)
+
+
+    def test_can_only_store_text_or_bytes(self):
+        with self.assertRaises(TypeError):
+            RenderCache().put("a", 100)
+
+
+    def test_least_recently_used_renders_are_evicted(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", "1234")
+        cache.put("b", b"1234")
+        cache.get("a")
+        cache.put("c", "1234")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.size(), 8)
+
+
+    def test_replacing_render_updates_size(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", "1234")
+        cache.put("a", "12")
+        self.assertEqual(cache.size(), 2)
+
+
+    def test_oversized_renders_are_not_stored(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", "12345678901")
+        self.assertEqual(len(cache), 0)
+
+
+    def test_can_clear_cache(self):
+        cache = RenderCache()
+        cache.put("a", "1234")
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size(), 0)
+
+
+
+class FrameCacheTests(TestCase):
+
+    def test_can_create_frame_cache(self):
+        cache = FrameCache(max_frames=10)
+        self.assertEqual(cache.max_frames(), 10)
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(TypeError):
+            FrameCache(max_frames=1.5)
+        with self.assertRaises(ValueError):
+            FrameCache(max_frames=0)
+
+
+    def test_least_recently_used_frames_are_evicted(self):
+        cache = FrameCache(max_frames=2)
+        cache.put(("grid", 1), ("a", 1, 0))
+        cache.put(("grid", 2), ("b", 1, 0))
+        self.assertEqual(cache.get(("grid", 1)), ("a", 1, 0))
+        cache.put(("grid", 3), ("c", 1, 0))
+        self.assertIn(("grid", 1), cache)
+        self.assertNotIn(("grid", 2), cache)
+        self.assertIsNone(cache.get(("grid", 2)))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+class DiskCacheTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "renders")
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def test_can_create_disk_cache(self):
+        cache = DiskCache(self.path, max_bytes=1000)
+        self.assertTrue(os.path.isdir(self.path))
+        self.assertEqual(cache.directory(), self.path)
+        self.assertEqual(cache.max_bytes(), 1000)
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(TypeError):
+            DiskCache(100)
+        with self.assertRaises(ValueError):
+            DiskCache(self.path, max_bytes=0)
+
+
+    def test_can_store_and_get_renders(self):
+        cache = DiskCache(self.path)
+        cache.put("ab12", "<svg>\u00e9</svg>")
+        cache.put("cd34", b"\x89PNG")
+        self.assertEqual(cache.get("ab12"), "<svg>\u00e9</svg>")
+        self.assertEqual(cache.get("cd34"), b"\x89PNG")
+        self.assertIsNone(cache.get("ef56"))
+        self.assertIn("ab12", cache)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1})
+        self.assertEqual(cache.size(), 17)
+
+
+    def test_invalid_keys_are_rejected(self):
+        cache = DiskCache(self.path)
+        with self.assertRaises(ValueError):
+            cache.put("../escape", "x")
+
+
+    def test_renders_are_shared_between_caches(self):
+        DiskCache(self.path).put("ab12", "<svg/>")
+        cache = DiskCache(self.path)
+        self.assertEqual(cache.get("ab12"), "<svg/>")
+        self.assertEqual(cache.size(), 6)
+
+
+    def test_no_temporary_files_are_left(self):
+        cache = DiskCache(self.path)
+        cache.put("ab12", "<svg/>")
+        self.assertEqual(os.listdir(os.path.join(self.path, "ab")), ["ab12.txt"])
+
+
+    def test_least_recently_used_renders_are_evicted(self):
+        cache = DiskCache(self.path, max_bytes=35)
+        for number, key in enumerate(("aa", "bb", "cc")):
+            cache.put(key, "x" * 10)
+            os.utime(cache.path(key, str), (number, number))
+        cache.get("aa")
+        cache.put("dd", "x" * 10)
+        self.assertEqual(sorted(
+         key for key in ("aa", "bb", "cc", "dd") if key in cache
+        ), ["aa", "cc", "dd"])
+        self.assertEqual(cache.size(), 30)
+
+
+    def test_size_limit_holds_across_processes(self):
+        caches = [DiskCache(self.path, max_bytes=1000) for _ in range(8)]
+        for number in range(10):
+            for index, cache in enumerate(caches):
+                cache.put("k%i%i" % (index, number), "x" * 100)
+                self.assertLessEqual(cache.size(), 1000)
+
+
+    def test_directory_is_only_measured_now_and_then(self):
+        cache = DiskCache(self.path, max_bytes=1000000)
+        with patch("quickplots.cache.DiskCache.files", return_value=[]) as files:
+            for number in range(130):
+                cache.put("k%i" % number, "x")
+        self.assertEqual(files.call_count, 2)
+
+
+    def test_renders_deleted_by_others_are_misses(self):
+        cache = DiskCache(self.path)
+        cache.put("ab12", "<svg/>")
+        DiskCache(self.path).clear()
+        self.assertIsNone(cache.get("ab12"))
+        cache.evict()
+        self.assertEqual(cache.size(), 0)
+
+
+    def test_charts_can_use_disk_cache(self):
+        chart = AxisChart(LineSeries((1, 1), (2, 4)))
+        svg = chart.to_svg(cache=DiskCache(self.path))
+        cache = DiskCache(self.path)
+        with patch("quickplots.charts.AxisChart.paint") as paint:
+            self.assertEqual(chart.to_svg(cache=cache), svg)
+            self.assertFalse(paint.called)
+
+
+
+class CachedRenderTests(TestCase):
+
+    def setUp(self):
+        self.chart = AxisChart(LineSeries((1, 1), (2, 4), (3, 9)), title="T")
+        self.cache = RenderCache()
+
+
+    def test_cached_svg_is_reused(self):
+        svg = self.chart.to_svg(cache=self.cache)
+        self.assertEqual(svg, self.chart.to_svg())
+        with patch("quickplots.charts.AxisChart.paint") as paint:
+            self.assertEqual(self.chart.to_svg(cache=self.cache), svg)
+            self.assertFalse(paint.called)
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1})
+
+
+    def test_changed_chart_is_rendered_again(self):
+        self.chart.to_svg(cache=self.cache)
+        self.chart.title("New title")
+        self.assertIn("New title", self.chart.to_svg(cache=self.cache))
+        self.assertEqual(len(self.cache), 2)
+
+
+    def test_render_options_are_part_of_key(self):
+        self.chart.to_svg(cache=self.cache)
+        svg = self.chart.to_svg(cache=self.cache, precision=0)
+        self.assertEqual(svg, self.chart.to_svg(precision=0))
+        png = self.chart.to_png(cache=self.cache)
+        self.assertEqual(self.chart.to_png(cache=self.cache), png)
+        self.assertEqual(len(self.cache), 3)
+
+
+    def test_renderers_which_cant_be_cached_are_rejected(self):
+        for renderer_class, kwargs in (
+         (OmniCanvasRenderer, {}), (CountingRenderer, {}),
+         (SvgRenderer, {"output": io.StringIO()})
+        ):
+            with patch("quickplots.charts.AxisChart.paint") as paint:
+                with self.assertRaises(TypeError):
+                    self.chart.render(renderer_class, cache=self.cache, **kwargs)
+                self.assertFalse(paint.called)
+        self.assertEqual(len(self.cache), 0)
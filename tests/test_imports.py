@@ -11,3 +11,8 @@ class QuickObjectsTests(TestCase):
     def test_scatter_imported(self):
         from quickplots.quick import scatter
         self.assertIs(scatter, quickplots.scatter)
+
+
+    def test_render_many_imported(self):
+        from quickplots.parallel import render_many
+        self.assertIs(render_many, quickplots.render_many)
@@ -0,0 +1,133 @@
+import os
+import tempfile
+from unittest import TestCase
+import quickplots
+from quickplots.cache import RenderCache, DiskCache
+from quickplots.charts import AxisChart
+from quickplots.renderers import CountingRenderer
+from quickplots.metrics import add_metrics_hook, remove_metrics_hook, counted
+from quickplots.segments import SegmentedLineSeries, write_segments
+
+class MetricsTest(TestCase):
+
+    def setUp(self):
+        self.reported = []
+        add_metrics_hook(self.hook)
+        self.chart = quickplots.line((1, 1), (2, 4), (3, 9), name="a")
+        self.chart.scatter((1, 2), (2, 3), name="b")
+
+
+    def tearDown(self):
+        remove_metrics_hook(self.hook)
+
+
+    def hook(self, name, value, labels):
+        self.reported.append((name, value, labels))
+
+
+    def metrics(self, name):
+        return [(value, labels) for n, value, labels in self.reported if n == name]
+
+
+
+class MetricsHookTests(MetricsTest):
+
+    def test_hooks_must_be_callable(self):
+        with self.assertRaises(TypeError):
+            add_metrics_hook(None)
+
+
+    def test_removed_hooks_are_not_called(self):
+        remove_metrics_hook(self.hook)
+        self.chart.to_svg()
+        add_metrics_hook(self.hook)
+        self.assertEqual(self.reported, [])
+
+
+    def test_counted_passes_points_on(self):
+        points = counted(iter([(1, 2), (3, 4)]), "points_out", layer="x")
+        self.assertEqual(list(points), [(1, 2), (3, 4)])
+        self.assertEqual(self.metrics("points_out"), [(2, {"layer": "x"})])
+
+
+
+class RenderMetricsTests(MetricsTest):
+
+    def test_points_are_counted(self):
+        self.chart.to_svg()
+        self.assertEqual(self.metrics("points_in"), [
+         (3, {"series": "a", "layer": "series1"}),
+         (2, {"series": "b", "layer": "series2"})
+        ])
+        self.assertEqual(self.metrics("points_out"), [
+         (3, {"series": "a", "layer": "series1"}),
+         (2, {"series": "b", "layer": "series2"})
+        ])
+
+
+    def test_points_are_counted_when_renderer_does_not_read_them(self):
+        self.chart.create(CountingRenderer())
+        self.assertEqual(self.metrics("points_out"), [
+         (3, {"series": "a", "layer": "series1"}),
+         (2, {"series": "b", "layer": "series2"})
+        ])
+
+
+    def test_graphics_and_output_size_are_reported(self):
+        self.chart.title("\u00e9t\u00e9")
+        svg = self.chart.to_svg()
+        canvas = self.chart.create()
+        png = self.chart.to_png()
+        self.assertEqual(self.metrics("output_size"), [
+         (len(svg.encode("utf-8")), {"renderer": "SvgRenderer"}),
+         (len(png), {"renderer": "PngRenderer"})
+        ])
+        self.assertEqual(self.metrics("graphics"), [
+         (len(canvas.graphics()), {"renderer": "SvgRenderer"}),
+         (len(canvas.graphics()), {"renderer": "OmniCanvasRenderer"}),
+         (len(canvas.graphics()), {"renderer": "PngRenderer"})
+        ])
+
+
+    def test_incremental_renders_only_count_painted_series(self):
+        self.chart.incremental(True)
+        self.chart.to_svg()
+        self.chart.series().add_data_point(2.5, 5)
+        self.reported = []
+        self.chart.to_svg()
+        self.assertEqual(self.metrics("points_in"), [
+         (4, {"series": "a", "layer": "series1"})
+        ])
+
+
+    def test_clipped_points_are_counted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "series")
+            write_segments(path, list(range(100)), [1] * 100, segment_size=10)
+            chart = AxisChart(SegmentedLineSeries(path))
+            chart.x_lower_limit(30)
+            chart.x_upper_limit(50)
+            chart.to_svg()
+            chart.create(CountingRenderer())
+        self.assertEqual(self.metrics("points_in")[0][0], 100)
+        # Segments overlapping the limits are read whole, along with the
+        # nearest points either side of them
+        self.assertEqual(
+         [value for value, labels in self.metrics("points_out")], [32, 32]
+        )
+
+
+    def test_cache_hits_and_misses_are_reported(self):
+        cache = RenderCache()
+        self.chart.to_svg(cache)
+        self.chart.to_svg(cache)
+        with tempfile.TemporaryDirectory() as directory:
+            disk = DiskCache(directory)
+            self.chart.to_svg(disk)
+            self.chart.to_svg(disk)
+        self.assertEqual(
+         [(n, l["cache"]) for n, v, l in self.reported if n.startswith("cache")], [
+          ("cache_miss", "RenderCache"), ("cache_hit", "RenderCache"),
+          ("cache_miss", "DiskCache"), ("cache_hit", "DiskCache")
+         ]
+        )
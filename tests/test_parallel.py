@@ -0,0 +1,155 @@
+import os
+import gzip
+import pickle
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from unittest import TestCase
+import quickplots
+from quickplots.charts import Chart
+from quickplots.parallel import render_many, build_chart, SharedMemoryTransport
+
+class CrashingChart(Chart):
+
+    def to_svg(self, **kwargs):
+        os._exit(1)
+
+
+
+class RenderManyTests(TestCase):
+
+    def setUp(self):
+        self.charts = [
+         quickplots.line((1, 1), (2, 4), title="A"),
+         {"type": "scatter", "data": [(1, 2), (2, 3)], "title": "B"},
+         quickplots.line((1, 5), (2, 1), title="C")
+        ]
+
+
+    def test_can_render_in_one_process(self):
+        results = render_many(self.charts, workers=1)
+        self.assertEqual(results[0], self.charts[0].to_svg())
+        self.assertIn(">B</text>", results[1])
+        self.assertEqual(results[2], self.charts[2].to_svg())
+
+
+    def test_can_render_in_several_processes(self):
+        results = render_many(self.charts * 3, workers=2, chunksize=2)
+        self.assertEqual(results, render_many(self.charts * 3, workers=1))
+
+
+    def test_charts_with_geometry_workers_can_be_rendered(self):
+        charts = [quickplots.line((1, 1), (2, 4)) for _ in range(4)]
+        for chart in charts:
+            chart.line((1, 3), (2, 2))
+            chart.geometry_workers(2)
+        # The parent's pool is created first, and inherited by the workers
+        svg = charts[0].to_svg()
+        self.assertEqual(render_many(charts, workers=2), [svg] * 4)
+
+
+    def test_failed_charts_are_returned_in_place(self):
+        charts = [self.charts[0], {"type": "pie"}, "chart", self.charts[2]]
+        results = render_many(charts, workers=2, chunksize=4)
+        self.assertEqual(results[0], self.charts[0].to_svg())
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsInstance(results[2], TypeError)
+        self.assertEqual(results[3], self.charts[2].to_svg())
+
+
+    def test_unpicklable_charts_only_lose_themselves(self):
+        bad = quickplots.line((1, 1), (2, 4))
+        bad._title = lambda: "title"
+        results = render_many(
+         [self.charts[0], bad, self.charts[2]], workers=2, chunksize=3
+        )
+        self.assertEqual(results[0], self.charts[0].to_svg())
+        self.assertIsInstance(results[1], Exception)
+        self.assertEqual(results[2], self.charts[2].to_svg())
+
+
+    def test_crashed_workers_only_lose_their_chart(self):
+        charts = self.charts * 3
+        charts.insert(4, CrashingChart())
+        results = render_many(charts, workers=2, chunksize=2)
+        self.assertIsInstance(results[4], BrokenProcessPool)
+        del results[4]
+        self.assertEqual(results, render_many(self.charts * 3, workers=1))
+
+
+    def test_can_render_other_formats(self):
+        svgz, png = render_many(self.charts[:1], workers=1, format="svgz") + \
+         render_many(self.charts[:1], workers=1, format="png")
+        self.assertEqual(gzip.decompress(svgz).decode(), self.charts[0].to_svg())
+        self.assertEqual(png, self.charts[0].to_png())
+        with self.assertRaises(ValueError):
+            render_many(self.charts, format="gif")
+
+
+    def test_can_save_to_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = render_many(self.charts, workers=2, output=directory)
+            self.assertEqual(paths, [
+             os.path.join(directory, "chart%i.svg" % i) for i in range(3)
+            ])
+            with open(paths[2], encoding="utf-8") as f:
+                self.assertEqual(f.read(), self.charts[2].to_svg())
+
+
+    def test_workers_must_be_positive_int(self):
+        with self.assertRaises(TypeError):
+            render_many(self.charts, workers=1.5)
+        with self.assertRaises(ValueError):
+            render_many(self.charts, workers=0)
+
+
+    def test_specs_are_built_with_quick_functions(self):
+        chart = build_chart({"data": [(1, 2), (3, 4)], "color": "#FF0000"})
+        self.assertEqual(chart.series().color(), "#FF0000")
+        self.assertEqual(chart.series().data(), [(1, 2), (3, 4)])
+
+
+
+class SharedMemoryTransportTests(TestCase):
+
+    def setUp(self):
+        self.chart = quickplots.line((1, 1.5), (2, 4.0), (3, 9.5), title="A")
+        self.chart.scatter((1, 2), (2, 3.5))
+
+
+    def test_shared_chart_is_rebuilt_identically(self):
+        with SharedMemoryTransport() as transport:
+            handle = transport.share(self.chart)
+            handle = pickle.loads(pickle.dumps(handle))
+            chart = handle.chart()
+        self.assertEqual(chart.series().data(), [(1, 1.5), (2, 4.0), (3, 9.5)])
+        self.assertEqual(chart.all_series()[1].data(), [(1, 2), (2, 3.5)])
+        self.assertEqual(chart.to_svg(), self.chart.to_svg())
+
+
+    def test_handle_is_smaller_than_chart(self):
+        chart = quickplots.line(*[(x, x * 0.5) for x in range(10000)])
+        with SharedMemoryTransport() as transport:
+            handle = transport.share(chart)
+            self.assertLess(len(pickle.dumps(handle)), 2000)
+
+
+    def test_blocks_are_freed_on_close(self):
+        transport = SharedMemoryTransport()
+        handle = transport.share(self.chart)
+        transport.close()
+        with self.assertRaises(FileNotFoundError):
+            handle.chart()
+
+
+    def test_only_axis_charts_can_be_shared(self):
+        with SharedMemoryTransport() as transport:
+            with self.assertRaises(TypeError):
+                transport.share(Chart())
+
+
+    def test_can_render_many_through_shared_memory(self):
+        charts = [self.chart, {"data": [(1, 2), (2, 1)]}] * 2
+        self.assertEqual(
+         render_many(charts, workers=2, shared=True),
+         render_many(charts, workers=1)
+        )
@@ -0,0 +1,229 @@
+import io
+import os
+import struct
+import tempfile
+import zlib
+from unittest import TestCase
+from quickplots.charts import AxisChart
+from quickplots.series import LineSeries, ScatterSeries
+from quickplots.renderers import Renderer
+from quickplots.png import PngRenderer, parse_color, encode_png
+
+def decode_png(png):
+    width, height = struct.unpack(">II", png[16:24])
+    data, position = b"", 8
+    while position < len(png):
+        length = struct.unpack(">I", png[position:position + 4])[0]
+        if png[position + 4:position + 8] == b"IDAT":
+            data += png[position + 8:position + 8 + length]
+        position += length + 12
+    raw = zlib.decompress(data)
+    stride = (width * 4) + 1
+    rows = [raw[row * stride + 1:(row + 1) * stride] for row in range(height)]
+    return width, height, b"".join(rows)
+
+
+
+class PngRendererTests(TestCase):
+
+    def setUp(self):
+        self.renderer = PngRenderer()
+        self.renderer.begin(40, 30)
+
+
+    def test_png_renderer_is_renderer(self):
+        self.assertIsInstance(self.renderer, Renderer)
+
+
+    def test_png_renderer_validation(self):
+        with self.assertRaises(TypeError):
+            PngRenderer("file.png")
+        with self.assertRaises(ValueError):
+            PngRenderer(background="white")
+        with self.assertRaises(ValueError):
+            PngRenderer(compresslevel=11)
+
+
+    def test_background(self):
+        self.assertEqual(self.renderer.pixel(5, 5), (255, 255, 255, 255))
+        renderer = PngRenderer(background=None)
+        renderer.begin(10, 10)
+        self.assertEqual(renderer.pixel(5, 5), (0, 0, 0, 0))
+
+
+    def test_rectangles_are_filled(self):
+        self.renderer.rectangle(10, 10, 10, 5, fill_color="#FF0000", line_width=0)
+        self.assertEqual(self.renderer.pixel(15, 12), (255, 0, 0, 255))
+        self.assertEqual(self.renderer.pixel(20, 12), (255, 255, 255, 255))
+        self.assertEqual(self.renderer.pixel(15, 15), (255, 255, 255, 255))
+
+
+    def test_transparent_rectangles_only_have_edges(self):
+        self.renderer.rectangle(10, 10, 10, 10, opacity=0)
+        self.assertEqual(self.renderer.pixel(10, 15), (0, 0, 0, 255))
+        self.assertEqual(self.renderer.pixel(15, 15), (255, 255, 255, 255))
+
+
+    def test_lines_are_drawn(self):
+        self.renderer.line(0, 5, 39, 5, line_color="#0000FF")
+        for x in range(40):
+            self.assertEqual(self.renderer.pixel(x, 5), (0, 0, 255, 255))
+
+
+    def test_dotted_lines_have_gaps(self):
+        self.renderer.line(0, 5, 39, 5, line_style="..")
+        colors = [self.renderer.pixel(x, 5) for x in range(40)]
+        self.assertIn((0, 0, 0, 255), colors)
+        self.assertIn((255, 255, 255, 255), colors)
+
+
+    def test_polylines_are_drawn_through_points(self):
+        self.renderer.polyline(iter([(0, 0), (20, 20), (39, 20)]))
+        self.assertEqual(self.renderer.pixel(10, 10), (0, 0, 0, 255))
+        self.assertEqual(self.renderer.pixel(30, 20), (0, 0, 0, 255))
+        self.assertEqual(self.renderer.pixel(30, 10), (255, 255, 255, 255))
+
+
+    def test_polylines_collapse_points_in_same_column(self):
+        filled = []
+        for method in ("fill_span", "fill_column"):
+            fill = getattr(self.renderer, method)
+            setattr(self.renderer, method, lambda *args, fill=fill: (
+             filled.append(args), fill(*args)
+            ))
+        self.renderer.polyline(
+         [(x / 1000, 5 + ((x * 7919) % 20)) for x in range(40000)]
+        )
+        self.assertEqual(self.renderer.pixel(20, 5), (0, 0, 0, 255))
+        self.assertEqual(self.renderer.pixel(20, 24), (0, 0, 0, 255))
+        self.assertEqual(self.renderer.pixel(20, 26), (255, 255, 255, 255))
+        self.assertLessEqual(len(filled), 40 * 4)
+
+
+    def test_steep_and_shallow_strokes_are_connected(self):
+        self.renderer.line(0, 0, 5, 29, line_width=3)
+        self.renderer.line(0, 29, 39, 20)
+        for y in range(30):
+            row = [self.renderer.pixel(x, y) for x in range(6)]
+            self.assertIn((0, 0, 0, 255), row)
+        for x in range(40):
+            column = [self.renderer.pixel(x, y) for y in range(20, 30)]
+            self.assertIn((0, 0, 0, 255), column)
+
+
+    def black_pixels(self, pixels):
+        return sum(1 for x, y in pixels if self.renderer.pixel(x, y)[0] == 0)
+
+
+    def test_thin_strokes_are_one_pixel_wide(self):
+        self.renderer.line(0, 0, 39, 20)
+        for x in range(40):
+            self.assertEqual(self.black_pixels((x, y) for y in range(30)), 1)
+        self.renderer.begin(40, 30)
+        self.renderer.line(2, 0, 12, 29)
+        for y in range(30):
+            self.assertEqual(self.black_pixels((x, y) for x in range(40)), 1)
+
+
+    def test_diagonals_at_half_pixels_are_even(self):
+        self.renderer.line(0.5, 0.5, 20.5, 20.5)
+        for y in range(1, 22):
+            self.assertEqual(self.black_pixels((x, y) for x in range(40)), 1)
+            self.assertEqual(self.renderer.pixel(y, y), (0, 0, 0, 255))
+
+
+    def test_wide_strokes_are_squared_off(self):
+        self.renderer.line(5, 10, 30, 10, line_width=3)
+        for y in (9, 10, 11):
+            self.assertEqual(self.black_pixels((x, y) for x in range(40)), 28)
+        self.assertEqual(self.black_pixels((x, 12) for x in range(40)), 0)
+
+
+    def test_markers_are_stamped(self):
+        self.renderer.markers(
+         [(10, 10), (30, 20)], 8, fill_color="#00FF00", line_width=2
+        )
+        self.assertEqual(self.renderer.pixel(10, 10), (0, 255, 0, 255))
+        self.assertEqual(self.renderer.pixel(30, 20), (0, 255, 0, 255))
+        self.assertEqual(self.renderer.pixel(10, 5), (0, 0, 0, 255))
+        self.assertEqual(self.renderer.pixel(20, 15), (255, 255, 255, 255))
+
+
+    def test_shapes_are_clipped_to_image(self):
+        self.renderer.markers([(-2, -2), (41, 31)], 10)
+        self.renderer.rectangle(-100, -100, 500, 500, fill_color="#FF0000")
+        self.assertEqual(self.renderer.pixel(39, 29), (255, 0, 0, 255))
+
+
+    def test_text_is_drawn(self):
+        self.renderer.text(20, 15, "12", font_size=9)
+        pixels = self.renderer.pixels()
+        self.assertIn(bytes((0, 0, 0, 255)), pixels)
+
+
+    def test_finish_encodes_png(self):
+        self.renderer.rectangle(0, 0, 40, 30, fill_color="#102030", line_width=0)
+        png = self.renderer.finish()
+        self.assertTrue(png.startswith(b"\x89PNG\r\n\x1a\n"))
+        width, height, pixels = decode_png(png)
+        self.assertEqual((width, height), (40, 30))
+        self.assertEqual(pixels, bytes((16, 32, 48, 255)) * 1200)
+
+
+    def test_float_dimensions_are_rounded(self):
+        renderer = PngRenderer()
+        renderer.begin(10.4, 5.6)
+        self.assertEqual(len(renderer.pixels()), 10 * 6 * 4)
+        self.assertEqual(decode_png(renderer.finish())[:2], (10, 6))
+
+
+    def test_finish_can_write_to_output(self):
+        output = io.BytesIO()
+        renderer = PngRenderer(output)
+        renderer.begin(10, 10)
+        self.assertIsNone(renderer.finish())
+        self.assertEqual(decode_png(output.getvalue())[:2], (10, 10))
+
+
+
+class PngFunctionTests(TestCase):
+
+    def test_parse_color(self):
+        self.assertEqual(parse_color("#FF8000"), (255, 128, 0, 255))
+        self.assertEqual(parse_color("#ff8000", 0), (255, 128, 0, 0))
+        with self.assertRaises(TypeError):
+            parse_color(100)
+
+
+    def test_encode_png(self):
+        png = encode_png(bytearray(b"\x01\x02\x03\x04" * 6), 3, 2)
+        self.assertEqual(decode_png(png), (3, 2, b"\x01\x02\x03\x04" * 6))
+
+
+
+class ChartPngTests(TestCase):
+
+    def setUp(self):
+        self.chart = AxisChart(
+         LineSeries([x for x in range(5000)], [x % 97 for x in range(5000)]),
+         title="Test AxisChart", x_label="Input", y_label="Output"
+        )
+        self.chart.scatter((1, 2), (2000, 50), (4000, 90))
+
+
+    def test_chart_can_render_to_png(self):
+        width, height, pixels = decode_png(self.chart.to_png())
+        self.assertEqual((width, height), (700, 500))
+
+
+    def test_chart_with_float_width_can_render_to_png(self):
+        chart = AxisChart(LineSeries((1, 2), (3, 4)), width=700.5)
+        self.assertEqual(decode_png(chart.to_png())[:2], (700, 500))
+
+
+    def test_chart_can_save_png(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chart.png")
+            self.chart.save(path, background=None)
+            with open(path, "rb") as f:
+                self.assertEqual(decode_png(f.read())[:2], (700, 500))
@@ -0,0 +1,92 @@
+import json
+import tracemalloc
+from unittest import TestCase
+import quickplots
+from quickplots.profiling import (
+ RenderProfile, profile, add_profile_hook, remove_profile_hook, profiled
+)
+
+class RenderProfileTests(TestCase):
+
+    def test_phases_are_recorded(self):
+        recorded = RenderProfile()
+        with recorded.phase("limits"):
+            pass
+        with recorded.phase("canvas", "grid"):
+            pass
+        phases = recorded.phases()
+        self.assertEqual([(p["phase"], p["target"]) for p in phases], [
+         ("limits", None), ("canvas", "grid")
+        ])
+        self.assertIsNone(phases[0]["allocated"])
+        self.assertEqual(set(recorded.totals()), {"limits", "canvas"})
+        self.assertAlmostEqual(
+         recorded.seconds(), sum(p["seconds"] for p in phases)
+        )
+
+
+    def test_memory_must_be_boolean(self):
+        with self.assertRaises(TypeError):
+            RenderProfile(memory=1)
+
+
+    def test_nothing_is_recorded_outside_profile(self):
+        with profiled("limits"):
+            pass
+        self.assertIs(profiled("limits"), profiled("canvas"))
+
+
+
+class RenderProfilingTests(TestCase):
+
+    def setUp(self):
+        self.chart = quickplots.line((1, 1), (2, 4), (3, 9), name="a")
+        self.chart.scatter((1, 2), (2, 3), name="b")
+
+
+    def test_renders_are_profiled_in_phases(self):
+        with profile() as recorded:
+            svg = self.chart.to_svg()
+        self.assertEqual(svg, self.chart.to_svg())
+        phases = [(p["phase"], p["target"]) for p in recorded.phases()]
+        self.assertEqual(phases[:4], [
+         ("limits", None), ("ticks", None), ("canvas", "grid"),
+         ("transform", "a")
+        ])
+        self.assertIn(("canvas", "series2"), phases)
+        self.assertEqual(phases[-1], ("serialization", None))
+        json.dumps(recorded.report())
+
+
+    def test_incremental_renders_are_profiled_by_layer(self):
+        self.chart.incremental(True)
+        with profile() as recorded:
+            self.chart.to_svg()
+            self.chart.to_svg()
+        phases = [(p["phase"], p["target"]) for p in recorded.phases()]
+        self.assertEqual(phases.count(("canvas", "series1")), 2)
+        self.assertEqual(phases.count(("transform", "a")), 1)
+
+
+    def test_memory_can_be_measured(self):
+        with profile(memory=True, callback=self.assertIsNotNone) as recorded:
+            self.chart.create()
+        self.assertFalse(tracemalloc.is_tracing())
+        for phase in recorded.phases():
+            self.assertIsInstance(phase["allocated"], int)
+            self.assertGreaterEqual(phase["peak"], 0)
+
+
+    def test_hooks_get_profile_of_every_render(self):
+        profiles = []
+        add_profile_hook(profiles.append)
+        try:
+            self.chart.to_svg()
+            self.chart.to_png()
+        finally:
+            remove_profile_hook(profiles.append)
+        self.chart.to_svg()
+        self.assertEqual(len(profiles), 2)
+        self.assertIn("serialization", profiles[1].totals())
+        with self.assertRaises(TypeError):
+            add_profile_hook("hook")
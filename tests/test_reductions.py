@@ -0,0 +1,172 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase, skipUnless
+from unittest.mock import patch, Mock
+from quickplots.reductions import (
+ extent, histogram, density, bucket_extents, exact_array, worker_pool, POOLS
+)
+from quickplots.series import Series, LineSeries
+from quickplots.charts import AxisChart
+
+class ReduceChunksTests(TestCase):
+
+    def setUp(self):
+        self.values = [(x * 37) % 101 - 50 for x in range(1000)]
+
+
+    def test_can_reduce_in_one_go(self):
+        self.assertEqual(extent(self.values), (-50, 50))
+
+
+    @patch("quickplots.reductions.PARALLEL_THRESHOLD", 0)
+    def test_can_reduce_chunks_in_parallel(self):
+        values = array("q", self.values)
+        self.assertEqual(extent(values, chunk_size=64, workers=2), (-50, 50))
+        self.assertEqual(
+         histogram(values, -50, 50, 10, chunk_size=64, workers=2),
+         histogram(self.values, -50, 50, 10)
+        )
+
+
+    @patch("quickplots.reductions.PARALLEL_THRESHOLD", 0)
+    @patch("quickplots.reductions.worker_pool")
+    def test_lists_are_not_sent_to_processes(self, worker_pool):
+        worker_pool.return_value = Mock(spec=ProcessPoolExecutor)
+        self.assertEqual(
+         extent(self.values, chunk_size=64, workers=2), (-50, 50)
+        )
+        self.assertFalse(worker_pool.return_value.map.called)
+
+
+    def test_sequences_must_be_equal_and_not_empty(self):
+        with self.assertRaises(ValueError):
+            extent([])
+        with self.assertRaises(ValueError):
+            density([1, 2], [1], (0, 1), (0, 1), (2, 2))
+
+
+
+class WorkerPoolTests(TestCase):
+
+    def test_pools_are_shared(self):
+        self.assertIs(worker_pool(2), worker_pool(2))
+
+
+    @skipUnless(hasattr(os, "fork"), "needs fork")
+    def test_forked_processes_forget_pools(self):
+        worker_pool(2)
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(write, b"%i" % len(POOLS))
+            os._exit(0)
+        os.waitpid(pid, 0)
+        self.assertEqual(os.read(read, 1), b"0")
+        os.close(read)
+        os.close(write)
+
+
+    @patch("quickplots.reductions.parent_process")
+    def test_worker_processes_have_no_pool(self, parent_process):
+        parent_process.return_value = object()
+        self.assertIsNone(worker_pool(2))
+        with patch("quickplots.reductions.PARALLEL_THRESHOLD", 0):
+            self.assertEqual(
+             extent([3, 1, 2] * 100, chunk_size=64, workers=2), (1, 3)
+            )
+
+
+
+class ReductionTests(TestCase):
+
+    def test_histogram(self):
+        self.assertEqual(
+         histogram([0, 1, 2, 5, 9.9, 10, 11, -1], 0, 10, 5), [2, 1, 1, 0, 2]
+        )
+
+
+    def test_density(self):
+        self.assertEqual(density(
+         [0, 1, 1, 5], [0, 0, 9, 5], (0, 2), (0, 10), (2, 2)
+        ), [[1, 1], [0, 1]])
+
+
+    @patch("quickplots.reductions.PARALLEL_THRESHOLD", 0)
+    def test_bucket_extents(self):
+        x = list(range(10))
+        y = [3, 1, 4, 1, 5, 9, 2, 6, 5, 3]
+        self.assertEqual(
+         bucket_extents(x, y, -5, 5, 5), [None, None, (3, 3), (1, 4), (1, 9)]
+        )
+        self.assertEqual(
+         bucket_extents(x, y, 0, 9, 3, chunk_size=4, workers=2),
+         [(1, 4), (1, 9), (2, 6)]
+        )
+
+
+    def test_exact_array(self):
+        self.assertEqual(exact_array([1, 2]), array("q", [1, 2]))
+        self.assertEqual(exact_array([1.5, 2.0]), array("d", [1.5, 2]))
+        self.assertEqual(exact_array([1, 2.0]), [1, 2.0])
+        self.assertEqual(exact_array([2 ** 70]), [2 ** 70])
+
+
+
+class SeriesExtentTests(TestCase):
+
+    def test_y_extent_is_remembered_until_data_changes(self):
+        series = Series((1, 5), (2, -3), (3, 9))
+        with patch("quickplots.series.extent") as reduce:
+            reduce.return_value = (-3, 9)
+            self.assertEqual(series.y_extent(), (-3, 9))
+            self.assertEqual(series.smallest_y(), -3)
+            self.assertEqual(series.largest_y(), 9)
+            self.assertEqual(reduce.call_count, 1)
+        series.add_data_point(4, 20)
+        self.assertEqual(series.y_extent(), (-3, 20))
+        series.remove_data_point(4, 20)
+        self.assertEqual(series.y_extent(), (-3, 9))
+
+
+    def test_y_extent_is_not_remembered_if_data_changes_during_scan(self):
+        series = Series((1, 5), (2, -3), (3, 9))
+        def scan(values, workers):
+            series.add_data_point(4, 20)
+            return (min(values), max(values))
+        with patch("quickplots.series.extent", side_effect=scan):
+            self.assertEqual(series.y_extent(), (-3, 9))
+        self.assertEqual(series.y_extent(), (-3, 20))
+        self.assertEqual(series.snapshot().y_extent(), (-3, 20))
+
+
+    def test_y_extent_is_shared_with_snapshots(self):
+        series = LineSeries((1, 5), (2, -3), (3, 9))
+        chart = AxisChart(series)
+        with patch("quickplots.series.extent") as reduce:
+            reduce.return_value = (-3, 9)
+            chart.to_svg()
+            chart.to_svg()
+            self.assertEqual(series.y_extent(), (-3, 9))
+            self.assertEqual(reduce.call_count, 1)
+
+
+    def test_late_snapshot_does_not_replace_newer_extent(self):
+        series = Series((1, 5), (2, -3), (3, 9))
+        snapshot = series.snapshot()
+        series.add_data_point(4, 20)
+        self.assertEqual(series.y_extent(), (-3, 20))
+        self.assertEqual(snapshot.y_extent(), (-3, 9))
+        with patch("quickplots.series.extent") as reduce:
+            self.assertEqual(series.y_extent(), (-3, 20))
+            self.assertFalse(reduce.called)
+
+
+    def test_y_extent_uses_chart_workers(self):
+        series = Series((1, 5), (2, -3), (3, 9))
+        chart = AxisChart(series)
+        chart.geometry_workers(3)
+        with patch("quickplots.series.extent") as reduce:
+            reduce.return_value = (-3, 9)
+            series.y_extent()
+            self.assertEqual(reduce.call_args[1], {"workers": 3})
@@ -0,0 +1,101 @@
+from unittest import TestCase
+from omnicanvas import Canvas
+from omnicanvas.graphics import Oval, Polyline
+from quickplots.charts import AxisChart
+from quickplots.series import LineSeries, ScatterSeries
+from quickplots.renderers import Renderer, OmniCanvasRenderer, CountingRenderer
+from quickplots.renderers import get_renderer
+
+class RendererTests(TestCase):
+
+    def test_base_renderer_methods_must_be_implemented(self):
+        renderer = Renderer()
+        renderer.begin(700, 500)
+        with self.assertRaises(NotImplementedError):
+            renderer.line(0, 0, 10, 10)
+        with self.assertRaises(NotImplementedError):
+            renderer.polyline([(0, 0), (10, 10)])
+        with self.assertRaises(NotImplementedError):
+            renderer.markers([(0, 0)], 5)
+        with self.assertRaises(NotImplementedError):
+            renderer.rectangle(0, 0, 10, 10)
+        with self.assertRaises(NotImplementedError):
+            renderer.text(0, 0, "text")
+        with self.assertRaises(NotImplementedError):
+            renderer.finish()
+
+
+    def test_renderer_rounds_dimensions(self):
+        renderer = Renderer()
+        renderer.begin(700.6, 500)
+        self.assertEqual(renderer.width(), 701)
+        self.assertEqual(renderer.height(), 500)
+
+
+
+class OmniCanvasRendererTests(TestCase):
+
+    def test_omnicanvas_renderer_creates_canvas(self):
+        renderer = OmniCanvasRenderer()
+        renderer.begin(700, 500)
+        canvas = renderer.finish()
+        self.assertIsInstance(canvas, Canvas)
+        self.assertEqual(canvas.width(), 700)
+
+
+    def test_omnicanvas_renderer_can_use_existing_canvas(self):
+        canvas = Canvas(700, 500)
+        renderer = OmniCanvasRenderer(canvas)
+        renderer.polyline([(0, 0), (10, 20)], name="line")
+        renderer.markers([(0, 0), (10, 20)], 4, name="marker")
+        self.assertIsInstance(canvas.graphics()[0], Polyline)
+        self.assertEqual(canvas.graphics()[0].coordinates(), (0, 0, 10, 20))
+        self.assertIsInstance(canvas.graphics()[2], Oval)
+        self.assertEqual(canvas.graphics()[2].center(), (10, 20))
+        self.assertEqual(canvas.graphics()[2].width(), 4)
+
+
+    def test_charts_are_created_on_existing_canvas(self):
+        canvas = Canvas(700, 500)
+        chart = AxisChart(LineSeries((1, 1), (2, 4), (3, 9)))
+        self.assertIs(chart.create(OmniCanvasRenderer(canvas)), canvas)
+        self.assertEqual(
+         len(canvas.graphics()), len(chart.create().graphics())
+        )
+
+
+    def test_omnicanvas_renderer_needs_canvas(self):
+        with self.assertRaises(TypeError):
+            OmniCanvasRenderer("canvas")
+
+
+    def test_get_renderer(self):
+        renderer = CountingRenderer()
+        self.assertIs(get_renderer(renderer), renderer)
+        canvas = Canvas(700, 500)
+        self.assertIs(get_renderer(canvas).canvas(), canvas)
+        with self.assertRaises(TypeError):
+            get_renderer("canvas")
+
+
+
+class CountingRendererTests(TestCase):
+
+    def test_counting_renderer_counts_shapes(self):
+        chart = AxisChart(LineSeries((1, 1), (2, 4), (3, 9)), title="Title")
+        chart.scatter((1, 2), (2, 3), (3, 4))
+        chart.grid(False)
+        counts = chart.create(CountingRenderer())
+        self.assertEqual(counts["polyline"], 1)
+        self.assertEqual(counts["marker"], 3)
+        self.assertEqual(counts["rectangle"], 5)
+        self.assertEqual(counts["line"], 0)
+        self.assertEqual(
+         counts["text"], len(chart.x_ticks()) + len(chart.y_ticks()) + 1
+        )
+
+
+    def test_chart_needs_renderer(self):
+        chart = AxisChart(LineSeries((1, 1), (2, 4), (3, 9)))
+        with self.assertRaises(TypeError):
+            chart.create("canvas")
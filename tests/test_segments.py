@@ -0,0 +1,178 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from quickplots.charts import AxisChart
+from quickplots.series import LineSeries, ScatterSeries
+from quickplots.spec import dumps
+from quickplots.templates import ChartTemplate
+from quickplots.parallel import render_many, SharedMemoryTransport
+from quickplots.segments import (
+ SegmentedSeries, SegmentedLineSeries, SegmentedScatterSeries,
+ write_segments, read_segment, read_index
+)
+
+class SegmentedSeriesTest(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "series")
+        self.x = list(range(100))
+        self.y = [(x * 7) % 13 - 3.5 for x in self.x]
+        write_segments(self.path, self.x, self.y, segment_size=16)
+
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+
+class SegmentWritingTests(SegmentedSeriesTest):
+
+    def test_data_is_split_into_segments(self):
+        segments = read_index(self.path)
+        self.assertEqual(len(segments), 7)
+        self.assertEqual([s["length"] for s in segments], [16] * 6 + [4])
+        self.assertEqual(segments[0]["dtypes"], ["<i8", "<f8"])
+        self.assertEqual(segments[1]["x_extent"], [16, 31])
+        self.assertEqual(segments[1]["first"], [16, self.y[16]])
+        self.assertEqual(segments[1]["last"], [31, self.y[31]])
+
+
+    def test_cannot_write_bad_data(self):
+        with self.assertRaises(ValueError):
+            write_segments(self.path, self.x, self.y)
+        path = os.path.join(self.directory.name, "other")
+        with self.assertRaises(ValueError):
+            write_segments(path, [1, 2], [1])
+        with self.assertRaises(ValueError):
+            write_segments(path, [], [])
+        with self.assertRaises(ValueError):
+            write_segments(path, [3, 2, 1], [1, 2, 3])
+
+
+
+class SegmentedSeriesCreationTests(SegmentedSeriesTest):
+
+    def test_can_create_segmented_series(self):
+        series = SegmentedLineSeries(self.path, name="s", linewidth=3)
+        self.assertIsInstance(series, SegmentedSeries)
+        self.assertIsInstance(series, LineSeries)
+        self.assertEqual(series.path(), self.path)
+        self.assertEqual(series.linewidth(), 3)
+        self.assertEqual(len(series.segments()), 7)
+        self.assertEqual(
+         repr(series), "<SegmentedLineSeries 's' (100 data points)>"
+        )
+
+
+    def test_series_needs_segments(self):
+        with self.assertRaises(ValueError):
+            SegmentedSeries(self.directory.name)
+        with self.assertRaises(TypeError):
+            SegmentedSeries(100)
+
+
+    def test_data_is_read_from_disk(self):
+        series = SegmentedSeries(self.path)
+        self.assertEqual(series.data(), list(zip(self.x, self.y)))
+        self.assertEqual(series.value_lists(), (self.x, self.y))
+        self.assertEqual(len(list(series.column_chunks())), 7)
+
+
+    def test_extents_come_from_index(self):
+        series = SegmentedSeries(self.path)
+        with patch("quickplots.segments.read_segment") as read:
+            self.assertEqual(series.smallest_x(), 0)
+            self.assertEqual(series.largest_x(), 99)
+            self.assertEqual(series.y_extent(), (-3.5, 8.5))
+            self.assertFalse(read.called)
+
+
+    def test_can_add_data_as_new_segment(self):
+        series = SegmentedSeries(self.path)
+        snapshot = series.snapshot()
+        series.add_data_points([(101, 1.5), (100, 2.5)])
+        self.assertEqual(series.data()[-2:], [(100, 2.5), (101, 1.5)])
+        self.assertEqual(len(read_index(self.path)), 8)
+        self.assertEqual(len(snapshot.data()), 100)
+        self.assertEqual(series.version(), 1)
+        with self.assertRaises(ValueError):
+            series.add_data_point(50, 1)
+        with self.assertRaises(ValueError):
+            series.remove_data_point(0, -3.5)
+
+
+    def test_pickling_keeps_only_location(self):
+        series = SegmentedScatterSeries(self.path, size=3)
+        data = pickle.dumps(series)
+        self.assertLess(len(data), 2000)
+        self.assertEqual(pickle.loads(data).data(), series.data())
+
+
+
+class SegmentedSeriesPaintingTests(SegmentedSeriesTest):
+
+    def test_renders_like_series_in_memory(self):
+        for segmented, in_memory in (
+         (SegmentedLineSeries, LineSeries),
+         (SegmentedScatterSeries, ScatterSeries)
+        ):
+            chart = AxisChart(segmented(self.path, color="#FF0000"))
+            expected = AxisChart(in_memory(self.x, self.y, color="#FF0000"))
+            self.assertEqual(chart.to_svg(), expected.to_svg())
+            self.assertEqual(chart.to_png(), expected.to_png())
+            chart.geometry_workers(2)
+            chart.line((1, 2), (3, 4))
+            expected.line((1, 2), (3, 4))
+            self.assertEqual(chart.to_svg(), expected.to_svg())
+
+
+    def test_segments_outside_limits_are_not_read(self):
+        series = SegmentedLineSeries(self.path)
+        chart = AxisChart(series)
+        chart.x_lower_limit(40)
+        chart.x_upper_limit(60)
+        with patch(
+         "quickplots.segments.read_segment", wraps=read_segment
+        ) as read:
+            points = list(series.canvas_points())
+        self.assertEqual(read.call_count, 2)
+        self.assertEqual(len(points), 34)
+        transform = chart.canvas_transform()
+        self.assertEqual(points[0][0], (31 - 40) * transform[2] + transform[4])
+        self.assertEqual(points[-1][0], (64 - 40) * transform[2] + transform[4])
+
+
+
+class SegmentedSeriesSharingTests(SegmentedSeriesTest):
+
+    def setUp(self):
+        SegmentedSeriesTest.setUp(self)
+        self.chart = AxisChart(SegmentedLineSeries(self.path))
+
+
+    def test_cannot_make_spec(self):
+        with patch("quickplots.segments.read_segment") as read:
+            with self.assertRaises(TypeError):
+                dumps(self.chart)
+            self.assertFalse(read.called)
+
+
+    def test_cannot_make_template(self):
+        with self.assertRaises(TypeError):
+            ChartTemplate(self.chart)
+
+
+    def test_cannot_share_through_shared_memory(self):
+        with SharedMemoryTransport() as transport:
+            with patch("quickplots.segments.read_segment") as read:
+                with self.assertRaises(TypeError):
+                    transport.share(self.chart)
+                self.assertFalse(read.called)
+
+
+    def test_render_many_pickles_streamed_charts(self):
+        results = render_many([self.chart] * 2, workers=2, shared=True)
+        self.assertEqual(results, [self.chart.to_svg()] * 2)
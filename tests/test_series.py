@@ -1,6 +1,9 @@
+import copy
+import pickle
 from unittest import TestCase
 from unittest.mock import patch
-from quickplots.series import Series
+from array import array
+from quickplots.series import Series, LineSeries, unpickle_series
 from quickplots.charts import AxisChart
 import builtins
 
@@ -190,6 +193,32 @@ class SeriesDataManipulationTests(TestCase):
         self.assertEqual(mock.call_count, 0)
 
 
+    def test_can_add_data_points_in_bulk(self):
+        self.series.add_data_points([(4, 16), [5, 25]])
+        self.assertEqual(
+         self.series.data(), [(1, 1), (2, 4), (3, 9), (4, 16), (5, 25)]
+        )
+        self.series.add_data_points([(2.5, 6.25), (0, 0)])
+        self.assertEqual(self.series.data()[:4], [(0, 0), (1, 1), (2, 4), (2.5, 6.25)])
+        self.assertEqual(self.series.version(), 2)
+
+
+    def test_bulk_data_is_checked(self):
+        with self.assertRaises(TypeError):
+            self.series.add_data_points([(4, 16), (5, "25")])
+        with self.assertRaises(ValueError):
+            self.series.add_data_points([(4, 16, 1)])
+        self.assertEqual(len(self.series.data()), 3)
+        self.series.add_data_points([])
+        self.assertEqual(self.series.version(), 0)
+
+
+    @patch("builtins.sorted")
+    def test_bulk_add_will_not_resort_list_needlessly(self, mock):
+        self.series.add_data_points([(4, 16), (5, 25)])
+        self.assertEqual(mock.call_count, 0)
+
+
     def test_can_remove_data_point(self):
         self.series.remove_data_point(1, 1)
         self.assertEqual(self.series.data(), [(2, 4), (3, 9)])
@@ -202,6 +231,80 @@ class SeriesDataManipulationTests(TestCase):
             self.series.remove_data_point(3, 9)
 
 
+    def test_changing_data_changes_version(self):
+        self.assertEqual(self.series.version(), 0)
+        self.series.add_data_point(4, 16)
+        self.series.remove_data_point(1, 1)
+        self.assertEqual(self.series.version(), 2)
+
+
+
+
+class SeriesSnapshotTests(TestCase):
+
+    def setUp(self):
+        self.series = Series((1, 1), (2, 4), (3, 9), name="s")
+
+
+    def test_snapshot_does_not_copy_data(self):
+        snapshot = self.series.snapshot()
+        self.assertIsInstance(snapshot, Series)
+        self.assertIs(snapshot._data, self.series._data)
+        self.assertEqual(snapshot.name(), "s")
+
+
+    def test_snapshot_does_not_see_later_changes(self):
+        snapshot = self.series.snapshot()
+        self.series.add_data_point(4, 16)
+        self.series.add_data_point(0, 0)
+        self.series.add_data_points([(5, 25)])
+        self.series.remove_data_point(2, 4)
+        self.assertEqual(snapshot.data(), [(1, 1), (2, 4), (3, 9)])
+        self.assertEqual(snapshot.version(), 0)
+        self.assertEqual(len(self.series.data()), 5)
+
+
+    def test_data_is_copied_once_per_snapshot(self):
+        data = self.series._data
+        self.series.add_data_point(4, 16)
+        self.assertIs(self.series._data, data)
+        self.series.snapshot()
+        self.series.add_data_point(5, 25)
+        copied = self.series._data
+        self.assertIsNot(copied, data)
+        self.series.add_data_point(6, 36)
+        self.assertIs(self.series._data, copied)
+
+
+    def test_changing_snapshot_does_not_change_series(self):
+        snapshot = self.series.snapshot()
+        snapshot.add_data_point(4, 16)
+        self.assertEqual(len(self.series.data()), 3)
+
+
+    def test_copies_get_their_own_lock(self):
+        series = copy.copy(self.series)
+        self.assertIsNot(series._lock, self.series._lock)
+        series.add_data_point(4, 16)
+        self.assertEqual(len(self.series.data()), 3)
+
+
+    def test_snapshot_has_series_state_until_changed(self):
+        snapshot = self.series.snapshot()
+        self.assertEqual(snapshot.state(), self.series.state())
+        self.series.add_data_point(4, 16)
+        snapshot.add_data_point(5, 100)
+        self.assertEqual(snapshot.version(), self.series.version())
+        self.assertNotEqual(snapshot.state(), self.series.state())
+
+
+    def test_every_series_has_its_own_state(self):
+        other = Series((1, 1), (2, 4), (3, 9), name="s")
+        self.assertNotEqual(other.state(), self.series.state())
+        self.assertNotEqual(copy.copy(self.series).state(), self.series.state())
+
+
+
 
 class SeriesPaintingTests(TestCase):
 
@@ -252,3 +355,85 @@ class SeriesPaintingTests(TestCase):
           (180, 472.4), (260, 451.6), (340, 427.6), (420, 400.4), (500, 370)
          )
         )
+
+
+
+class SeriesColumnTests(TestCase):
+
+    def test_int_columns(self):
+        x, y = Series((1, 1), (2, 4), (3, 9)).columns()
+        self.assertEqual(x.typecode, "q")
+        self.assertEqual(list(x), [1, 2, 3])
+        self.assertEqual(list(y), [1, 4, 9])
+
+
+    def test_float_columns(self):
+        x, y = Series((1, 1.5), (2, 4), (3, 9)).columns()
+        self.assertEqual(x.typecode, "q")
+        self.assertEqual(y.typecode, "d")
+        self.assertEqual(list(y), [1.5, 4.0, 9.0])
+
+
+    def test_huge_ints_become_floats(self):
+        x, y = Series((1, 2 ** 70), (2, 4)).columns()
+        self.assertEqual(y.typecode, "d")
+
+
+    def test_exact_columns(self):
+        x, y = Series((1, 1.5), (2, 4.0)).exact_columns()
+        self.assertEqual((x.typecode, y.typecode), ("q", "d"))
+        self.assertIsNone(Series((1, 1.5), (2, 4)).exact_columns())
+        self.assertIsNone(Series((1, 2 ** 70), (2, 4)).exact_columns())
+
+
+
+class SeriesPicklingTests(TestCase):
+
+    def setUp(self):
+        self.series = Series((1, 1.5), (2, 4.25), (3, 9.0), name="s")
+
+
+    def test_series_pickles_data_as_buffers(self):
+        reduced = self.series.__reduce_ex__(4)
+        self.assertIs(reduced[0], unpickle_series)
+        self.assertEqual(reduced[1][2:], (
+         "q", array("q", [1, 2, 3]).tobytes(),
+         "d", array("d", [1.5, 4.25, 9.0]).tobytes()
+        ))
+        self.assertNotIn("_data", reduced[2])
+        for protocol in (2, 4, 5):
+            series = pickle.loads(pickle.dumps(self.series, protocol=protocol))
+            self.assertEqual(series.data(), self.series.data())
+            self.assertEqual(series.name(), "s")
+            self.assertIsNone(series.chart())
+
+
+    def test_protocol_5_buffers_can_be_out_of_band(self):
+        buffers = []
+        data = pickle.dumps(self.series, protocol=5, buffer_callback=buffers.append)
+        self.assertEqual(len(buffers), 2)
+        series = pickle.loads(data, buffers=buffers)
+        self.assertEqual(series.data(), self.series.data())
+
+
+    def test_mixed_series_use_default_pickling(self):
+        series = Series((1, 1.5), (2, 4))
+        self.assertIsNot(series.__reduce_ex__(4)[0], unpickle_series)
+        self.assertEqual(pickle.loads(pickle.dumps(series)).data(), series.data())
+
+
+    def test_chart_back_references_are_restored(self):
+        self.series = LineSeries((1, 1.5), (2, 4.25), (3, 9.0), name="s")
+        chart = AxisChart(self.series, LineSeries((0, 0), (5, 5)))
+        chart.incremental(True)
+        chart.to_svg()
+        copied = pickle.loads(pickle.dumps(chart))
+        self.assertEqual(len(copied.all_series()), 2)
+        for series in copied.all_series():
+            self.assertIs(series.chart(), copied)
+        self.assertTrue(copied.incremental())
+        self.assertEqual(copied._layers, {})
+        self.assertEqual(copied.to_svg(), chart.to_svg())
+        series = copy.deepcopy(self.series)
+        self.assertIsNot(series.chart(), chart)
+        self.assertIn(series, series.chart().all_series())
@@ -0,0 +1,87 @@
+import io
+import os
+import struct
+import tempfile
+from unittest import TestCase
+from quickplots.charts import AxisChart
+from quickplots.series import LineSeries, ScatterSeries
+from quickplots.parallel import render_many
+from quickplots import spec
+
+class SpecTests(TestCase):
+
+    def setUp(self):
+        self.chart = AxisChart(
+         LineSeries((1, 1.5), (2, 4.25), (3, 9.0), color="#FF0000"),
+         ScatterSeries((1, 2), (2, 3), (4, 1), size=7),
+         title="T", x_label="X"
+        )
+        self.chart.y_ticks(0, 5, 10)
+        self.chart.x_upper_limit(8)
+
+
+    def assertSameChart(self, chart):
+        self.assertIsInstance(chart, AxisChart)
+        self.assertEqual(chart.to_svg(), self.chart.to_svg())
+        for series, original in zip(chart.all_series(), self.chart.all_series()):
+            self.assertIs(series.__class__, original.__class__)
+            self.assertEqual(series.data(), original.data())
+            self.assertEqual(
+             [type(value) for point in series.data() for value in point],
+             [type(value) for point in original.data() for value in point]
+            )
+            self.assertIs(series.chart(), chart)
+        self.assertEqual(chart.y_ticks(), (0, 5, 10))
+
+
+    def test_spec_layout(self):
+        data = spec.dumps(self.chart)
+        magic, version, reserved, length = struct.unpack_from("<4sHHI", data)
+        self.assertEqual((magic, version, reserved), (b"QPLT", 1, 0))
+        self.assertEqual(data[12 + length - 1:12 + length], b"}")
+        start = 12 + length + (-(12 + length) % 8)
+        self.assertEqual(len(data), start + 4 * 3 * 8)
+        self.assertEqual(struct.unpack_from("<3q", data, start), (1, 2, 3))
+        self.assertEqual(
+         struct.unpack_from("<3d", data, start + 24), (1.5, 4.25, 9.0)
+        )
+
+
+    def test_specs_are_deterministic(self):
+        self.assertEqual(spec.dumps(self.chart), spec.dumps(self.chart))
+
+
+    def test_can_round_trip_chart(self):
+        self.assertSameChart(spec.loads(spec.dumps(self.chart)))
+
+
+    def test_mixed_columns_are_kept_exactly(self):
+        self.chart.series().add_data_point(4, 16)
+        self.assertSameChart(spec.loads(spec.dumps(self.chart)))
+
+
+    def test_can_save_and_load_spec_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chart.qplt")
+            spec.dump(self.chart, path)
+            self.assertSameChart(spec.load(path))
+        output = io.BytesIO()
+        spec.dump(self.chart, output)
+        self.assertSameChart(spec.loads(output.getbuffer()))
+
+
+    def test_invalid_specs_are_rejected(self):
+        data = spec.dumps(self.chart)
+        with self.assertRaises(ValueError):
+            spec.loads(b"QP")
+        with self.assertRaises(ValueError):
+            spec.loads(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            spec.loads(data[:4] + b"\x02" + data[5:])
+        with self.assertRaises(TypeError):
+            spec.dumps("chart")
+
+
+    def test_render_many_accepts_specs(self):
+        results = render_many([spec.dumps(self.chart)], workers=1)
+        self.assertEqual(results, [self.chart.to_svg()])
@@ -0,0 +1,481 @@
+import io
+import os
+import gzip
+import re
+import tempfile
+from xml.etree import ElementTree
+from unittest import TestCase
+from unittest.mock import patch
+from quickplots.charts import Chart, AxisChart
+from quickplots.series import LineSeries, ScatterSeries
+from quickplots.renderers import Renderer
+from quickplots.svg import SvgRenderer
+from quickplots.cache import FrameCache
+
+class ChunkCounter(io.StringIO):
+
+    def __init__(self):
+        io.StringIO.__init__(self)
+        self.writes = 0
+
+
+    def write(self, text):
+        self.writes += 1
+        return io.StringIO.write(self, text)
+
+
+
+class SvgRendererTests(TestCase):
+
+    def test_can_create_svg_renderer(self):
+        renderer = SvgRenderer()
+        self.assertIsInstance(renderer, Renderer)
+        renderer.begin(700.4, 500)
+        self.assertEqual(renderer.width(), 700)
+        self.assertEqual(renderer.height(), 500)
+        self.assertEqual(renderer.graphic_count(), 0)
+
+
+    def test_output_must_be_writable(self):
+        with self.assertRaises(TypeError):
+            SvgRenderer("file.svg")
+
+
+    def test_chunk_size_must_be_positive_int(self):
+        with self.assertRaises(TypeError):
+            SvgRenderer(chunk_size=1.5)
+        with self.assertRaises(ValueError):
+            SvgRenderer(chunk_size=0)
+
+
+    def test_finish_returns_svg_if_no_output(self):
+        renderer = SvgRenderer()
+        renderer.begin(700, 500)
+        renderer.line(0, 0, 10, 10)
+        svg = renderer.finish()
+        self.assertTrue(svg.startswith("<?xml"))
+        self.assertIn("<line", svg)
+        self.assertTrue(svg.endswith("</svg>"))
+
+
+    def test_nothing_written_until_chunk_full(self):
+        output = ChunkCounter()
+        renderer = SvgRenderer(output, chunk_size=100000)
+        renderer.begin(700, 500)
+        renderer.line(0, 0, 10, 10)
+        self.assertEqual(output.writes, 0)
+        self.assertIsNone(renderer.finish())
+        self.assertEqual(output.writes, 1)
+        self.assertTrue(output.getvalue().endswith("</svg>"))
+
+
+    def test_large_polyline_written_in_chunks(self):
+        output = ChunkCounter()
+        renderer = SvgRenderer(output, chunk_size=1000)
+        renderer.begin(700, 500)
+        renderer.polyline((x, x + 1) for x in range(10000))
+        renderer.finish()
+        self.assertGreater(output.writes, 10)
+        self.assertIn("0.0,1.0, 1.0,2.0", output.getvalue())
+        self.assertEqual(output.getvalue().count("<polyline"), 1)
+
+
+    def test_markers_are_separate_ellipses(self):
+        renderer = SvgRenderer()
+        renderer.begin(700, 500)
+        renderer.markers([(x, x) for x in range(3000)], 5)
+        self.assertEqual(renderer.graphic_count(), 3000)
+        svg = renderer.finish()
+        self.assertEqual(svg.count("<ellipse"), 3000)
+        self.assertIn('<ellipse cx="2.0" cy="2.0" rx="2.5" ry="2.5"', svg)
+
+
+    def test_cannot_write_when_not_rendering(self):
+        renderer = SvgRenderer()
+        with self.assertRaises(ValueError):
+            renderer.line(0, 0, 10, 10)
+        renderer.begin(700, 500)
+        renderer.finish()
+        with self.assertRaises(ValueError):
+            renderer.line(0, 0, 10, 10)
+
+
+    def test_text_is_escaped(self):
+        renderer = SvgRenderer()
+        renderer.begin(700, 500)
+        renderer.text(10, 10, "a < b & c")
+        self.assertIn(">a &lt; b &amp; c</text>", renderer.finish())
+
+
+
+class ChartSvgTests(TestCase):
+
+    def test_chart_svg_matches_canvas_svg(self):
+        chart = Chart(title="Title", width=50, height=30)
+        self.assertEqual(chart.to_svg(), chart.create().to_svg())
+
+
+    def test_axis_chart_svg_matches_canvas_svg(self):
+        chart = AxisChart(
+         LineSeries((1, 1), (2, 4), (3, 9), linestyle="--"),
+         ScatterSeries((1, 3), (2, 2.5), size=8, color="#ff0000"),
+         title="Test AxisChart", x_label="Input", y_label="Output"
+        )
+        self.assertEqual(chart.to_svg(), chart.create().to_svg())
+
+
+    def test_can_write_svg_to_file_object(self):
+        chart = AxisChart(LineSeries((1, 1), (2, 4), (3, 9)))
+        output = io.StringIO()
+        chart.write_svg(output, chunk_size=256)
+        self.assertEqual(output.getvalue(), chart.to_svg())
+
+
+
+class BatchedMarkerTests(TestCase):
+
+    def setUp(self):
+        self.points = [(x * 1.5, x * 2.25) for x in range(500)]
+
+
+    def render(self, **kwargs):
+        renderer = SvgRenderer(**kwargs)
+        renderer.begin(700, 500)
+        renderer.markers(self.points, 6, fill_color="#ff0000", line_width=2)
+        return renderer.finish()
+
+
+    def test_marker_mode_must_be_valid(self):
+        with self.assertRaises(ValueError):
+            SvgRenderer(marker_mode="squares")
+
+
+    def test_path_markers_are_one_element(self):
+        svg = self.render(marker_mode="path")
+        self.assertEqual(svg.count("<path"), 1)
+        self.assertEqual(svg.count("M"), 500)
+        self.assertNotIn("<ellipse", svg)
+        self.assertIn("M-3.0 0.0a3.0 3.0 0 1 0 6.0 0a3.0 3.0 0 1 0 -6.0 0", svg)
+        self.assertEqual(svg.count("fill:#FF0000;"), 1)
+
+
+    def test_use_markers_define_marker_once(self):
+        svg = self.render(marker_mode="use")
+        self.assertEqual(svg.count("<circle"), 1)
+        self.assertEqual(svg.count("<use"), 500)
+        marker_id = re.search('<circle id="(m1-[0-9a-f]{8})"', svg).group(1)
+        self.assertIn('<use xlink:href="#%s" x="1.5" y="2.2"/>' % marker_id, svg)
+        self.assertEqual(svg.count("fill:#FF0000;"), 1)
+
+
+    def test_use_markers_declare_xlink_namespace(self):
+        namespace = 'xmlns:xlink="http://www.w3.org/1999/xlink"'
+        self.assertIn(namespace, self.render(marker_mode="use"))
+        self.assertNotIn(namespace, self.render())
+        root = ElementTree.fromstring(self.render(marker_mode="use"))
+        use = root.find(".//{http://www.w3.org/2000/svg}use")
+        circle = root.find(".//{http://www.w3.org/2000/svg}circle")
+        self.assertEqual(
+         use.get("{http://www.w3.org/1999/xlink}href"), "#" + circle.get("id")
+        )
+
+
+    def test_each_series_gets_its_own_marker_definition(self):
+        chart = AxisChart(ScatterSeries((1, 1), (2, 4)))
+        chart.scatter((1, 2), (2, 3))
+        svg = chart.to_svg(marker_mode="use")
+        self.assertIn('id="m1-', svg)
+        self.assertIn('id="m2-', svg)
+
+
+    def test_different_markers_never_share_ids(self):
+        red = AxisChart(ScatterSeries((1, 1), (2, 4), color="#FF0000"))
+        blue = AxisChart(ScatterSeries((1, 1), (2, 4), color="#0000FF"))
+        ids = [
+         set(re.findall('id="([^"]+)"', chart.to_svg(marker_mode="use")))
+          for chart in (red, blue)
+        ]
+        self.assertFalse(ids[0] & ids[1])
+        self.assertEqual(
+         red.to_svg(marker_mode="use"), red.to_svg(marker_mode="use")
+        )
+
+
+    def test_ids_can_be_prefixed(self):
+        svg = self.render(marker_mode="use", id_prefix="chart7-")
+        self.assertIn('<circle id="chart7-m1-', svg)
+        self.assertIn('xlink:href="#chart7-m1-', svg)
+        with self.assertRaises(TypeError):
+            SvgRenderer(id_prefix=7)
+
+
+    def test_batched_markers_are_smaller(self):
+        ellipses = self.render()
+        self.assertLess(len(self.render(marker_mode="path")), len(ellipses))
+        self.assertLess(len(self.render(marker_mode="use")), len(ellipses) / 2)
+
+
+
+class PrecisionTests(TestCase):
+
+    def render_line(self, points, **kwargs):
+        renderer = SvgRenderer(**kwargs)
+        renderer.begin(700, 500)
+        renderer.polyline(points)
+        return renderer.finish()
+
+
+    def test_precision_must_be_non_negative_int(self):
+        with self.assertRaises(TypeError):
+            SvgRenderer(precision=1.5)
+        with self.assertRaises(ValueError):
+            SvgRenderer(precision=-1)
+
+
+    def test_relative_must_be_bool(self):
+        with self.assertRaises(TypeError):
+            SvgRenderer(relative="yes")
+
+
+    def test_default_precision_is_one_decimal_place(self):
+        svg = self.render_line([(1.23456, 100), (2.5, -3.04)])
+        self.assertIn('points="1.2,100.0, 2.5,-3.0"', svg)
+
+
+    def test_precision_rounds_and_trims_coordinates(self):
+        svg = self.render_line([(1.23456, 100), (2.5, -3.0004)], precision=2)
+        self.assertIn('points="1.23,100 2.5,-3"', svg)
+
+
+    def test_zero_precision_writes_whole_pixels(self):
+        svg = self.render_line([(1.23456, 100), (2.6, -3.04)], precision=0)
+        self.assertIn('points="1,100 3,-3"', svg)
+
+
+    def test_negative_zero_is_written_as_zero(self):
+        svg = self.render_line([(-0.004, -0.3), (2, 1)], precision=0)
+        self.assertIn('points="0,0 2,1"', svg)
+        svg = self.render_line([(-0.004, -0.3), (2, 1)], precision=2)
+        self.assertIn('points="0,-0.3 2,1"', svg)
+
+
+    def test_precision_applies_to_all_shapes(self):
+        renderer = SvgRenderer(precision=0)
+        renderer.begin(700, 500)
+        renderer.line(1.4, 2.6, 3.2, 4.9)
+        renderer.rectangle(0.3, 0.4, 10.2, 20.7)
+        renderer.text(10.1, 20.9, "text")
+        renderer.markers([(5.5, 6.4)], 5)
+        svg = renderer.finish()
+        self.assertIn('<line x1="1" y1="3" x2="3" y2="5"', svg)
+        self.assertIn('<rect x="0" y="0" width="10" height="21"', svg)
+        self.assertIn('<text x="10" y="21"', svg)
+        self.assertIn('<ellipse cx="6" cy="6" rx="2" ry="2"', svg)
+
+
+    def test_relative_lines_are_paths(self):
+        svg = self.render_line([(1, 2), (3.5, 1), (3.5, 10)], relative=True)
+        self.assertNotIn("<polyline", svg)
+        self.assertIn('<path d="M1 2l2.5 -1 0 9" style="fill:none;', svg)
+
+
+    def test_relative_steps_do_not_accumulate_rounding(self):
+        points = [(x * 0.34, 0) for x in range(1000)]
+        svg = self.render_line(points, relative=True, precision=0)
+        steps = svg[svg.index('d="M0 0l') + 8:svg.index('" style')].split(" ")
+        self.assertEqual(sum(int(step) for step in steps[::2]), round(999 * 0.34))
+
+
+    def test_relative_path_with_one_point(self):
+        svg = self.render_line([(1, 2)], relative=True)
+        self.assertIn('<path d="M1 2" style', svg)
+
+
+    def test_chart_svg_with_precision_is_smaller(self):
+        chart = AxisChart(LineSeries(
+         [x / 7 for x in range(500)], [(x / 3) ** 0.5 for x in range(500)]
+        ))
+        self.assertLess(
+         len(chart.to_svg(precision=0, relative=True)), len(chart.to_svg())
+        )
+
+
+
+class CompressedSvgTests(TestCase):
+
+    def setUp(self):
+        self.chart = AxisChart(
+         LineSeries([x for x in range(1000)], [x % 17 for x in range(1000)]),
+         title="Test AxisChart"
+        )
+
+
+    def test_can_write_svgz_to_file_object(self):
+        output = io.BytesIO()
+        self.chart.write_svgz(output)
+        compressed = output.getvalue()
+        self.assertEqual(gzip.decompress(compressed).decode(), self.chart.to_svg())
+        self.assertLess(len(compressed), len(self.chart.to_svg()) / 3)
+        self.assertFalse(output.closed)
+
+
+    def test_svgz_options_passed_to_renderer(self):
+        output = io.BytesIO()
+        self.chart.write_svgz(output, precision=0)
+        self.assertEqual(
+         gzip.decompress(output.getvalue()).decode(),
+         self.chart.to_svg(precision=0)
+        )
+
+
+    def test_svgz_compression_level(self):
+        fast, small = io.BytesIO(), io.BytesIO()
+        self.chart.write_svgz(fast, compresslevel=0)
+        self.chart.write_svgz(small, compresslevel=9)
+        self.assertGreater(len(fast.getvalue()), len(small.getvalue()))
+        with self.assertRaises(TypeError):
+            self.chart.write_svgz(io.BytesIO(), compresslevel=1.5)
+        with self.assertRaises(ValueError):
+            self.chart.write_svgz(io.BytesIO(), compresslevel=10)
+
+
+    def test_svgz_output_is_deterministic(self):
+        first, second = io.BytesIO(), io.BytesIO()
+        self.chart.write_svgz(first)
+        self.chart.write_svgz(second)
+        self.assertEqual(first.getvalue(), second.getvalue())
+
+
+    def test_save_uses_extension(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "chart.svg")
+            self.chart.save(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), self.chart.to_svg())
+            path = os.path.join(directory, "chart.svgz")
+            self.chart.save(path)
+            with gzip.open(path, "rt") as f:
+                self.assertEqual(f.read(), self.chart.to_svg())
+
+
+    def test_save_path_must_be_str(self):
+        with self.assertRaises(TypeError):
+            self.chart.save(100)
+
+
+
+class IncrementalRenderTests(TestCase):
+
+    def setUp(self):
+        self.line = LineSeries((1, 1), (2, 4), (3, 9))
+        self.scatter = ScatterSeries((1, 2), (2, 3), (3, 5))
+        self.chart = AxisChart(self.line, self.scatter, title="T")
+        self.chart.incremental(True)
+
+
+    def test_incremental_is_off_by_default(self):
+        self.assertFalse(AxisChart(self.line).incremental())
+        self.assertTrue(self.chart.incremental())
+        with self.assertRaises(TypeError):
+            self.chart.incremental(1)
+        self.chart.incremental(False)
+        self.assertFalse(self.chart.incremental())
+
+
+    def test_incremental_render_matches_full_render(self):
+        self.assertEqual(self.chart.to_svg(), self.chart.to_svg())
+        self.scatter.add_data_point(2.5, 4)
+        svg = self.chart.to_svg(marker_mode="use")
+        self.chart.incremental(False)
+        self.assertEqual(svg, self.chart.to_svg(marker_mode="use"))
+
+
+    def test_only_changed_series_are_repainted(self):
+        self.chart.to_svg()
+        self.scatter.add_data_point(2.5, 4)
+        with patch("quickplots.series.LineSeries.write_to_canvas") as line:
+            with patch("quickplots.charts.AxisChart.paint_labels") as labels:
+                with patch("quickplots.series.ScatterSeries.write_to_canvas") as s:
+                    self.chart.to_svg()
+        self.assertFalse(line.called)
+        self.assertFalse(labels.called)
+        self.assertTrue(s.called)
+
+
+    def test_frame_is_repainted_when_limits_move(self):
+        self.chart.to_svg()
+        self.line.add_data_point(20, 30)
+        with patch("quickplots.charts.AxisChart.paint_labels") as labels:
+            with patch("quickplots.charts.AxisChart.paint_title") as title:
+                self.chart.to_svg()
+        self.assertTrue(labels.called)
+        self.assertFalse(title.called)
+
+
+    def test_changed_snapshot_is_not_given_series_layer(self):
+        self.chart.to_svg()
+        snapshot = self.chart.snapshot()
+        self.line.add_data_point(2.5, 2)
+        snapshot.all_series()[0].add_data_point(2.5, 8)
+        self.chart.to_svg()
+        svg = snapshot.to_svg()
+        snapshot.incremental(False)
+        self.assertEqual(svg, snapshot.to_svg())
+
+
+    def test_style_changes_repaint_series(self):
+        self.chart.to_svg()
+        self.line.color("#FF0000")
+        self.assertIn("stroke:#FF0000", self.chart.to_svg())
+
+
+    def test_removed_series_are_forgotten(self):
+        self.chart.to_svg()
+        self.chart.remove_series(self.scatter)
+        svg = self.chart.to_svg()
+        self.assertNotIn("<ellipse", svg)
+        self.assertEqual(
+         [key[0] for key in self.chart._layers if key[0].startswith("series")],
+         ["series1"]
+        )
+
+
+
+class SharedFrameTests(TestCase):
+
+    def setUp(self):
+        self.frames = FrameCache()
+        self.charts = [AxisChart(
+         LineSeries((0, 0), (5, 5 + i), (10, 9)), title="T", x_label="X"
+        ) for i in range(3)]
+
+
+    def test_renderer_frames_must_be_frame_cache(self):
+        self.assertIs(SvgRenderer(frames=self.frames).frames(), self.frames)
+        self.assertIsNone(SvgRenderer().frames())
+        with self.assertRaises(TypeError):
+            SvgRenderer(frames={})
+
+
+    def test_frame_is_painted_once(self):
+        self.charts[0].to_svg(frames=self.frames)
+        with patch("quickplots.charts.AxisChart.paint_labels") as labels:
+            with patch("quickplots.charts.AxisChart.paint_grid") as grid:
+                for chart in self.charts[1:]:
+                    chart.to_svg(frames=self.frames)
+        self.assertFalse(labels.called)
+        self.assertFalse(grid.called)
+        self.assertEqual(self.frames.stats(), {"hits": 10, "misses": 5})
+
+
+    def test_shared_frame_matches_full_render(self):
+        for chart in self.charts:
+            self.assertEqual(chart.to_svg(frames=self.frames), chart.to_svg())
+
+
+    def test_frame_is_repainted_for_different_layout(self):
+        self.charts[0].to_svg(frames=self.frames)
+        self.charts[1].y_upper_limit(20)
+        svg = self.charts[1].to_svg(frames=self.frames)
+        self.assertEqual(svg, self.charts[1].to_svg())
+        self.assertEqual(len(self.frames), 7)
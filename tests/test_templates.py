@@ -0,0 +1,87 @@
+from array import array
+from unittest import TestCase
+from unittest.mock import patch
+from quickplots.charts import AxisChart
+from quickplots.series import LineSeries, ScatterSeries
+from quickplots.templates import ChartTemplate
+
+class ChartTemplateTests(TestCase):
+
+    def setUp(self):
+        self.chart = AxisChart(
+         LineSeries((1, 1), (2, 4), color="#FF0000", linestyle="--"),
+         ScatterSeries((1, 2), (2, 3), size=8),
+         title="T", x_label="X", width=400
+        )
+        self.chart.y_ticks(0, 5, 10)
+        self.chart.x_upper_limit(10)
+        self.template = ChartTemplate(self.chart)
+
+
+    def test_template_needs_axis_chart(self):
+        with self.assertRaises(TypeError):
+            ChartTemplate("chart")
+
+
+    def test_bound_chart_has_template_configuration(self):
+        chart = self.template.bind(((1, 2, 3), (4, 5, 6)), ([0, 5], [9, 8]))
+        self.assertIsInstance(chart, AxisChart)
+        self.assertEqual(chart.title(), "T")
+        self.assertEqual(chart.x_label(), "X")
+        self.assertEqual(chart.width(), 400)
+        self.assertEqual(chart.y_ticks(), (0, 5, 10))
+        self.assertEqual(chart.x_upper_limit(), 10)
+        line, scatter = chart.all_series()
+        self.assertIsInstance(scatter, ScatterSeries)
+        self.assertEqual(line.color(), "#FF0000")
+        self.assertEqual(line.linestyle(), "--")
+        self.assertEqual(scatter.size(), 8)
+        self.assertEqual(line.data(), [(1, 4), (2, 5), (3, 6)])
+        self.assertIs(scatter.chart(), chart)
+
+
+    def test_bound_data_is_sorted(self):
+        chart = self.template.bind(((3, 1, 2), (9, 1, 4)), ((1,), (1,)))
+        self.assertEqual(chart.series().data(), [(1, 1), (2, 4), (3, 9)])
+
+
+    def test_bound_charts_are_independent(self):
+        chart = self.template.bind(((1, 2), (1, 2)), ((1, 2), (1, 2)))
+        chart.title("New")
+        chart.series().color("#00FF00")
+        other = self.template.bind(((1, 2), (1, 2)), ((1, 2), (1, 2)))
+        self.assertEqual(other.title(), "T")
+        self.assertEqual(other.series().color(), "#FF0000")
+        self.assertEqual(self.chart.title(), "T")
+
+
+    def test_bind_checks_amount_of_data(self):
+        with self.assertRaises(ValueError):
+            self.template.bind(((1, 2), (1, 2)))
+        with self.assertRaises(ValueError):
+            self.template.bind(((1, 2), (1,)), ((1,), (1,)))
+        with self.assertRaises(ValueError):
+            self.template.bind(((), ()), ((1,), (1,)))
+
+
+    def test_bind_does_not_call_setters(self):
+        with patch("quickplots.series.Series.__init__") as init:
+            with patch("quickplots.charts.AxisChart.__init__") as chart_init:
+                self.template.bind(((1, 2), (1, 2)), ((1, 2), (1, 2)))
+        self.assertFalse(init.called)
+        self.assertFalse(chart_init.called)
+
+
+    def test_template_renders_same_svg_as_chart(self):
+        xs, ys = array("d", (1, 2, 3)), array("d", (4, 5, 6))
+        svg = self.template.to_svg((xs, ys), ((1, 2), (3, 4)))
+        chart = AxisChart(
+         LineSeries((1, 4), (2, 5), (3, 6), color="#FF0000", linestyle="--"),
+         ScatterSeries((1, 3), (2, 4), size=8),
+         title="T", x_label="X", width=400
+        )
+        chart.y_ticks(0, 5, 10)
+        chart.x_upper_limit(10)
+        self.assertEqual(svg, chart.to_svg())
+        self.template.to_svg((xs, ys), ((1, 2), (4, 3)))
+        self.assertEqual(self.template.frames().stats()["hits"], 5)